@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Attendance
+from .models import Attendance, AttendanceSummary
 
 @admin.register(Attendance)
 class AttendanceAdmin(admin.ModelAdmin):
@@ -7,4 +7,11 @@ class AttendanceAdmin(admin.ModelAdmin):
     list_filter = ('date', 'status', 'course', 'faculty', 'student__department')
     search_fields = ('student__user__username', 'course__title', 'faculty__user__username')
     autocomplete_fields = ('student', 'course', 'faculty')
-    date_hierarchy = 'date'
\ No newline at end of file
+    date_hierarchy = 'date'
+
+@admin.register(AttendanceSummary)
+class AttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ('student', 'course', 'present_classes', 'total_classes', 'percentage', 'updated_at')
+    list_filter = ('course', 'student__department')
+    search_fields = ('student__student_id', 'student__user__username', 'course__code')
+    raw_id_fields = ('student', 'course')
@@ -2,6 +2,8 @@ from django import forms
 from .models import Attendance
 from students.models import Student
 from courses.models import Course
+from students.models import Department
+from .services import SHORTAGE_THRESHOLD
 import datetime
 
 class MassAttendanceForm(forms.Form):
@@ -36,4 +38,22 @@ class AttendanceRecordForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         # Add Tailwind classes
         for field_name, field in self.fields.items():
-            field.widget.attrs['class'] = 'form-input'
\ No newline at end of file
+            field.widget.attrs['class'] = 'form-input'
+
+
+class ShortageReportForm(forms.Form):
+    """
+    Options for the attendance shortage CSV report.
+    """
+    department = forms.ModelChoiceField(queryset=Department.objects.all(), required=False, empty_label="Entire college")
+    date_from = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    date_to = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    threshold = forms.IntegerField(min_value=1, max_value=100, initial=SHORTAGE_THRESHOLD, help_text="Percentage below which a student is short.")
+    only_shortages = forms.BooleanField(required=False, initial=True, label="Only students below the threshold")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Add Tailwind classes
+        for field_name, field in self.fields.items():
+            if field_name != 'only_shortages':
+                field.widget.attrs['class'] = 'form-input'
@@ -0,0 +1,52 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.reports import shortage_rows, iter_report_lines
+from attendance.services import SHORTAGE_THRESHOLD
+from students.models import Department
+
+
+class Command(BaseCommand):
+    help = (
+        'Writes the attendance shortage report as CSV, for one department or the whole college. '
+        'Meant for a nightly cron job, e.g. '
+        '`manage.py attendance_shortage_report --output /var/reports/shortage-$(date +%F).csv`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--department', help='Department code (default: entire college).')
+        parser.add_argument('--threshold', type=int, default=SHORTAGE_THRESHOLD, help=f'Shortage threshold in percent (default: {SHORTAGE_THRESHOLD}).')
+        parser.add_argument('--from', dest='date_from', type=datetime.date.fromisoformat, help='Only count attendance on or after this date (YYYY-MM-DD).')
+        parser.add_argument('--to', dest='date_to', type=datetime.date.fromisoformat, help='Only count attendance on or before this date (YYYY-MM-DD).')
+        parser.add_argument('--all', action='store_true', help='Include students who are not short as well.')
+        parser.add_argument('--output', help='File to write (default: stdout).')
+
+    def handle(self, *args, **options):
+        department = None
+        if options['department']:
+            try:
+                department = Department.objects.get(code=options['department'])
+            except Department.DoesNotExist:
+                raise CommandError(f"Department '{options['department']}' does not exist.")
+
+        rows = shortage_rows(
+            department=department,
+            date_from=options['date_from'],
+            date_to=options['date_to'],
+            threshold=options['threshold'],
+            only_shortages=not options['all'],
+        )
+        lines = iter_report_lines(rows, options['threshold'])
+
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        count = -1  # header line
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            for line in lines:
+                output.write(line)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} rows to {options['output']}."))
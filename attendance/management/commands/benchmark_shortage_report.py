@@ -0,0 +1,55 @@
+import datetime
+import random
+import time
+
+from django.db import connection
+
+from attendance.models import Attendance
+from attendance.reports import shortage_rows, iter_report_lines
+from core.benchmarks import BenchmarkCommand, seed_students
+from courses.models import Course
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Benchmarks the attendance shortage report on synthetic data '
+        '(default: 2,000 students x 5 courses x 100 days = 1,000,000 attendance rows). '
+        'All data is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--courses', type=int, default=5)
+        parser.add_argument('--days', type=int, default=100)
+
+    def seed(self, options):
+        num_courses, num_days = options['courses'], options['days']
+        self.stdout.write(f'Creating {options["students"] * num_courses * num_days} synthetic attendance rows...')
+        rng = random.Random(42)
+
+        (department,), students = seed_students(options['students'])
+        courses = Course.objects.bulk_create(
+            [Course(code=f'BENCH{i:03d}', title=f'Benchmark Course {i}', department=department, credits=3) for i in range(num_courses)]
+        )
+
+        # Each student gets their own attendance rate so some fall short
+        rates = {student.pk: rng.uniform(0.5, 1.0) for student in students}
+        first_day = datetime.date(2025, 1, 1)
+        batch = []
+        for day in range(num_days):
+            date = first_day + datetime.timedelta(days=day)
+            for course in courses:
+                for student in students:
+                    status = 'present' if rng.random() < rates[student.pk] else 'absent'
+                    batch.append(Attendance(student_id=student.pk, course_id=course.pk, date=date, status=status))
+                    if len(batch) >= 10000:
+                        Attendance.objects.bulk_create(batch)
+                        batch = []
+        Attendance.objects.bulk_create(batch)
+
+    def run(self, options):
+        for label, only_shortages in (('shortages only', True), ('all rows', False)):
+            start = time.perf_counter()
+            lines = sum(1 for _ in iter_report_lines(shortage_rows(only_shortages=only_shortages))) - 1
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f'{connection.vendor}, {label}: {lines} report rows in {elapsed:.2f} s')
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from attendance.models import AttendanceSummary
+from attendance.services import rebuild_summaries
+from students.models import Student
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the AttendanceSummary rollup from the attendance records, a batch of students at a time.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Students per batch (default: 1000).')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        student_ids = list(Student.objects.order_by('id').values_list('id', flat=True))
+
+        # Rows left over from students that no longer have any attendance
+        # are cleared by the per-batch delete as well.
+        for start in range(0, len(student_ids), batch_size):
+            rebuild_summaries(student_ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt attendance summaries for {len(student_ids)} students "
+            f"({AttendanceSummary.objects.count()} rows)."
+        ))
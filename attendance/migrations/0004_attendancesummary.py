@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_alter_attendance_options_and_more'),
+        ('courses', '0004_enrollment'),
+        ('students', '0004_student_search_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_classes', models.PositiveIntegerField(default=0, verbose_name='Total Classes')),
+                ('present_classes', models.PositiveIntegerField(default=0, verbose_name='Present')),
+                ('absent_classes', models.PositiveIntegerField(default=0, verbose_name='Absent')),
+                ('late_classes', models.PositiveIntegerField(default=0, verbose_name='Late')),
+                ('excused_classes', models.PositiveIntegerField(default=0, verbose_name='Excused')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(blank=True, help_text="Empty for the student's overall totals", null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='courses.course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Attendance Summary',
+                'verbose_name_plural': 'Attendance Summaries',
+                'constraints': [models.UniqueConstraint(fields=('student', 'course'), name='attendance_summary_unique_course'), models.UniqueConstraint(condition=models.Q(('course__isnull', True)), fields=('student',), name='attendance_summary_unique_overall')],
+            },
+        ),
+    ]
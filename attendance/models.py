@@ -33,4 +33,41 @@ class Attendance(models.Model):
         ordering = ['-date', 'student']
 
     def __str__(self):
-        return f"{self.student} - {self.course.code} on {self.date}: {self.get_status_display()}"
\ No newline at end of file
+        return f"{self.student} - {self.course.code} on {self.date}: {self.get_status_display()}"
+
+
+class AttendanceSummary(models.Model):
+    """
+    Running totals of a student's attendance per course, plus one overall
+    row with course=NULL. Kept up to date by attendance.services so the
+    student dashboard doesn't have to count the full history on every visit.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_summaries')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, null=True, blank=True, related_name='attendance_summaries', help_text="Empty for the student's overall totals")
+
+    total_classes = models.PositiveIntegerField(default=0, verbose_name=_("Total Classes"))
+    present_classes = models.PositiveIntegerField(default=0, verbose_name=_("Present"))
+    absent_classes = models.PositiveIntegerField(default=0, verbose_name=_("Absent"))
+    late_classes = models.PositiveIntegerField(default=0, verbose_name=_("Late"))
+    excused_classes = models.PositiveIntegerField(default=0, verbose_name=_("Excused"))
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Attendance Summary")
+        verbose_name_plural = _("Attendance Summaries")
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'course'], name='attendance_summary_unique_course'),
+            # NULLs never clash in a unique index, so the overall row needs its own
+            models.UniqueConstraint(fields=['student'], condition=models.Q(course__isnull=True), name='attendance_summary_unique_overall'),
+        ]
+
+    @property
+    def percentage(self):
+        if not self.total_classes:
+            return 0
+        return round(self.present_classes / self.total_classes * 100, 2)
+
+    def __str__(self):
+        scope = self.course.code if self.course_id else 'Overall'
+        return f"{self.student} - {scope}: {self.present_classes}/{self.total_classes}"
@@ -0,0 +1,86 @@
+"""
+Attendance shortage report.
+
+Per-student, per-course attendance percentages for one department or the
+whole college, worked out by the database in a single grouped query over
+Attendance and streamed out as CSV row by row, so the report never holds
+the institution's attendance in memory.
+"""
+
+import csv
+
+from django.db.models import Count, F, FloatField, Q, ExpressionWrapper
+
+from .models import Attendance
+from .services import SHORTAGE_THRESHOLD
+
+REPORT_COLUMNS = [
+    'department', 'student_id', 'student_name', 'course_code', 'course_title',
+    'present', 'total', 'percentage', 'shortage',
+]
+
+
+def shortage_rows(department=None, date_from=None, date_to=None, threshold=SHORTAGE_THRESHOLD, only_shortages=True):
+    """
+    One dict per (student, course) with present/total counts and the
+    attendance percentage, ordered by department, student and course.
+    With only_shortages, just the pairs below `threshold` are returned
+    (filtered in SQL, as a HAVING clause).
+    """
+    attendances = Attendance.objects.all()
+    if department is not None:
+        attendances = attendances.filter(student__department=department)
+    if date_from:
+        attendances = attendances.filter(date__gte=date_from)
+    if date_to:
+        attendances = attendances.filter(date__lte=date_to)
+
+    rows = (
+        attendances
+        .values(
+            'student_id', 'course_id',
+            department_code=F('student__department__code'),
+            student_code=F('student__student_id'),
+            first_name=F('student__user__first_name'),
+            last_name=F('student__user__last_name'),
+            course_code=F('course__code'),
+            course_title=F('course__title'),
+        )
+        .annotate(
+            total=Count('id'),
+            present=Count('id', filter=Q(status='present')),
+        )
+        .annotate(
+            percentage=ExpressionWrapper(F('present') * 100.0 / F('total'), output_field=FloatField()),
+        )
+        .order_by('department_code', 'student_code', 'course_code')
+    )
+    if only_shortages:
+        rows = rows.filter(percentage__lt=threshold)
+    return rows
+
+
+def iter_report_lines(rows, threshold=SHORTAGE_THRESHOLD):
+    """Yield the report as CSV text, one line at a time."""
+    buffer = _LineBuffer()
+    writer = csv.writer(buffer)
+    yield writer.writerow(REPORT_COLUMNS)
+    for row in rows.iterator(chunk_size=2000):
+        yield writer.writerow([
+            row['department_code'],
+            row['student_code'],
+            f"{row['first_name']} {row['last_name']}".strip(),
+            row['course_code'],
+            row['course_title'],
+            row['present'],
+            row['total'],
+            f"{row['percentage']:.2f}",
+            'yes' if row['percentage'] < threshold else 'no',
+        ])
+
+
+class _LineBuffer:
+    # csv.writer only needs write(); hand each line straight back instead
+    # of collecting it.
+    def write(self, value):
+        return value
@@ -0,0 +1,136 @@
+"""
+Bulk writes for attendance and the AttendanceSummary rollup.
+
+Saving a class register used to call update_or_create once per student, a
+SELECT plus an INSERT or UPDATE each time. save_attendance() writes the
+whole register with one INSERT ... ON CONFLICT DO UPDATE on the
+(student, course, date) unique constraint instead, so the number of
+queries no longer depends on the size of the class.
+
+AttendanceSummary rows are recomputed for just the students and courses a
+write touched, with one grouped COUNT per scope, so the dashboard can read
+them without counting anything.
+"""
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from students.models import Student
+from .models import Attendance, AttendanceSummary
+
+VALID_STATUSES = {value for value, label in Attendance.STATUS_CHOICES}
+
+# Rows per INSERT statement; keeps big registers under the database's
+# parameter limit.
+ATTENDANCE_BATCH_SIZE = 1000
+
+
+def save_attendance(course, date, faculty, statuses):
+    """
+    Upsert one day's attendance for a course.
+
+    `statuses` maps student id -> status; unknown statuses are ignored.
+    Returns (inserted, updated). The split is worked out from the rows
+    that existed just before the write, so it is approximate if two people
+    save the same register at the same moment.
+    """
+    statuses = {student_id: status for student_id, status in statuses.items() if status in VALID_STATUSES}
+    if not statuses:
+        return 0, 0
+
+    existing = set(
+        Attendance.objects.filter(course=course, date=date, student_id__in=statuses)
+        .order_by().values_list('student_id', flat=True)
+    )
+
+    # Register and summaries together, so a failure can't leave the
+    # summaries behind the register
+    with transaction.atomic():
+        Attendance.objects.bulk_create(
+            [
+                Attendance(student_id=student_id, course=course, date=date, status=status, faculty=faculty)
+                for student_id, status in statuses.items()
+            ],
+            batch_size=ATTENDANCE_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['student', 'course', 'date'],
+            update_fields=['status', 'faculty', 'updated_at'],
+        )
+        refresh_summaries(list(statuses), [course.pk])
+
+    updated = len(existing)
+    return len(statuses) - updated, updated
+
+
+# -----------------------------------------------------------------------------
+# SUMMARY ROLLUP
+# -----------------------------------------------------------------------------
+
+# Below this percentage a student is short of attendance for a course
+SHORTAGE_THRESHOLD = 75
+
+SUMMARY_COUNTS = {
+    'total_classes': Count('id'),
+    'present_classes': Count('id', filter=Q(status='present')),
+    'absent_classes': Count('id', filter=Q(status='absent')),
+    'late_classes': Count('id', filter=Q(status='late')),
+    'excused_classes': Count('id', filter=Q(status='excused')),
+}
+
+
+def _summary_rows(student_ids, course_ids=None):
+    """
+    Build (unsaved) AttendanceSummary rows for the given students: one per
+    course they have attendance in (limited to `course_ids` if given) and
+    one overall row each.
+    """
+    per_course = Attendance.objects.filter(student_id__in=student_ids)
+    if course_ids is not None:
+        per_course = per_course.filter(course_id__in=course_ids)
+    rows = [
+        AttendanceSummary(**values)
+        for values in per_course.values('student_id', 'course_id').annotate(**SUMMARY_COUNTS).order_by()
+    ]
+    rows += [
+        AttendanceSummary(course_id=None, **values)
+        for values in Attendance.objects.filter(student_id__in=student_ids)
+        .values('student_id').annotate(**SUMMARY_COUNTS).order_by()
+    ]
+    return rows
+
+
+def _lock_students(student_ids):
+    # Summaries are replaced rather than upserted because the overall row
+    # has a NULL course, which ON CONFLICT can't target. Locking the
+    # students first (in pk order, so two writers can't deadlock) makes
+    # concurrent refreshes of the same students take turns instead of
+    # both inserting and colliding on the unique constraints; the second
+    # one then counts the first one's committed attendance too.
+    list(
+        Student.objects.select_for_update().filter(pk__in=student_ids)
+        .order_by('pk').values_list('pk', flat=True)
+    )
+
+
+def refresh_summaries(student_ids, course_ids):
+    """
+    Recompute the per-course summaries of `student_ids` x `course_ids` and
+    the overall summaries of `student_ids`.
+    """
+    if not student_ids:
+        return
+    with transaction.atomic():
+        _lock_students(student_ids)
+        AttendanceSummary.objects.filter(
+            Q(course_id__in=course_ids) | Q(course__isnull=True),
+            student_id__in=student_ids,
+        ).delete()
+        AttendanceSummary.objects.bulk_create(_summary_rows(student_ids, course_ids), batch_size=ATTENDANCE_BATCH_SIZE)
+
+
+def rebuild_summaries(student_ids):
+    """Recompute every summary row of `student_ids` from scratch."""
+    with transaction.atomic():
+        _lock_students(student_ids)
+        AttendanceSummary.objects.filter(student_id__in=student_ids).delete()
+        AttendanceSummary.objects.bulk_create(_summary_rows(student_ids), batch_size=ATTENDANCE_BATCH_SIZE)
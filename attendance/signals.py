@@ -0,0 +1,42 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Attendance
+from .services import refresh_summaries
+
+# Single-record edits (admin, shell) and cascades are collected here and
+# refreshed once on commit: deleting a course or a student fires
+# post_delete for every one of its attendance rows. save_attendance()
+# refreshes its own rows since bulk_create sends no signals.
+_pending = threading.local()
+
+
+def _pending_changes():
+    if not hasattr(_pending, 'student_ids'):
+        _pending.student_ids = set()
+        _pending.course_ids = set()
+    return _pending
+
+
+def _apply_pending_changes():
+    pending = _pending_changes()
+    student_ids, course_ids = pending.student_ids, pending.course_ids
+    del _pending.student_ids, _pending.course_ids
+    # After commit, so deleting a whole student or course doesn't write
+    # summary rows for it
+    refresh_summaries(sorted(student_ids), sorted(course_ids))
+
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+def queue_attendance_change(sender, instance, **kwargs):
+    pending = _pending_changes()
+    pending.student_ids.add(instance.student_id)
+    pending.course_ids.add(instance.course_id)
+    # Registered every time; only the first callback to run finds anything
+    # to do. (If the transaction rolls back, what it queued is applied with
+    # the next commit, which only recomputes from committed data.)
+    transaction.on_commit(_apply_pending_changes)
@@ -0,0 +1,131 @@
+import datetime
+from unittest import skipIf
+
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+
+from core.models import User
+from students.models import Department, Student
+from faculty.models import Faculty
+from courses.models import Course
+from attendance.models import Attendance, AttendanceSummary
+from attendance.services import save_attendance
+
+
+# SQLite allows 999 parameters per statement, so Django splits bulk
+# writes there by row count whatever the code does.
+MAX_QUERY_PARAMS = connection.features.max_query_params
+SPLITS_BULK_WRITES = MAX_QUERY_PARAMS is not None and MAX_QUERY_PARAMS < 10000
+
+
+@skipIf(SPLITS_BULK_WRITES, "The database splits bulk writes of a 200-student class into several statements.")
+class SaveAttendanceQueryCountTests(TestCase):
+    """
+    save_attendance() writes a whole register in bulk, so the number of
+    queries must not grow with the size of the class.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Computer Science', code='CSE')
+        user = User.objects.create(username='FAC001', role='faculty')
+        cls.faculty = Faculty.objects.create(user=user, faculty_id='FAC001', department=cls.department)
+        cls.small_course = Course.objects.create(
+            code='CS101', title='Small Class', department=cls.department, credits=3, faculty=cls.faculty
+        )
+        cls.large_course = Course.objects.create(
+            code='CS102', title='Large Class', department=cls.department, credits=3, faculty=cls.faculty
+        )
+        users = User.objects.bulk_create(
+            [User(username=f'STU{i:03d}', role='student') for i in range(205)]
+        )
+        cls.students = Student.objects.bulk_create([
+            Student(user=user, student_id=user.username, department=cls.department, year=1, semester=1)
+            for user in users
+        ])
+        cls.date = datetime.date(2025, 1, 6)
+
+    def _register(self, students, status='present'):
+        return {student.pk: status for student in students}
+
+    def test_query_count_does_not_depend_on_class_size(self):
+        small = self._register(self.students[:5])
+        large = self._register(self.students[5:])
+
+        with CaptureQueriesContext(connection) as small_queries:
+            self.assertEqual(save_attendance(self.small_course, self.date, self.faculty, small), (5, 0))
+        with self.assertNumQueries(len(small_queries.captured_queries)):
+            self.assertEqual(save_attendance(self.large_course, self.date, self.faculty, large), (200, 0))
+
+        self.assertEqual(Attendance.objects.filter(course=self.large_course).count(), 200)
+
+    def test_resaving_a_register_does_not_depend_on_class_size(self):
+        small = self._register(self.students[:5])
+        large = self._register(self.students[5:])
+        save_attendance(self.small_course, self.date, self.faculty, small)
+        save_attendance(self.large_course, self.date, self.faculty, large)
+
+        small = self._register(self.students[:5], 'absent')
+        large = self._register(self.students[5:], 'absent')
+        with CaptureQueriesContext(connection) as small_queries:
+            self.assertEqual(save_attendance(self.small_course, self.date, self.faculty, small), (0, 5))
+        with self.assertNumQueries(len(small_queries.captured_queries)):
+            self.assertEqual(save_attendance(self.large_course, self.date, self.faculty, large), (0, 200))
+
+        self.assertEqual(Attendance.objects.filter(course=self.large_course, status='absent').count(), 200)
+        summary = AttendanceSummary.objects.get(student=self.students[5], course__isnull=True)
+        self.assertEqual((summary.total_classes, summary.absent_classes), (1, 1))
+
+
+class CascadeDeleteQueryCountTests(TestCase):
+    """
+    Deleting a course fires post_delete for each of its attendance rows;
+    the summaries must still be refreshed once, on commit, not per row.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Computer Science', code='CSE')
+        users = User.objects.bulk_create(
+            [User(username=f'STU{i:03d}', role='student') for i in range(25)]
+        )
+        cls.students = Student.objects.bulk_create([
+            Student(user=user, student_id=user.username, department=cls.department, year=1, semester=1)
+            for user in users
+        ])
+        cls.other_course = Course.objects.create(
+            code='CS100', title='Kept Course', department=cls.department, credits=3
+        )
+
+    def _course_with_attendance(self, code, students, days):
+        course = Course.objects.create(code=code, title=code, department=self.department, credits=3)
+        first_day = datetime.date(2025, 1, 6)
+        for course_ in (course, self.other_course):
+            save_attendance(course_, first_day, None, {student.pk: 'present' for student in students})
+        Attendance.objects.bulk_create([
+            Attendance(student=student, course=course, date=first_day + datetime.timedelta(days=day), status='absent')
+            for student in students for day in range(1, days)
+        ])
+        return course
+
+    def _delete(self, course):
+        with self.captureOnCommitCallbacks(execute=True):
+            course.delete()
+
+    def test_query_count_does_not_depend_on_attendance_rows(self):
+        # 10 and 100 rows: Django deletes signalled rows 100 at a time, so
+        # both courses take one DELETE and any difference is per-row work
+        small = self._course_with_attendance('CS101', self.students[:5], 2)
+        large = self._course_with_attendance('CS102', self.students[5:], 5)
+
+        with CaptureQueriesContext(connection) as small_queries:
+            self._delete(small)
+        with self.assertNumQueries(len(small_queries.captured_queries)):
+            self._delete(large)
+
+        self.assertFalse(Attendance.objects.filter(course__in=[small.pk, large.pk]).exists())
+        # The overall summaries now count only the course that is left
+        summary = AttendanceSummary.objects.get(student=self.students[5], course__isnull=True)
+        self.assertEqual((summary.total_classes, summary.present_classes), (1, 1))
+        self.assertFalse(AttendanceSummary.objects.filter(course__in=[small.pk, large.pk]).exists())
@@ -7,6 +7,9 @@ urlpatterns = [
     
     # /attendance/take/
     path('take/', views.take_attendance_view, name='take_attendance'),
+
+    # /attendance/shortage-report/
+    path('shortage-report/', views.shortage_report_view, name='attendance_shortage_report'),
     
     # We don't have views for these yet, but we'll add the URLs
     # path('edit/<int:pk>/', views.edit_attendance_view, name='edit_attendance'),
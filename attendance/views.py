@@ -1,14 +1,21 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from .models import Attendance
+from .models import Attendance, AttendanceSummary
 from students.models import Student
 from courses.models import Course
+from courses.rosters import course_roster, academic_year_for
 from faculty.models import Faculty
-from .forms import MassAttendanceForm, AttendanceRecordForm
+from .forms import MassAttendanceForm, AttendanceRecordForm, ShortageReportForm
+from .reports import shortage_rows, iter_report_lines
+from .services import save_attendance, SHORTAGE_THRESHOLD
 from django.contrib import messages
+from django.http import StreamingHttpResponse
 from django.db import transaction
 import datetime
 
+# Records shown under "Recent History" on the student dashboard
+RECENT_HISTORY_SIZE = 20
+
 @login_required
 def attendance_dashboard_view(request):
     """
@@ -17,19 +24,30 @@ def attendance_dashboard_view(request):
     if request.user.role == 'faculty':
         return redirect('take_attendance')
     else:
-        # Student view
-        attendances = Attendance.objects.filter(student__user=request.user).order_by('-date')
-        
-        # Calculate overall attendance percentage
-        total_classes = attendances.count()
-        present_classes = attendances.filter(status='present').count()
-        percentage = (present_classes / total_classes * 100) if total_classes > 0 else 0
+        # Student view: totals come from the precomputed summary rows
+        summaries = AttendanceSummary.objects.filter(student__user=request.user).select_related('course')
+        overall = None
+        course_summaries = []
+        for summary in summaries:
+            if summary.course_id is None:
+                overall = summary
+            else:
+                course_summaries.append(summary)
+        course_summaries.sort(key=lambda summary: summary.course.code or '')
+
+        attendances = (
+            Attendance.objects.filter(student__user=request.user)
+            .select_related('course', 'faculty__user')
+            .order_by('-date')[:RECENT_HISTORY_SIZE]
+        )
         
         context = {
             'attendances': attendances,
-            'total_classes': total_classes,
-            'present_classes': present_classes,
-            'percentage': round(percentage, 2),
+            'course_summaries': course_summaries,
+            'total_classes': overall.total_classes if overall else 0,
+            'present_classes': overall.present_classes if overall else 0,
+            'percentage': overall.percentage if overall else 0,
+            'shortage_threshold': SHORTAGE_THRESHOLD,
         }
         return render(request, 'attendance/student_attendance_view.html', context)
 
@@ -61,12 +79,10 @@ def take_attendance_view(request):
             if form.is_valid():
                 course = form.cleaned_data['course']
                 date = form.cleaned_data['date']
-                # Get students enrolled in this course's department and year
-                students = Student.objects.filter(
-                    department=course.department, 
-                    status='active'
-                    # You might need to filter by year/semester here too
-                )
+                # Students enrolled in this course for the term the date falls in
+                students = course_roster(course, academic_year_for(date)).select_related('user')
+                if not students:
+                    messages.info(request, "No students are enrolled in this course for that academic year.")
         
         elif 'save_attendance' in request.POST:
             # Faculty is saving the attendance data
@@ -78,27 +94,25 @@ def take_attendance_view(request):
                 date = datetime.date.fromisoformat(date_str)
                 
                 # Re-load the students to be safe
-                students = Student.objects.filter(department=course.department, status='active')
+                student_ids = course_roster(course, academic_year_for(date)).values_list('id', flat=True)
+                statuses = {
+                    student_id: request.POST.get(f'status_{student_id}')
+                    for student_id in student_ids
+                }
 
-                for student in students:
-                    status = request.POST.get(f'status_{student.id}')
-                    if status:
-                        # Update or create the attendance record
-                        Attendance.objects.update_or_create(
-                            student=student,
-                            course=course,
-                            date=date,
-                            defaults={
-                                'status': status,
-                                'faculty': faculty
-                            }
-                        )
-                
-                messages.success(request, f"Attendance for {course.title} on {date} saved successfully!")
+                # One upsert for the whole class instead of a query pair per student
+                inserted, updated = save_attendance(course, date, faculty, statuses)
+
+                messages.success(
+                    request,
+                    f"Attendance for {course.title} on {date} saved successfully! "
+                    f"({inserted} new, {updated} updated)"
+                )
                 return redirect('attendance_dashboard')
                 
-            except Exception as e:
-                messages.error(request, f"An error occurred: {e}")
+            except (Course.DoesNotExist, ValueError, TypeError):
+                # Tampered or incomplete form; nothing was saved
+                messages.error(request, "Select a valid course and date before saving attendance.")
 
     else:
         form = MassAttendanceForm(faculty=faculty)
@@ -109,4 +123,31 @@ def take_attendance_view(request):
         'course': course,
         'date': date,
     }
-    return render(request, 'attendance/take_attendance_form.html', context)
\ No newline at end of file
+    return render(request, 'attendance/take_attendance_form.html', context)
+
+@login_required
+def shortage_report_view(request):
+    """
+    Admins pick a department (or the whole college) and download every
+    student below the attendance threshold as CSV.
+    """
+    if not request.user.role == 'admin':
+        messages.error(request, "You do not have permission to view attendance reports.")
+        return redirect('dashboard')
+
+    form = ShortageReportForm(request.GET or None)
+    if 'download' in request.GET and form.is_valid():
+        data = form.cleaned_data
+        rows = shortage_rows(
+            department=data['department'],
+            date_from=data['date_from'],
+            date_to=data['date_to'],
+            threshold=data['threshold'],
+            only_shortages=data['only_shortages'],
+        )
+        scope = data['department'].code if data['department'] else 'all'
+        response = StreamingHttpResponse(iter_report_lines(rows, data['threshold']), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="attendance_shortage_{scope}_{datetime.date.today()}.csv"'
+        return response
+
+    return render(request, 'attendance/shortage_report.html', {'form': form})
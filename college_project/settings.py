@@ -149,6 +149,30 @@ DATABASES = {
 }
 
 
+# Cache
+# Shared by every web worker and management command, so the version bumps
+# in core.versioning reach all processes. The database cache needs its
+# table created once with `python manage.py createcachetable`; set
+# REDIS_URL to use Redis instead (needs the `redis` package).
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+            'OPTIONS': {
+                'MAX_ENTRIES': 100000,
+            },
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User # Import your custom User model
+from .models import User, ImportJob # Import your custom User model
 
 # Optional: Customize how the User model appears in the admin
 class CustomUserAdmin(UserAdmin):
@@ -15,4 +15,10 @@ class CustomUserAdmin(UserAdmin):
     )
 
 # Register your custom User model with the custom admin class
-admin.site.register(User, CustomUserAdmin)
\ No newline at end of file
+admin.site.register(User, CustomUserAdmin)
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'created_by', 'rows_processed', 'rows_created', 'rows_rejected', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('errors', 'started_at', 'finished_at')
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""
+Shared harness for the `benchmark_*` management commands.
+
+A benchmark seeds synthetic rows, times some code against them and rolls
+everything back in the same transaction. Nothing is ever committed, so an
+interrupted run leaves nothing behind either. Subclasses implement seed()
+and run(); both get the command's options.
+
+Correctness under concurrency (copy counts, queue order) is checked by
+the test suite, not here.
+"""
+
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import User
+from students.models import Department, Student
+
+
+class BenchmarkCommand(BaseCommand):
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG:
+            self.stdout.write(self.style.ERROR('Benchmarks can only be run in DEBUG mode.'))
+            return
+
+        with transaction.atomic():
+            start = time.perf_counter()
+            self.seed(options)
+            self.stdout.write(f'Seeded in {time.perf_counter() - start:.1f} s.')
+            self.run(options)
+            # Leave the database exactly as we found it
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        raise NotImplementedError
+
+    def run(self, options):
+        raise NotImplementedError
+
+
+def timings_ms(fn, repeat):
+    """Run `fn` `repeat` times; the timings in milliseconds, fastest first."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)
+
+
+def median_and_p95(timings):
+    return statistics.median(timings), timings[max(int(len(timings) * 0.95) - 1, 0)]
+
+
+def seed_students(count, departments=1, rng=None):
+    """
+    `count` synthetic students spread over `departments` new departments,
+    with a random year if `rng` is given (year 1 otherwise). Returns
+    (departments, students).
+    """
+    departments = Department.objects.bulk_create(
+        [Department(name=f'Benchmark Department {i}', code=f'BENCH{i:02d}') for i in range(departments)]
+    )
+    users = User.objects.bulk_create(
+        [User(username=f'BENCH{i:07d}', password='!') for i in range(count)], batch_size=2000
+    )
+    students = Student.objects.bulk_create(
+        [
+            Student(
+                user=user, student_id=user.username, semester=1,
+                department=rng.choice(departments) if rng else departments[0],
+                year=rng.randint(1, 4) if rng else 1,
+            )
+            for user in users
+        ],
+        batch_size=2000,
+    )
+    return departments, students
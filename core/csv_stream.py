@@ -0,0 +1,94 @@
+"""
+Streaming CSV reader shared by the roster importers (departments, students,
+faculty).
+
+The importers used to do csv_file.read().decode('UTF-8') and wrap the result
+in io.StringIO, which keeps the whole upload in memory twice (bytes and str).
+iter_csv_batches() instead decodes the upload chunk by chunk through a
+TextIOWrapper and hands the importer small batches of rows, so memory use
+stays flat however big the file is.
+"""
+
+import csv
+import io
+
+CSV_BATCH_SIZE = 500
+
+
+class CSVFormatError(ValueError):
+    """The upload can't be read as a CSV with the expected columns."""
+
+
+class _ChunkStream(io.RawIOBase):
+    """
+    Read-only binary stream over an iterator of byte chunks,
+    e.g. UploadedFile.chunks().
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._pending = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def open_csv_text(uploaded_file, encoding='utf-8-sig'):
+    """
+    Return a text stream that decodes the upload incrementally.
+    'utf-8-sig' also strips the BOM Excel puts in front of UTF-8 exports.
+    """
+    raw = io.BufferedReader(_ChunkStream(uploaded_file.chunks()))
+    return io.TextIOWrapper(raw, encoding=encoding, newline='')
+
+
+def iter_csv_batches(uploaded_file, required_columns=(), batch_size=CSV_BATCH_SIZE):
+    """
+    Yield lists of (line_number, row) pairs from an uploaded CSV file.
+
+    - Header names and values are stripped of surrounding whitespace.
+    - Completely blank rows are skipped.
+    - CSVFormatError is raised if a required column is missing from the
+      header or the file isn't valid UTF-8.
+    """
+    reader = csv.DictReader(open_csv_text(uploaded_file))
+    try:
+        fieldnames = [name.strip() for name in (reader.fieldnames or []) if name]
+        missing = [column for column in required_columns if column not in fieldnames]
+        if missing:
+            raise CSVFormatError(f"CSV is missing required columns: {', '.join(missing)}.")
+        reader.fieldnames = fieldnames
+
+        batch = []
+        last_line = reader.line_num
+        for row in reader:
+            # reader.line_num counts physical lines, so a quoted value that
+            # spans several lines doesn't throw off the numbers that follow.
+            line, last_line = last_line + 1, reader.line_num
+            cleaned = {
+                key: (value.strip() if isinstance(value, str) else value)
+                for key, value in row.items() if key is not None
+            }
+            if not any(cleaned.values()):
+                continue
+            batch.append((line, cleaned))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    except UnicodeDecodeError:
+        raise CSVFormatError("The file must be UTF-8 encoded.")
+    except csv.Error as e:
+        raise CSVFormatError(f"Line {reader.line_num}: {e}")
@@ -0,0 +1,287 @@
+"""
+Shared machinery for the roster CSV importers (students, faculty).
+
+Each roster row becomes a User plus a profile row (Student or Faculty).
+RosterImporter does this set-based, one chunk of rows at a time:
+departments are resolved once, existing usernames and profile IDs are
+fetched with one query per chunk, default passwords are hashed in a worker
+pool and users/profiles are written with bulk_create. A bad row is reported
+and skipped, it does not roll back the whole file.
+
+Subclasses only describe the roster: its columns, how to clean a row and
+how to build the profile object.
+"""
+
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.csv_stream import iter_csv_batches, CSVFormatError
+from core.models import User, ImportJob
+from students.models import Department
+
+# Rows written per bulk_create / transaction
+IMPORT_BATCH_SIZE = 500
+
+# PBKDF2 runs inside hashlib, which releases the GIL, so threads are enough
+# to spread the hashing over several cores.
+PASSWORD_HASH_WORKERS = 4
+
+# A running job with no progress for this long is assumed to belong to a
+# dead worker and is claimed again. Re-running is safe: rows that were
+# already written are skipped as existing.
+JOB_STALE_AFTER = datetime.timedelta(minutes=10)
+
+# ImportJob.kind -> importer class, loaded lazily so core doesn't import
+# the feature apps at startup.
+IMPORTERS = {
+    'students': 'students.importers.StudentImporter',
+    'faculty': 'faculty.importers.FacultyImporter',
+}
+
+
+def get_importer_class(kind):
+    return import_string(IMPORTERS[kind])
+
+
+class ImportReport:
+    """
+    Outcome of an import: how many rows were created, skipped (already in
+    the database) or rejected, plus the reason for every rejected row.
+    """
+
+    def __init__(self):
+        self.processed = 0
+        self.created = 0
+        self.skipped = 0
+        self.errors = []
+
+    def reject(self, line, key, message):
+        self.errors.append({'line': line, 'key': key, 'error': message})
+
+    @property
+    def rejected(self):
+        return len(self.errors)
+
+
+class RosterImporter:
+    """
+    Import a roster from batches of (line_number, row_dict) pairs, as
+    produced by core.csv_stream.iter_csv_batches().
+
+    Usage:
+        importer = StudentImporter()
+        importer.run(iter_csv_batches(csv_file, StudentImporter.columns))
+        importer.report.created
+
+    on_batch, if given, is called with the report after every batch so
+    callers can record progress.
+    """
+
+    role = None            # User.role for new accounts
+    profile_model = None   # Student / Faculty
+    id_field = None        # 'student_id' / 'faculty_id', also used as username
+    columns = ()           # Required CSV columns
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, hash_workers=PASSWORD_HASH_WORKERS, on_batch=None):
+        self.batch_size = batch_size
+        self.hash_workers = hash_workers
+        self.on_batch = on_batch
+        self.report = ImportReport()
+        self._seen_ids = set()
+        self._departments = None
+
+    def run(self, batches):
+        # One query for every department; the table is small and the CSV
+        # matches on name case-insensitively.
+        self._departments = {dept.name.lower(): dept for dept in Department.objects.all()}
+
+        with ThreadPoolExecutor(max_workers=self.hash_workers) as pool:
+            for batch in batches:
+                self._import_chunk(batch, pool)
+                if self.on_batch:
+                    self.on_batch(self.report)
+        return self.report
+
+    # --- Hooks for subclasses ---
+    def clean_row(self, line, row, cleaned):
+        """
+        Validate roster-specific columns. `cleaned` already holds the common
+        fields; add to it and return it, or reject the row and return None.
+        """
+        return cleaned
+
+    def build_profile(self, row):
+        raise NotImplementedError
+
+    # --- Stage 1: validate rows in memory ---
+    def _clean_row(self, line, row):
+        key = (row.get(self.id_field) or '').strip()
+        missing = [column for column in self.columns if not (row.get(column) or '').strip()]
+        if missing:
+            self.report.reject(line, key, f"Missing value for: {', '.join(missing)}.")
+            return None
+
+        if key in self._seen_ids:
+            self.report.reject(line, key, f"Duplicate {self.id_field} in this file.")
+            return None
+        self._seen_ids.add(key)
+
+        department = self._departments.get(row['department_name'].strip().lower())
+        if department is None:
+            self.report.reject(line, key, f"Department '{row['department_name']}' does not exist. Import departments first.")
+            return None
+
+        cleaned = {
+            'line': line,
+            'key': key,
+            'email': row['email'].strip(),
+            'first_name': row['first_name'].strip(),
+            'last_name': row['last_name'].strip(),
+            'department': department,
+            'phone': row.get('phone', '') or '',
+        }
+        return self.clean_row(line, row, cleaned)
+
+    def _import_chunk(self, chunk, pool):
+        self.report.processed += len(chunk)
+        cleaned = [row for row in (self._clean_row(line, row) for line, row in chunk) if row]
+        if not cleaned:
+            return
+
+        # --- Stage 2: one query each for what already exists ---
+        keys = [row['key'] for row in cleaned]
+        existing_profiles = set(
+            self.profile_model.objects.filter(**{f'{self.id_field}__in': keys}).values_list(self.id_field, flat=True)
+        )
+        existing_users = dict(
+            User.objects.filter(username__in=keys).values_list('username', 'id')
+        )
+        users_with_profile = set(
+            self.profile_model.objects.filter(user_id__in=existing_users.values()).values_list('user_id', flat=True)
+        )
+
+        to_create = []
+        for row in cleaned:
+            if row['key'] in existing_profiles:
+                self.report.skipped += 1
+                continue
+            user_id = existing_users.get(row['key'])
+            if user_id is not None and user_id in users_with_profile:
+                self.report.reject(row['line'], row['key'], "A user with this username already has another profile.")
+                continue
+            row['user_id'] = user_id
+            to_create.append(row)
+        if not to_create:
+            return
+
+        # --- Stage 3: hash passwords for new accounts in the worker pool ---
+        # The default password is the ID, same as the add forms.
+        new_rows = [row for row in to_create if row['user_id'] is None]
+        passwords = pool.map(make_password, [row['key'] for row in new_rows])
+
+        # --- Stage 4: bulk write the chunk ---
+        try:
+            with transaction.atomic():
+                users = [
+                    User(
+                        username=row['key'],
+                        password=password,
+                        email=row['email'],
+                        first_name=row['first_name'],
+                        last_name=row['last_name'],
+                        role=self.role,
+                        is_active=True,
+                    )
+                    for row, password in zip(new_rows, passwords)
+                ]
+                User.objects.bulk_create(users, batch_size=self.batch_size)
+                for row, user in zip(new_rows, users):
+                    row['user_id'] = user.pk
+
+                self.profile_model.objects.bulk_create(
+                    [self.build_profile(row) for row in to_create],
+                    batch_size=self.batch_size,
+                )
+        except IntegrityError as e:
+            # Someone else wrote one of these rows since we checked; reject
+            # the chunk rather than the whole file.
+            for row in to_create:
+                self.report.reject(row['line'], row['key'], f"Database error: {e}")
+            return
+
+        self.report.created += len(to_create)
+
+
+# -----------------------------------------------------------------------------
+# BACKGROUND JOBS (see core.models.ImportJob and `manage.py run_import_jobs`)
+# -----------------------------------------------------------------------------
+
+def claim_next_job():
+    """
+    Take the oldest queued job and mark it running. skip_locked lets
+    several workers poll the same table without handing out a job twice.
+    A running job whose heartbeat is older than JOB_STALE_AFTER is claimed
+    again, so a job isn't stuck forever when its worker dies.
+    """
+    now = timezone.now()
+    stale = Q(status='running') & (Q(heartbeat_at__lt=now - JOB_STALE_AFTER) | Q(heartbeat_at__isnull=True))
+    with transaction.atomic():
+        job = (
+            ImportJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='queued') | stale)
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = 'running'
+        job.started_at = now
+        job.heartbeat_at = now
+        job.save(update_fields=['status', 'started_at', 'heartbeat_at'])
+    return job
+
+
+def run_import_job(job):
+    """
+    Run one claimed job. Progress counters are written after every batch
+    with a single UPDATE so the polling endpoint can report them.
+    """
+    importer_class = get_importer_class(job.kind)
+
+    def record_progress(report):
+        ImportJob.objects.filter(pk=job.pk).update(
+            rows_processed=report.processed,
+            rows_created=report.created,
+            rows_skipped=report.skipped,
+            rows_rejected=report.rejected,
+            heartbeat_at=timezone.now(),
+        )
+
+    importer = importer_class(on_batch=record_progress)
+    report = importer.report
+    try:
+        with job.csv_file.open('rb') as csv_file:
+            importer.run(iter_csv_batches(csv_file, importer_class.columns))
+        job.status = 'done'
+        job.message = f"Imported {report.created} new rows."
+    except CSVFormatError as e:
+        job.status = 'failed'
+        job.message = f"CSV Error: {e}"
+    except Exception as e:
+        job.status = 'failed'
+        job.message = f"An unexpected error occurred: {e}"
+
+    job.rows_processed = report.processed
+    job.rows_created = report.created
+    job.rows_skipped = report.skipped
+    job.rows_rejected = report.rejected
+    job.errors = report.errors[:ImportJob.MAX_STORED_ERRORS]
+    job.finished_at = timezone.now()
+    job.save()
+    return job
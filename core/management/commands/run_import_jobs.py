@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.importers import claim_next_job, run_import_job
+
+
+class Command(BaseCommand):
+    help = 'Processes queued roster CSV imports (ImportJob rows). Runs until stopped unless --once is given.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process every queued job, then exit instead of polling for new ones.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls when the queue is empty (default: 2).',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING('Import worker started.'))
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+                continue
+
+            self.stdout.write(f'Running {job}...')
+            job = run_import_job(job)
+            style = self.style.SUCCESS if job.status == 'done' else self.style.ERROR
+            self.stdout.write(style(
+                f'{job}: {job.rows_created} created, {job.rows_skipped} skipped, '
+                f'{job.rows_rejected} rejected ({job.rows_per_second} rows/s). {job.message}'
+            ))
+        self.stdout.write(self.style.SUCCESS('Import queue is empty.'))
@@ -50,5 +50,79 @@ class User(AbstractUser):
             )
         return None
 
+# -----------------------------------------------------------------------------
+# BACKGROUND CSV IMPORTS
+# -----------------------------------------------------------------------------
+
+class ImportJob(models.Model):
+    """
+    A roster CSV upload waiting for, or being processed by, the
+    `run_import_jobs` worker. The table doubles as the job queue, so no
+    external broker is needed.
+    """
+    KIND_CHOICES = (
+        ('students', 'Students'),
+        ('faculty', 'Faculty'),
+    )
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    # Only this many rejected rows are kept for the report; rows_rejected
+    # still counts all of them.
+    MAX_STORED_ERRORS = 1000
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    csv_file = models.FileField(upload_to='imports/')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='import_jobs')
+
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_created = models.PositiveIntegerField(default=0)
+    rows_skipped = models.PositiveIntegerField(default=0)
+    rows_rejected = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    message = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Touched after every batch; a running job whose heartbeat stops was
+    # left behind by a worker that died and is handed out again.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} import #{self.pk} ({self.status})"
+
+    @property
+    def rows_per_second(self):
+        if not self.started_at:
+            return 0
+        elapsed = ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+        return round(self.rows_processed / elapsed, 1) if elapsed > 0 else 0
+
+    def as_progress(self):
+        return {
+            'id': self.pk,
+            'kind': self.kind,
+            'status': self.status,
+            'rows_processed': self.rows_processed,
+            'rows_created': self.rows_created,
+            'rows_skipped': self.rows_skipped,
+            'rows_rejected': self.rows_rejected,
+            'rows_per_second': self.rows_per_second,
+            'message': self.message,
+            'finished': self.status in ('done', 'failed'),
+        }
+
 # ALL OTHER MODELS (Department, Student, Faculty, Course, Book, etc.)
 # MUST BE CUT from this file and MOVED to their new app's models.py file.
@@ -0,0 +1,79 @@
+"""
+Keyset ("cursor") pagination helpers.
+
+OFFSET pagination gets slower the deeper you go because the database still
+has to walk every skipped row. Keyset pagination remembers the sort key of
+the last row shown and asks for rows after it, which an index on the sort
+columns answers directly on every page.
+"""
+
+import base64
+import json
+
+from django.db.models import Q
+
+
+def encode_cursor(values):
+    data = json.dumps(values, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Return the list of key values in a cursor, or None if it's missing or
+    has been tampered with.
+    """
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def _after(fields, values):
+    """
+    Build the "comes after this row" condition for an ordering, e.g. for
+    ('student_id', 'id'): student_id > a OR (student_id = a AND id > b).
+    A '-' prefix on a field means descending.
+    """
+    condition = Q()
+    for i, field in enumerate(fields):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        step = Q(**{f'{name}__{lookup}': values[i]})
+        for prev_field, prev_value in zip(fields[:i], values[:i]):
+            step &= Q(**{prev_field.lstrip('-'): prev_value})
+        condition |= step
+    return condition
+
+
+def _value(obj, field):
+    # Follow 'a__b' lookups through related objects
+    for part in field.lstrip('-').split('__'):
+        obj = getattr(obj, part)
+    return obj
+
+
+def keyset_page(queryset, ordering, cursor=None, page_size=50):
+    """
+    Return (items, next_cursor) for one page of `queryset` sorted by
+    `ordering`. The last field of `ordering` must be unique (usually 'id')
+    so the order is total. next_cursor is None on the last page.
+    """
+    queryset = queryset.order_by(*ordering)
+    values = decode_cursor(cursor)
+    if values is not None and len(values) == len(ordering):
+        queryset = queryset.filter(_after(ordering, values))
+
+    # Fetch one extra row to know whether there is another page
+    items = list(queryset[:page_size + 1])
+    has_more = len(items) > page_size
+    items = items[:page_size]
+
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor([_value(last, field) for field in ordering])
+    return items, next_cursor
@@ -0,0 +1,166 @@
+"""
+Name/ID search for Student and Faculty.
+
+Each model keeps a denormalised, lower-cased `search_text` column (name,
+email, ID, ...) that is refreshed on save. search() matches every word of
+the query against it:
+
+- On PostgreSQL the column has a pg_trgm GIN index, so each word becomes
+  an indexed word-prefix match and results are ranked by trigram word
+  similarity. This replaces the old OR-chain of icontains over a join to
+  core_user, which always ended up as a sequential scan.
+- Elsewhere (SQLite test runs) a pure-Python inverted index with prefix
+  matching is built from the column and cached until the data version
+  changes.
+
+Both backends rank exact word matches above prefix matches, as a
+`search_rank` annotation where higher is better; paginate ranked results
+by RANKED_ORDERING to keep that order.
+"""
+
+import bisect
+import re
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import Case, When, Value, IntegerField
+
+from core.versioning import get_version
+
+_TOKEN_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+# Keyset order for ranked results: best match first, 'id' breaks ties
+RANKED_ORDERING = ('-search_rank', 'id')
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or '').lower())
+
+
+def build_search_text(*values):
+    """
+    Normalise the searchable values of a row into one string. Values are
+    kept whole (so 'cs-2024-001' still matches as typed) and also split
+    into words for prefix matching.
+    """
+    parts = []
+    for value in values:
+        if not value:
+            continue
+        value = str(value).lower().strip()
+        parts.append(value)
+        words = tokenize(value)
+        if words != [value]:
+            parts.extend(words)
+    return ' '.join(parts)
+
+
+class PrefixIndex:
+    """
+    In-memory inverted index: word -> set of primary keys, with a sorted
+    word list so every word starting with a prefix is found by bisection.
+    """
+
+    def __init__(self, rows):
+        self.postings = defaultdict(set)
+        for pk, text in rows:
+            for word in tokenize(text):
+                self.postings[word].add(pk)
+        self.words = sorted(self.postings)
+
+    def _prefix_matches(self, prefix):
+        start = bisect.bisect_left(self.words, prefix)
+        for word in self.words[start:]:
+            if not word.startswith(prefix):
+                break
+            yield word
+
+    def search(self, query):
+        """
+        Return primary keys matching every query word, best first. A row
+        scores 2 for each query word it contains exactly and 1 for each it
+        only matches by prefix.
+        """
+        scores = None
+        for term in tokenize(query):
+            term_scores = {}
+            for word in self._prefix_matches(term):
+                points = 2 if word == term else 1
+                for pk in self.postings[word]:
+                    if term_scores.get(pk, 0) < points:
+                        term_scores[pk] = points
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {pk: score + term_scores[pk] for pk, score in scores.items() if pk in term_scores}
+            if not scores:
+                return []
+        if scores is None:
+            return []
+        return sorted(scores, key=lambda pk: (-scores[pk], pk))
+
+
+# (model label) -> (data version, PrefixIndex); one per process
+_python_indexes = {}
+
+
+def get_python_index(model, version_name):
+    version = get_version(version_name)
+    label = model._meta.label
+    cached = _python_indexes.get(label)
+    if cached is None or cached[0] != version:
+        rows = model.objects.values_list('pk', 'search_text').iterator(chunk_size=5000)
+        cached = (version, PrefixIndex(rows))
+        _python_indexes[label] = cached
+    return cached[1]
+
+
+def _postgres_search(queryset, query):
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    # Word-prefix match; pg_trgm can answer regular expressions from the
+    # GIN index as well as plain LIKE.
+    for term in tokenize(query):
+        queryset = queryset.filter(search_text__regex=r'(^|\s)' + re.escape(term))
+    return queryset.annotate(
+        search_rank=TrigramWordSimilarity(query.lower(), 'search_text')
+    ).order_by('-search_rank', *queryset.query.order_by or queryset.model._meta.ordering)
+
+
+# Above this many matches the query is too vague for ranking to help, so
+# the Python backend keeps the queryset's own order instead of building a
+# huge CASE expression.
+MAX_RANKED_RESULTS = 500
+
+
+def _python_search(queryset, query, version_name):
+    pks = get_python_index(queryset.model, version_name).search(query)
+    if not pks:
+        return queryset.none()
+    queryset = queryset.filter(pk__in=pks)
+    if len(pks) > MAX_RANKED_RESULTS:
+        return queryset
+    # Best match gets the highest rank, same direction as the trigram score
+    rank = Case(
+        *[When(pk=pk, then=Value(len(pks) - position)) for position, pk in enumerate(pks)],
+        output_field=IntegerField(),
+    )
+    return queryset.annotate(search_rank=rank).order_by('-search_rank')
+
+
+def is_ranked(queryset):
+    """True if `queryset` came from search() with a relevance ranking."""
+    return 'search_rank' in queryset.query.annotations
+
+
+def search(queryset, query, version_name):
+    """
+    Filter `queryset` (a model with a `search_text` column) to rows matching
+    every word of `query`, ordered best match first. `version_name` is the
+    core.versioning counter bumped when that model's rows change.
+    """
+    if not tokenize(query):
+        return queryset
+    if connection.vendor == 'postgresql':
+        return _postgres_search(queryset, query)
+    return _python_search(queryset, query, version_name)
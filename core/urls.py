@@ -7,4 +7,8 @@ urlpatterns = [
     
     # Add a specific path for the dashboard
     path('dashboard/', views.dashboard, name="dashboard"), 
+
+    # Background CSV imports: progress page and the JSON it polls
+    path('imports/<int:pk>/', views.import_job_view, name="import_job"),
+    path('imports/<int:pk>/status/', views.import_job_status, name="import_job_status"),
 ]
\ No newline at end of file
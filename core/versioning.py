@@ -0,0 +1,46 @@
+"""
+Version counters for cache invalidation.
+
+Instead of hunting down and deleting every cached entry that depends on
+some data, cache keys include a version number for that data and writers
+just bump the version. Old entries are never read again and expire on
+their own.
+
+The counters live in the shared cache (settings.CACHES), so a bump from
+one process is seen by every other web worker and management command.
+"""
+
+import time
+
+from django.core.cache import cache
+
+
+def _key(name):
+    return f'version:{name}'
+
+
+def _fresh_version():
+    # Counters start from the clock rather than 1, so a counter that was
+    # culled and starts again can't come back to a number old entries
+    # were cached under.
+    return time.time_ns() // 1000
+
+
+def get_version(name):
+    return cache.get_or_set(_key(name), _fresh_version, None)
+
+
+def bump_version(name):
+    try:
+        cache.incr(_key(name))
+    except ValueError:
+        # Key was culled; any fresh value invalidates old keys
+        cache.set(_key(name), _fresh_version(), None)
+
+
+def bump_versions(names):
+    """
+    Bump many counters with one cache call, by dropping them: the next
+    get_version() starts each from the clock, past any number it had.
+    """
+    cache.delete_many([_key(name) for name in names])
@@ -1,7 +1,9 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from .forms import RegistrationForm # Import our new form
+from .models import ImportJob
 from django.contrib import messages
 
 def landing_page(request):
@@ -11,8 +13,11 @@ def landing_page(request):
 
 @login_required
 def dashboard(request):
-    # We'll add real data here later. For now, just render the template.
     context = {}
+    if request.user.role == 'admin':
+        # Imported here so core doesn't import the feature apps at startup
+        from fees.ageing import cached_ageing_report
+        context['fee_ageing'] = cached_ageing_report()['total']
     return render(request, 'core/dashboard.html', context)
 
 def register(request):
@@ -37,4 +42,28 @@ def register(request):
 def custom_logout(request):
     logout(request)
     messages.info(request, "You have successfully logged out.")
-    return redirect('landing_page')
\ No newline at end of file
+    return redirect('landing_page')
+
+def _get_import_job(request, pk):
+    # Admins can see every import, everyone else only their own uploads
+    jobs = ImportJob.objects.all()
+    if request.user.role != 'admin':
+        jobs = jobs.filter(created_by=request.user)
+    return get_object_or_404(jobs, pk=pk)
+
+@login_required
+def import_job_view(request, pk):
+    """
+    Progress and error report for a background CSV import.
+    """
+    job = _get_import_job(request, pk)
+    back_url = 'faculty' if job.kind == 'faculty' else 'students'
+    return render(request, 'core/import_job.html', {'job': job, 'back_url': back_url})
+
+@login_required
+def import_job_status(request, pk):
+    """
+    JSON progress for the import page to poll while the worker runs.
+    """
+    job = _get_import_job(request, pk)
+    return JsonResponse(job.as_progress())
\ No newline at end of file
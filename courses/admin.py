@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Course
+from .models import Course, Enrollment
 
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
@@ -8,4 +8,11 @@ class CourseAdmin(admin.ModelAdmin):
     search_fields = ('title', 'code', 'department__name', 'faculty__user__username')
     ordering = ('code',)
 
+@admin.register(Enrollment)
+class EnrollmentAdmin(admin.ModelAdmin):
+    list_display = ('student', 'course', 'academic_year', 'semester', 'enrolled_at')
+    list_filter = ('academic_year', 'semester', 'course__department')
+    search_fields = ('student__student_id', 'student__user__first_name', 'student__user__last_name', 'course__code', 'course__title')
+    raw_id_fields = ('student', 'course')
+
 # All other models that no longer exist (like CourseAssignment) have been removed.
\ No newline at end of file
@@ -0,0 +1,77 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from courses.models import Course, Enrollment
+from courses.rosters import academic_year_for
+from students.models import Department, Student
+from timetable.grid import invalidate_timetables, student_version_name
+from timetable.models import TimetableSlot
+
+
+class Command(BaseCommand):
+    help = (
+        'Enrols a whole cohort (department, and optionally year and semester) in its courses. '
+        'By default each student is enrolled in the courses timetabled for their year and semester; '
+        'pass --course to enrol everyone in specific courses instead. Existing enrollments are left alone.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--department', required=True, help='Department code, e.g. CSE.')
+        parser.add_argument('--year', type=int, help='Only students in this year.')
+        parser.add_argument('--semester', type=int, help='Only students in this semester.')
+        parser.add_argument('--academic-year', help='e.g. 2025-2026 (default: the current academic year).')
+        parser.add_argument('--course', action='append', default=[], help='Course code to enrol in (repeatable).')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        try:
+            department = Department.objects.get(code=options['department'])
+        except Department.DoesNotExist:
+            raise CommandError(f"Department '{options['department']}' does not exist.")
+        academic_year = options['academic_year'] or academic_year_for()
+
+        students = Student.objects.filter(department=department, status='active')
+        slots = TimetableSlot.objects.filter(department=department)
+        if options['year'] is not None:
+            students = students.filter(year=options['year'])
+            slots = slots.filter(year=options['year'])
+        if options['semester'] is not None:
+            students = students.filter(semester=options['semester'])
+            slots = slots.filter(semester=options['semester'])
+
+        if options['course']:
+            courses = dict(Course.objects.filter(code__in=options['course']).values_list('code', 'id'))
+            unknown = sorted(set(options['course']) - set(courses))
+            if unknown:
+                raise CommandError(f"Unknown course codes: {', '.join(unknown)}.")
+            course_ids = set(courses.values())
+            courses_for = lambda year, semester: course_ids
+        else:
+            # (year, semester) -> course ids on that cohort's timetable
+            cohort_courses = defaultdict(set)
+            for year, semester, course_id in slots.values_list('year', 'semester', 'course_id').distinct():
+                cohort_courses[(year, semester)].add(course_id)
+            courses_for = lambda year, semester: cohort_courses.get((year, semester), ())
+
+        enrollments = [
+            Enrollment(student_id=student_id, course_id=course_id, academic_year=academic_year, semester=semester)
+            for student_id, year, semester in students.values_list('id', 'year', 'semester')
+            for course_id in courses_for(year, semester)
+        ]
+        if not enrollments:
+            self.stdout.write(self.style.WARNING('Nothing to enrol: no matching students or courses.'))
+            return
+
+        existing = Enrollment.objects.filter(academic_year=academic_year, student__in=students)
+        before = existing.count()
+        Enrollment.objects.bulk_create(enrollments, batch_size=1000, ignore_conflicts=True)
+        created = existing.count() - before
+        # bulk_create skips the signals that refresh students' timetables
+        invalidate_timetables({student_version_name(enrollment.student_id) for enrollment in enrollments})
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{department.code} {academic_year}: {created} enrollments created, "
+            f"{len(enrollments) - created} already existed."
+        ))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_remove_courseassignment_course_and_more'),
+        ('students', '0004_student_search_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Enrollment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('academic_year', models.CharField(help_text='e.g., 2024-2025', max_length=9, verbose_name='Academic Year')),
+                ('semester', models.IntegerField(verbose_name='Semester')),
+                ('enrolled_at', models.DateTimeField(auto_now_add=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='courses.course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Enrollment',
+                'verbose_name_plural': 'Enrollments',
+                'ordering': ['course', 'student'],
+                'indexes': [models.Index(fields=['course', 'academic_year', 'semester'], name='courses_enrol_course_term_idx')],
+                'unique_together': {('student', 'course', 'academic_year', 'semester')},
+            },
+        ),
+    ]
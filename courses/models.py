@@ -1,5 +1,5 @@
 from django.db import models
-from students.models import Department
+from students.models import Department, Student
 from faculty.models import Faculty
 from django.utils.translation import gettext_lazy as _
 
@@ -39,4 +39,32 @@ class Course(models.Model):
         ordering = ['code']
 
     def __str__(self):
-        return f"{self.code} - {self.title}"
\ No newline at end of file
+        return f"{self.code} - {self.title}"
+
+
+class Enrollment(models.Model):
+    """
+    A student taking a course in a given term. Attendance, result and
+    timetable rosters are read from here instead of "everyone in the
+    course's department".
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='enrollments')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='enrollments')
+
+    academic_year = models.CharField(max_length=9, verbose_name=_("Academic Year"), help_text="e.g., 2024-2025")
+    semester = models.IntegerField(verbose_name=_("Semester"))
+
+    enrolled_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Enrollment")
+        verbose_name_plural = _("Enrollments")
+        unique_together = ('student', 'course', 'academic_year', 'semester')
+        indexes = [
+            # Roster lookups: every student in a course for a term
+            models.Index(fields=['course', 'academic_year', 'semester'], name='courses_enrol_course_term_idx'),
+        ]
+        ordering = ['course', 'student']
+
+    def __str__(self):
+        return f"{self.student} - {self.course.code} ({self.academic_year}, Sem {self.semester})"
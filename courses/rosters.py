@@ -0,0 +1,56 @@
+"""
+Who takes a course: roster lookups backed by the Enrollment table.
+
+Each lookup is one query that the (course, academic_year, semester) index
+on Enrollment answers directly.
+"""
+
+import datetime
+
+from django.db.models import Case, CharField, Value, When
+from django.db.models.functions import Cast, Concat, ExtractYear
+
+from students.models import Student
+
+# The academic year runs June to May, e.g. 2025-2026 starts in June 2025.
+ACADEMIC_YEAR_START_MONTH = 6
+
+
+def academic_year_for(date=None):
+    date = date or datetime.date.today()
+    start = date.year if date.month >= ACADEMIC_YEAR_START_MONTH else date.year - 1
+    return f"{start}-{start + 1}"
+
+
+def academic_year_expression(date_field):
+    """academic_year_for() of `date_field` as a database expression."""
+    start = Case(
+        When(**{f'{date_field}__month__gte': ACADEMIC_YEAR_START_MONTH}, then=ExtractYear(date_field)),
+        default=ExtractYear(date_field) - 1,
+    )
+    return Concat(
+        Cast(start, CharField()), Value('-'), Cast(start + 1, CharField()),
+        output_field=CharField(),
+    )
+
+
+def academic_year_dates(academic_year):
+    """(first day, last day) of an academic year like '2025-2026'."""
+    start = int(academic_year.split('-')[0])
+    first = datetime.date(start, ACADEMIC_YEAR_START_MONTH, 1)
+    last = datetime.date(start + 1, ACADEMIC_YEAR_START_MONTH, 1) - datetime.timedelta(days=1)
+    return first, last
+
+
+def course_roster(course, academic_year=None, semester=None):
+    """
+    Active students enrolled in `course` for a term. `academic_year`
+    defaults to the current one; `semester` narrows it further if given.
+    """
+    enrollment_filter = {
+        'enrollments__course': course,
+        'enrollments__academic_year': academic_year or academic_year_for(),
+    }
+    if semester is not None:
+        enrollment_filter['enrollments__semester'] = semester
+    return Student.objects.filter(status='active', **enrollment_filter).distinct()
@@ -1,5 +1,6 @@
-from django.contrib import admin
-from .models import Exam, Result
+from django.contrib import admin, messages
+from .models import Exam, Result, GradingScheme, GradeBoundary, Transcript
+from .grading import regrade_exams
 
 @admin.register(Exam)
 class ExamAdmin(admin.ModelAdmin):
@@ -8,13 +9,51 @@ class ExamAdmin(admin.ModelAdmin):
     search_fields = ('name', 'course__title', 'course__code')
     autocomplete_fields = ('course',)
     date_hierarchy = 'exam_date'
+    actions = ['regrade']
+
+    @admin.action(description="Regrade selected exams")
+    def regrade(self, request, queryset):
+        count = regrade_exams(queryset)
+        self.message_user(request, f"Regraded {count} exams.", messages.SUCCESS)
 
 @admin.register(Result)
 class ResultAdmin(admin.ModelAdmin):
-    list_display = ('student', 'exam', 'marks_obtained', 'grade', 'is_pass')
+    list_display = ('student', 'exam', 'marks_obtained', 'grade', 'grade_points', 'is_pass')
     list_filter = ('exam__course__department', 'exam__exam_type', 'is_pass')
     search_fields = (
         'student__user__username', 'student__student_id', 
         'exam__name', 'exam__course__title'
     )
-    autocomplete_fields = ('student', 'exam')
\ No newline at end of file
+    autocomplete_fields = ('student', 'exam')
+
+
+class GradeBoundaryInline(admin.TabularInline):
+    model = GradeBoundary
+    extra = 1
+
+
+@admin.register(GradingScheme)
+class GradingSchemeAdmin(admin.ModelAdmin):
+    list_display = ('name', 'department', 'exam_type', 'method', 'pass_percentage')
+    list_filter = ('method', 'exam_type', 'department')
+    inlines = [GradeBoundaryInline]
+    actions = ['regrade']
+
+    @admin.action(description="Regrade exams that use the selected schemes")
+    def regrade(self, request, queryset):
+        exams = Exam.objects.all()
+        # Narrow down when every selected scheme is for one department
+        departments = {scheme.department_id for scheme in queryset}
+        if None not in departments:
+            exams = exams.filter(course__department__in=departments)
+        count = regrade_exams(exams, only_schemes=queryset)
+        self.message_user(request, f"Regraded {count} exams.", messages.SUCCESS)
+
+
+@admin.register(Transcript)
+class TranscriptAdmin(admin.ModelAdmin):
+    list_display = ('student', 'academic_year', 'semester', 'credits', 'sgpa', 'cumulative_credits', 'cgpa', 'updated_at')
+    list_filter = ('academic_year', 'semester', 'student__department')
+    search_fields = ('student__student_id', 'student__user__first_name', 'student__user__last_name')
+    raw_id_fields = ('student',)
+    readonly_fields = ('credits', 'credit_points', 'sgpa', 'cumulative_credits', 'cgpa', 'updated_at')
@@ -0,0 +1,94 @@
+"""
+Per-exam statistics (mean, median, spread, percentiles, pass rate,
+histogram and grade counts).
+
+A summary is computed from one query that fetches the exam's marks, in a
+single pass over the list, and cached under the exam's results version.
+Anything that writes results for the exam bumps that version (see
+exams.signals and exams.services), so the next request recomputes it.
+"""
+
+import statistics
+from collections import Counter
+
+from django.core.cache import cache
+
+from core.versioning import get_version, bump_version
+
+ANALYTICS_CACHE_TIMEOUT = 60 * 60 * 24
+HISTOGRAM_BINS = 10
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def results_version_name(exam_id):
+    return f'exam-results:{exam_id}'
+
+
+def invalidate_exam_analytics(exam_id):
+    bump_version(results_version_name(exam_id))
+
+
+def _percentile(ordered, p):
+    # Linear interpolation between closest ranks, like numpy's default
+    position = (len(ordered) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _histogram(ordered, max_marks):
+    """HISTOGRAM_BINS equal-width bins over 0..max_marks; the last bin includes max_marks."""
+    width = max_marks / HISTOGRAM_BINS if max_marks else 1
+    counts = [0] * HISTOGRAM_BINS
+    for mark in ordered:
+        counts[min(int(mark / width), HISTOGRAM_BINS - 1)] += 1
+    return [
+        {
+            'from': round(i * width, 2),
+            'to': round((i + 1) * width, 2),
+            'count': count,
+        }
+        for i, count in enumerate(counts)
+    ]
+
+
+def compute_summary(exam):
+    rows = list(exam.results.values_list('marks_obtained', 'is_pass', 'grade'))
+    summary = {
+        'exam_id': exam.pk,
+        'exam': exam.name,
+        'course': exam.course.code,
+        'max_marks': exam.max_marks,
+        'count': len(rows),
+    }
+    if not rows:
+        return summary
+
+    ordered = sorted(mark for mark, is_pass, grade in rows)
+    passed = sum(1 for mark, is_pass, grade in rows if is_pass)
+    mean = statistics.fmean(ordered)
+    summary.update({
+        'mean': round(mean, 2),
+        'mean_percentage': round(mean / exam.max_marks * 100, 2) if exam.max_marks else None,
+        'median': statistics.median(ordered),
+        'std_dev': round(statistics.pstdev(ordered, mean), 2),
+        'min': ordered[0],
+        'max': ordered[-1],
+        'percentiles': {str(p): round(_percentile(ordered, p), 2) for p in PERCENTILES},
+        'pass_count': passed,
+        'pass_rate': round(passed / len(rows) * 100, 2),
+        'histogram': _histogram(ordered, exam.max_marks),
+        'grades': dict(sorted(Counter(grade for mark, is_pass, grade in rows if grade).items())),
+    })
+    return summary
+
+
+def exam_summary(exam):
+    """The cached summary for `exam`, recomputed after its results change."""
+    version = get_version(results_version_name(exam.pk))
+    key = f'exam-analytics:{exam.pk}:{version}'
+    summary = cache.get(key)
+    if summary is None:
+        summary = compute_summary(exam)
+        cache.set(key, summary, ANALYTICS_CACHE_TIMEOUT)
+    return summary
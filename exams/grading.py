@@ -0,0 +1,164 @@
+"""
+Grading engine: turns an exam's marks into grades and pass/fail using the
+GradingScheme that applies to it.
+
+Whatever the method, a scheme boils down to one minimum mark per grade for
+a given exam:
+
+- absolute: the boundary's percentage of max_marks;
+- relative: the lowest mark whose percentile rank within the exam reaches
+  the boundary. Ranks are worked out once over the sorted marks, for each
+  distinct mark, with bisection.
+
+Those cutoffs are then applied to every result of the exam in a single
+UPDATE ... SET grade = CASE ..., so (re)grading an exam is at most two
+queries however many students sat it (plus the transcript refresh for
+exams that count towards the GPA).
+"""
+
+import bisect
+
+from django.db.models import Case, When, Value, Q, CharField, BooleanField, DecimalField
+
+from .analytics import invalidate_exam_analytics
+from .models import GradingScheme, Result
+from .transcripts import TRANSCRIPT_EXAM_TYPES, refresh_transcripts
+
+
+def _specificity(scheme):
+    # Department beats exam type; either beats the college-wide default
+    return (scheme.department_id is not None, scheme.exam_type != '')
+
+
+def scheme_for(exam, schemes=None):
+    """
+    The most specific scheme for `exam`, or None. Pass `schemes` (with
+    boundaries prefetched) to resolve many exams without a query each.
+    """
+    department_id = exam.course.department_id
+    if schemes is None:
+        schemes = GradingScheme.objects.filter(
+            Q(department_id=department_id) | Q(department__isnull=True),
+            Q(exam_type=exam.exam_type) | Q(exam_type=''),
+        ).prefetch_related('boundaries')
+    candidates = [
+        scheme for scheme in schemes
+        if scheme.department_id in (department_id, None) and scheme.exam_type in (exam.exam_type, '')
+    ]
+    return max(candidates, key=_specificity, default=None)
+
+
+def percentile_ranks(marks):
+    """
+    {mark: percentile rank} for each distinct mark: the share of the exam
+    scoring at or below it, so the top scorer is at 100.
+    """
+    ordered = sorted(marks)
+    total = len(ordered)
+    return {mark: bisect.bisect_right(ordered, mark) / total * 100 for mark in set(ordered)}
+
+
+class Grader:
+    def __init__(self, scheme):
+        self.scheme = scheme
+        # Best grade first
+        self.boundaries = sorted(scheme.boundaries.all(), key=lambda boundary: boundary.min_value, reverse=True)
+        self.grade_points = {boundary.grade: boundary.grade_points for boundary in self.boundaries}
+
+    def pass_mark(self, max_marks):
+        return self.scheme.pass_percentage * max_marks / 100
+
+    def cutoffs(self, max_marks, marks=()):
+        """
+        [(grade, minimum marks)], best grade first. A result gets the first
+        grade whose minimum it reaches. For relative schemes `marks` are all
+        the marks in the exam; a grade no mark qualifies for is left out.
+        """
+        if self.scheme.method == 'absolute':
+            return [(boundary.grade, boundary.min_value * max_marks / 100) for boundary in self.boundaries]
+
+        if not marks:
+            return []
+        ranks = percentile_ranks(marks)
+        distinct = sorted(ranks)
+        rank_values = [ranks[mark] for mark in distinct]  # ascending, like the marks
+        cutoffs = []
+        for boundary in self.boundaries:
+            index = bisect.bisect_left(rank_values, boundary.min_value)
+            if index < len(distinct):
+                cutoffs.append((boundary.grade, distinct[index]))
+        return cutoffs
+
+    def grade(self, obtained, cutoffs):
+        for grade, minimum in cutoffs:
+            if obtained >= minimum:
+                return grade
+        return None
+
+
+def grade_exam(exam, scheme=None):
+    """
+    Set grade, grade_points and is_pass on every result of `exam` with one
+    UPDATE, then refresh the affected transcripts.
+    If no scheme applies, grades given by an earlier scheme are cleared
+    and is_pass keeps the default pass mark set on entry.
+    Returns the number of results updated.
+    """
+    return _apply_scheme(exam, scheme or scheme_for(exam))
+
+
+def _apply_scheme(exam, scheme):
+    results = Result.objects.filter(exam=exam)
+    if scheme is None:
+        # The scheme was deleted or no longer covers this exam
+        updated = results.update(grade=None, grade_points=None)
+    else:
+        updated = _grade_results(exam, scheme, results)
+    invalidate_exam_analytics(exam.pk)
+    if exam.exam_type in TRANSCRIPT_EXAM_TYPES:
+        refresh_transcripts(results.values('student_id'))
+    return updated
+
+
+def _grade_results(exam, scheme, results):
+    grader = Grader(scheme)
+    marks = list(results.values_list('marks_obtained', flat=True)) if scheme.method == 'relative' else ()
+    cutoffs = grader.cutoffs(exam.max_marks, marks)
+
+    return results.update(
+        grade=Case(
+            *[When(marks_obtained__gte=minimum, then=Value(grade)) for grade, minimum in cutoffs],
+            default=Value(None),
+            output_field=CharField(),
+        ),
+        grade_points=Case(
+            *[When(marks_obtained__gte=minimum, then=Value(grader.grade_points[grade])) for grade, minimum in cutoffs],
+            default=Value(None),
+            output_field=DecimalField(max_digits=4, decimal_places=2),
+        ),
+        is_pass=Case(
+            When(marks_obtained__gte=grader.pass_mark(exam.max_marks), then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        ),
+    )
+
+
+def regrade_exams(exams, only_schemes=None):
+    """
+    Regrade a queryset of exams, e.g. after a scheme's boundaries changed.
+    Schemes are loaded once; with `only_schemes`, exams resolving to any
+    other scheme (or none) are skipped. Returns the number of exams
+    regraded.
+    """
+    schemes = list(GradingScheme.objects.prefetch_related('boundaries'))
+    allowed = {scheme.pk for scheme in only_schemes} if only_schemes is not None else None
+
+    regraded = 0
+    for exam in exams.select_related('course'):
+        scheme = scheme_for(exam, schemes)
+        if allowed is not None and (scheme is None or scheme.pk not in allowed):
+            continue
+        _apply_scheme(exam, scheme)
+        regraded += 1
+    return regraded
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.rosters import academic_year_for
+from exams.marksheets import generate_marksheets, marksheet_dir
+from students.models import Department
+
+
+class Command(BaseCommand):
+    help = (
+        'Renders printable mark-sheets for an academic year into MEDIA_ROOT/marksheets/, '
+        'in parallel. Sheets whose results haven\'t changed since the last run are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--academic-year', help='e.g. 2025-2026 (default: the current academic year).')
+        parser.add_argument('--department', help='Department code (default: every department).')
+        parser.add_argument('--workers', type=int, help='Worker processes (default: one per CPU).')
+        parser.add_argument('--force', action='store_true', help='Re-render every sheet, changed or not.')
+
+    def handle(self, *args, **options):
+        academic_year = options['academic_year'] or academic_year_for()
+        department = None
+        if options['department']:
+            try:
+                department = Department.objects.get(code=options['department'])
+            except Department.DoesNotExist:
+                raise CommandError(f"Department '{options['department']}' does not exist.")
+
+        report = generate_marksheets(academic_year, department, workers=options['workers'], force=options['force'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{report.rendered} sheets rendered, {report.skipped} unchanged, "
+            f"in {report.seconds:.1f} s ({report.pages_per_second} pages/s). "
+            f"Output: {marksheet_dir(academic_year)}"
+        ))
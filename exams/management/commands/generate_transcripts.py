@@ -0,0 +1,47 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from exams.models import Transcript
+from exams.transcripts import rebuild_department_transcripts
+from students.models import Department
+
+
+class Command(BaseCommand):
+    help = (
+        'Regenerates SGPA/CGPA transcripts for every student in a department (or all departments) '
+        'and optionally writes them to a CSV file.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--department', help='Department code (default: every department).')
+        parser.add_argument('--output', help='Also write the transcripts to this CSV file.')
+
+    def handle(self, *args, **options):
+        departments = Department.objects.all()
+        if options['department']:
+            departments = departments.filter(code=options['department'])
+            if not departments:
+                raise CommandError(f"Department '{options['department']}' does not exist.")
+
+        for department in departments:
+            count = rebuild_department_transcripts(department)
+            self.stdout.write(f"{department.code}: {count} transcript rows.")
+
+        if options['output']:
+            transcripts = (
+                Transcript.objects.filter(student__department__in=departments)
+                .select_related('student__user', 'student__department')
+                .order_by('student__department__code', 'student__student_id', 'academic_year', 'semester')
+            )
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                writer = csv.writer(output)
+                writer.writerow(['department', 'student_id', 'student_name', 'academic_year', 'semester', 'credits', 'sgpa', 'cumulative_credits', 'cgpa'])
+                for transcript in transcripts.iterator(chunk_size=2000):
+                    student = transcript.student
+                    writer.writerow([
+                        student.department.code, student.student_id, student.user.get_full_name(),
+                        transcript.academic_year, transcript.semester, transcript.credits,
+                        transcript.sgpa, transcript.cumulative_credits, transcript.cgpa,
+                    ])
+            self.stdout.write(self.style.SUCCESS(f"Wrote transcripts to {options['output']}."))
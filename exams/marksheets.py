@@ -0,0 +1,188 @@
+"""
+Printable mark-sheets.
+
+One self-contained HTML page per student and academic year, with every
+result from that year and the year's SGPA/CGPA, written to
+
+    MEDIA_ROOT/marksheets/<academic year>/<department code>/<student id>.html
+
+The database is read once, in the parent process, into plain dicts. The
+pages are rendered and written by a ProcessPoolExecutor, since template
+rendering is CPU-bound Python and threads would serialise on the GIL.
+
+Each sheet's inputs (and the template itself) are hashed. The hashes are
+kept in a manifest.json next to the sheets, and a sheet whose hash hasn't
+changed since the last run is not rendered again.
+
+There is no PDF library in this project, so sheets are HTML with print
+styles (one A4 page each); print or "save as PDF" from a browser.
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+
+from django.conf import settings
+from django.db import connections
+from django.template.loader import get_template, render_to_string
+
+from courses.rosters import academic_year_dates
+from .models import Result, Transcript
+
+MARKSHEET_TEMPLATE = 'exams/marksheet.html'
+MANIFEST_NAME = 'manifest.json'
+
+
+def marksheet_dir(academic_year):
+    return os.path.join(settings.MEDIA_ROOT, 'marksheets', academic_year)
+
+
+def _safe_name(value):
+    # IDs are used as file names, so keep them to safe characters
+    return ''.join(c if c.isalnum() or c in '-_' else '_' for c in str(value))
+
+
+def marksheet_path(department_code, student_id):
+    """Path of a sheet relative to marksheet_dir()."""
+    return os.path.join(_safe_name(department_code or 'none'), f"{_safe_name(student_id)}.html")
+
+
+def collect_sheets(academic_year, department=None):
+    """
+    Yield one plain-data sheet per student with results in
+    `academic_year`, reading results and transcripts with one query each.
+    """
+    first, last = academic_year_dates(academic_year)
+    results = Result.objects.filter(exam__exam_date__range=(first, last))
+    transcripts = Transcript.objects.filter(academic_year=academic_year)
+    if department is not None:
+        results = results.filter(student__department=department)
+        transcripts = transcripts.filter(student__department=department)
+
+    terms = {}
+    for transcript in transcripts.order_by('semester'):
+        terms.setdefault(transcript.student_id, []).append({
+            'semester': transcript.semester,
+            'credits': transcript.credits,
+            'sgpa': str(transcript.sgpa),
+            'cgpa': str(transcript.cgpa),
+        })
+
+    results = (
+        results.select_related('student__user', 'student__department', 'exam__course')
+        .order_by('student_id', 'exam__exam_date', 'exam__course__code', 'exam_id')
+    )
+    for student_id, student_results in groupby(results.iterator(chunk_size=2000), key=lambda result: result.student_id):
+        student_results = list(student_results)
+        student = student_results[0].student
+        department_code = student.department.code if student.department_id else ''
+        yield {
+            'path': marksheet_path(department_code, student.student_id),
+            'academic_year': academic_year,
+            'student': {
+                'student_id': student.student_id,
+                'name': student.user.get_full_name(),
+                'department': student.department.name if student.department_id else '',
+                'year': student.year,
+                'semester': student.semester,
+            },
+            'results': [
+                {
+                    'course_code': result.exam.course.code,
+                    'course_title': result.exam.course.title,
+                    'credits': result.exam.course.credits,
+                    'exam': result.exam.name,
+                    'exam_type': result.exam.get_exam_type_display(),
+                    'exam_date': result.exam.exam_date.isoformat(),
+                    'max_marks': result.exam.max_marks,
+                    'marks': result.marks_obtained,
+                    'grade': result.grade or '',
+                    'is_pass': result.is_pass,
+                }
+                for result in student_results
+            ],
+            'terms': terms.get(student_id, []),
+        }
+
+
+def _template_hash():
+    with open(get_template(MARKSHEET_TEMPLATE).origin.name, 'rb') as template:
+        return hashlib.sha256(template.read()).hexdigest()
+
+
+def sheet_hash(sheet, template_hash):
+    data = json.dumps(sheet, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256((template_hash + data).encode()).hexdigest()
+
+
+def _render_sheet(task):
+    # Runs in a worker process: no database access, just render and write.
+    output_dir, sheet = task
+    path = os.path.join(output_dir, sheet['path'])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    html = render_to_string(MARKSHEET_TEMPLATE, {'sheet': sheet})
+    with open(path, 'w', encoding='utf-8') as output:
+        output.write(html)
+    return sheet['path']
+
+
+def _init_worker():
+    # Spawned (non-fork) workers start with an unconfigured Django
+    import django
+    django.setup()
+
+
+class MarksheetReport:
+    def __init__(self):
+        self.rendered = 0
+        self.skipped = 0
+        self.seconds = 0.0
+
+    @property
+    def pages_per_second(self):
+        return round(self.rendered / self.seconds, 1) if self.seconds else 0
+
+
+def generate_marksheets(academic_year, department=None, workers=None, force=False):
+    """
+    Render every changed mark-sheet for `academic_year` (optionally one
+    department) and return a MarksheetReport.
+    """
+    report = MarksheetReport()
+    start = time.perf_counter()
+
+    output_dir = marksheet_dir(academic_year)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        manifest = {}
+
+    template_hash = _template_hash()
+    tasks = []
+    for sheet in collect_sheets(academic_year, department):
+        digest = sheet_hash(sheet, template_hash)
+        unchanged = manifest.get(sheet['path']) == digest and os.path.exists(os.path.join(output_dir, sheet['path']))
+        if unchanged and not force:
+            report.skipped += 1
+            continue
+        manifest[sheet['path']] = digest
+        tasks.append((output_dir, sheet))
+
+    if tasks:
+        # Don't hand open database connections to forked workers
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for _ in pool.map(_render_sheet, tasks, chunksize=32):
+                report.rendered += 1
+
+        os.makedirs(output_dir, exist_ok=True)
+        with open(manifest_path, 'w', encoding='utf-8') as manifest_file:
+            json.dump(manifest, manifest_file, indent=0, sort_keys=True)
+
+    report.seconds = time.perf_counter() - start
+    return report
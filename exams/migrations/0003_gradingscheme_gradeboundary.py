@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0002_remove_examresult_examination_and_more'),
+        ('students', '0004_student_search_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradingScheme',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Scheme Name')),
+                ('exam_type', models.CharField(blank=True, choices=[('midterm_1', 'Mid-Term 1'), ('midterm_2', 'Mid-Term 2'), ('final', 'Final Exam'), ('sessional', 'Sessional'), ('practical', 'Practical')], help_text='Leave empty to use for every exam type', max_length=20, verbose_name='Exam Type')),
+                ('method', models.CharField(choices=[('absolute', 'Absolute (percentage of max marks)'), ('relative', 'Relative (percentile within the exam)')], default='absolute', max_length=10, verbose_name='Grading Method')),
+                ('pass_percentage', models.DecimalField(decimal_places=2, default=50, help_text='Minimum percentage of max marks to pass, whatever the method', max_digits=5, verbose_name='Pass Percentage')),
+                ('department', models.ForeignKey(blank=True, help_text='Leave empty for a college-wide scheme', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='grading_schemes', to='students.department')),
+            ],
+            options={
+                'verbose_name': 'Grading Scheme',
+                'verbose_name_plural': 'Grading Schemes',
+                'ordering': ['department', 'exam_type'],
+                'unique_together': {('department', 'exam_type')},
+            },
+        ),
+        migrations.CreateModel(
+            name='GradeBoundary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grade', models.CharField(max_length=5, verbose_name='Grade')),
+                ('min_value', models.DecimalField(decimal_places=2, help_text='Minimum percentage of max marks (absolute) or minimum percentile (relative) for this grade', max_digits=5, verbose_name='Lower Bound')),
+                ('grade_points', models.DecimalField(decimal_places=2, default=0, max_digits=4, verbose_name='Grade Points')),
+                ('scheme', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='boundaries', to='exams.gradingscheme')),
+            ],
+            options={
+                'verbose_name': 'Grade Boundary',
+                'verbose_name_plural': 'Grade Boundaries',
+                'ordering': ['scheme', '-min_value'],
+                'unique_together': {('scheme', 'grade')},
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0003_gradingscheme_gradeboundary'),
+        ('students', '0004_student_search_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='result',
+            name='grade_points',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text="Set by the grading engine from the grade's boundary", max_digits=4, null=True, verbose_name='Grade Points'),
+        ),
+        migrations.CreateModel(
+            name='Transcript',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('academic_year', models.CharField(max_length=9, verbose_name='Academic Year')),
+                ('semester', models.IntegerField(verbose_name='Semester')),
+                ('credits', models.PositiveIntegerField(default=0, verbose_name='Credits')),
+                ('credit_points', models.DecimalField(decimal_places=2, default=0, max_digits=8, verbose_name='Credit Points')),
+                ('sgpa', models.DecimalField(decimal_places=2, default=0, max_digits=4, verbose_name='SGPA')),
+                ('cumulative_credits', models.PositiveIntegerField(default=0, verbose_name='Cumulative Credits')),
+                ('cgpa', models.DecimalField(decimal_places=2, default=0, max_digits=4, verbose_name='CGPA')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transcripts', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Transcript',
+                'verbose_name_plural': 'Transcripts',
+                'ordering': ['student', 'academic_year', 'semester'],
+                'unique_together': {('student', 'academic_year', 'semester')},
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0004_result_grade_points_transcript'),
+        ('students', '0004_student_search_text'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='gradingscheme',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='gradingscheme',
+            constraint=models.UniqueConstraint(fields=('department', 'exam_type'), name='grading_scheme_unique_department'),
+        ),
+        migrations.AddConstraint(
+            model_name='gradingscheme',
+            constraint=models.UniqueConstraint(condition=models.Q(('department__isnull', True)), fields=('exam_type',), name='grading_scheme_unique_college_wide'),
+        ),
+    ]
@@ -1,5 +1,5 @@
 from django.db import models
-from students.models import Student
+from students.models import Student, Department
 from courses.models import Course
 from django.utils.translation import gettext_lazy as _
 
@@ -36,6 +36,7 @@ class Result(models.Model):
     
     # A grade, if your system uses them (e.g., A+, B, C)
     grade = models.CharField(max_length=5, blank=True, null=True, verbose_name=_("Grade"))
+    grade_points = models.DecimalField(max_digits=4, decimal_places=2, blank=True, null=True, verbose_name=_("Grade Points"), help_text="Set by the grading engine from the grade's boundary")
     
     # Pass/Fail status
     is_pass = models.BooleanField(default=True, verbose_name=_("Pass/Fail Status"))
@@ -47,4 +48,85 @@ class Result(models.Model):
         ordering = ['exam', 'student']
 
     def __str__(self):
-        return f"{self.student} - {self.exam}: {self.marks_obtained}"
\ No newline at end of file
+        return f"{self.student} - {self.exam}: {self.marks_obtained}"
+
+
+class GradingScheme(models.Model):
+    """
+    How marks turn into grades for a department and/or exam type. The most
+    specific scheme wins: department + exam type, then department, then
+    exam type, then the college-wide default (both left empty).
+    """
+    METHOD_CHOICES = [
+        ('absolute', 'Absolute (percentage of max marks)'),
+        ('relative', 'Relative (percentile within the exam)'),
+    ]
+
+    name = models.CharField(max_length=100, verbose_name=_("Scheme Name"))
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, null=True, blank=True, related_name='grading_schemes', help_text="Leave empty for a college-wide scheme")
+    exam_type = models.CharField(max_length=20, choices=Exam.EXAM_TYPE_CHOICES, blank=True, verbose_name=_("Exam Type"), help_text="Leave empty to use for every exam type")
+
+    method = models.CharField(max_length=10, choices=METHOD_CHOICES, default='absolute', verbose_name=_("Grading Method"))
+    pass_percentage = models.DecimalField(max_digits=5, decimal_places=2, default=50, verbose_name=_("Pass Percentage"), help_text="Minimum percentage of max marks to pass, whatever the method")
+
+    class Meta:
+        verbose_name = _("Grading Scheme")
+        verbose_name_plural = _("Grading Schemes")
+        ordering = ['department', 'exam_type']
+        constraints = [
+            models.UniqueConstraint(fields=['department', 'exam_type'], name='grading_scheme_unique_department'),
+            # NULLs never clash in a unique constraint, so college-wide
+            # schemes need their own
+            models.UniqueConstraint(fields=['exam_type'], condition=models.Q(department__isnull=True), name='grading_scheme_unique_college_wide'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class GradeBoundary(models.Model):
+    scheme = models.ForeignKey(GradingScheme, on_delete=models.CASCADE, related_name='boundaries')
+    grade = models.CharField(max_length=5, verbose_name=_("Grade"))
+    min_value = models.DecimalField(
+        max_digits=5, decimal_places=2, verbose_name=_("Lower Bound"),
+        help_text="Minimum percentage of max marks (absolute) or minimum percentile (relative) for this grade"
+    )
+    grade_points = models.DecimalField(max_digits=4, decimal_places=2, default=0, verbose_name=_("Grade Points"))
+
+    class Meta:
+        verbose_name = _("Grade Boundary")
+        verbose_name_plural = _("Grade Boundaries")
+        unique_together = ('scheme', 'grade')
+        ordering = ['scheme', '-min_value']
+
+    def __str__(self):
+        return f"{self.grade} >= {self.min_value}"
+
+
+class Transcript(models.Model):
+    """
+    Materialised SGPA/CGPA for one student and term, computed from graded
+    results by exams.transcripts. Don't edit by hand; it is recomputed
+    whenever the student's results change.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='transcripts')
+    academic_year = models.CharField(max_length=9, verbose_name=_("Academic Year"))
+    semester = models.IntegerField(verbose_name=_("Semester"))
+
+    credits = models.PositiveIntegerField(default=0, verbose_name=_("Credits"))
+    credit_points = models.DecimalField(max_digits=8, decimal_places=2, default=0, verbose_name=_("Credit Points"))
+    sgpa = models.DecimalField(max_digits=4, decimal_places=2, default=0, verbose_name=_("SGPA"))
+
+    cumulative_credits = models.PositiveIntegerField(default=0, verbose_name=_("Cumulative Credits"))
+    cgpa = models.DecimalField(max_digits=4, decimal_places=2, default=0, verbose_name=_("CGPA"))
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Transcript")
+        verbose_name_plural = _("Transcripts")
+        unique_together = ('student', 'academic_year', 'semester')
+        ordering = ['student', 'academic_year', 'semester']
+
+    def __str__(self):
+        return f"{self.student} - {self.academic_year} Sem {self.semester}: SGPA {self.sgpa}, CGPA {self.cgpa}"
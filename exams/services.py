@@ -0,0 +1,124 @@
+"""
+Bulk result entry.
+
+manage_results_view used to validate and write marks one student at a
+time (update_or_create or delete per row). save_results() does it in three
+passes instead:
+
+1. parse and validate the whole submission in memory,
+2. work out pass/fail (and the grade, where a grader is given) in one go,
+3. write everything with one bulk upsert and one bulk delete.
+
+The number of queries is the same for a 30- or a 300-student paper.
+"""
+
+from django.db import transaction
+
+from .analytics import invalidate_exam_analytics
+from .models import Result
+from .transcripts import TRANSCRIPT_EXAM_TYPES, refresh_transcripts
+
+# Share of max_marks needed to pass
+PASS_FRACTION = 0.5
+
+RESULT_BATCH_SIZE = 1000
+
+
+class ResultReport:
+    """
+    What save_results() did: rows saved and cleared, and the rows it
+    rejected with the reason, so only those need to be shown again.
+    """
+
+    def __init__(self):
+        self.saved = 0
+        self.deleted = 0
+        self.rejected = []
+
+    def reject(self, student, value, message):
+        self.rejected.append({
+            'student_id': student.id,
+            'student_reg_id': student.student_id,
+            'student_name': student.user.get_full_name(),
+            'value': value,
+            'error': message,
+        })
+
+
+def parse_marks(exam, students, data, report):
+    """
+    Read marks_<student id> for every student on the roster. Returns
+    ({student_id: marks}, [student ids whose marks were cleared]).
+    Students with no field in `data` are left untouched.
+    """
+    marks, cleared = {}, []
+    for student in students:
+        value = data.get(f'marks_{student.id}')
+        if value is None:
+            continue
+        value = value.strip()
+        if value == '':
+            cleared.append(student.id)
+            continue
+        try:
+            number = int(value)
+        except ValueError:
+            report.reject(student, value, "Marks must be a whole number.")
+            continue
+        if number < 0:
+            report.reject(student, value, "Marks cannot be negative.")
+        elif number > exam.max_marks:
+            report.reject(student, value, f"Marks cannot be greater than max marks ({exam.max_marks}).")
+        else:
+            marks[student.id] = number
+    return marks, cleared
+
+
+def evaluate(exam, marks, grader=None):
+    """
+    Build unsaved Result rows with is_pass (and grade, if `grader` is
+    given: a callable taking (marks, max_marks) and returning a grade).
+    """
+    pass_mark = exam.max_marks * PASS_FRACTION
+    results = []
+    for student_id, obtained in marks.items():
+        result = Result(student_id=student_id, exam=exam, marks_obtained=obtained, is_pass=obtained >= pass_mark)
+        if grader is not None:
+            result.grade = grader(obtained, exam.max_marks)
+        results.append(result)
+    return results
+
+
+def save_results(exam, students, data, grader=None):
+    """
+    Validate and save a whole results sheet for `exam`. `students` is the
+    roster (with users loaded) and `data` the submitted form.
+    """
+    report = ResultReport()
+    marks, cleared = parse_marks(exam, students, data, report)
+    results = evaluate(exam, marks, grader)
+
+    update_fields = ['marks_obtained', 'is_pass']
+    if grader is not None:
+        update_fields.append('grade')
+
+    # Savepoint, so a failed write leaves the caller's transaction usable
+    with transaction.atomic():
+        if results:
+            Result.objects.bulk_create(
+                results,
+                batch_size=RESULT_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['student', 'exam'],
+                update_fields=update_fields,
+            )
+        if cleared:
+            report.deleted, _ = Result.objects.filter(exam=exam, student_id__in=cleared).delete()
+    report.saved = len(results)
+    if results or cleared:
+        invalidate_exam_analytics(exam.pk)
+    # Grading refreshes the transcripts of everyone still graded; students
+    # whose marks were removed need theirs redone here.
+    if cleared and exam.exam_type in TRANSCRIPT_EXAM_TYPES:
+        refresh_transcripts(cleared)
+    return report
@@ -0,0 +1,58 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .analytics import invalidate_exam_analytics
+from .models import Exam, Result
+from .transcripts import TRANSCRIPT_EXAM_TYPES, refresh_transcripts
+
+# Single-result writes (admin, shell) and cascades are collected here and
+# applied once on commit: deleting an exam or a student fires post_delete
+# for every one of its results. Bulk writes in exams.services and
+# exams.grading invalidate explicitly.
+_pending = threading.local()
+
+
+def _pending_changes():
+    if not hasattr(_pending, 'exam_ids'):
+        _pending.exam_ids = set()
+        _pending.student_ids = set()
+        # exam id -> exam type, so a cascade looks each exam up only once
+        _pending.exam_types = {}
+    return _pending
+
+
+def _exam_type(instance, pending):
+    if Result.exam.is_cached(instance):
+        return instance.exam.exam_type
+    if instance.exam_id not in pending.exam_types:
+        pending.exam_types[instance.exam_id] = (
+            Exam.objects.filter(pk=instance.exam_id).values_list('exam_type', flat=True).first()
+        )
+    return pending.exam_types[instance.exam_id]
+
+
+def _apply_pending_changes():
+    pending = _pending_changes()
+    exam_ids, student_ids = pending.exam_ids, pending.student_ids
+    del _pending.exam_ids, _pending.student_ids, _pending.exam_types
+    for exam_id in exam_ids:
+        invalidate_exam_analytics(exam_id)
+    # After commit, so deleting a whole student doesn't write rows for it
+    if student_ids:
+        refresh_transcripts(list(student_ids))
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def queue_result_change(sender, instance, **kwargs):
+    pending = _pending_changes()
+    pending.exam_ids.add(instance.exam_id)
+    if _exam_type(instance, pending) in TRANSCRIPT_EXAM_TYPES:
+        pending.student_ids.add(instance.student_id)
+    # Registered every time; only the first callback to run finds anything
+    # to do. (If the transaction rolls back, what it queued is applied with
+    # the next commit, which only recomputes from committed data.)
+    transaction.on_commit(_apply_pending_changes)
@@ -0,0 +1,128 @@
+import datetime
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import User
+from students.models import Department, Student
+from faculty.models import Faculty
+from courses.models import Course, Enrollment
+from exams.grading import grade_exam
+from exams.models import Exam, Result, GradingScheme, GradeBoundary, Transcript
+from exams.transcripts import refresh_transcripts
+
+
+class TranscriptTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Computer Science', code='CSE')
+        faculty_user = User.objects.create(username='FAC001', role='faculty')
+        faculty = Faculty.objects.create(user=faculty_user, faculty_id='FAC001', department=department)
+        cls.algorithms = Course.objects.create(
+            code='CS201', title='Algorithms', department=department, credits=3, faculty=faculty
+        )
+        cls.database_course = Course.objects.create(
+            code='CS202', title='Databases', department=department, credits=4, faculty=faculty
+        )
+        user = User.objects.create(username='STU001', role='student')
+        cls.student = Student.objects.create(user=user, student_id='STU001', department=department, year=2, semester=3)
+
+    def _final(self, course, exam_date, grade_points):
+        exam = Exam.objects.create(
+            course=course, name='Final', exam_type='final', exam_date=exam_date, max_marks=100
+        )
+        Result.objects.create(student=self.student, exam=exam, marks_obtained=50, grade_points=grade_points)
+        return exam
+
+    def test_retaken_course_counts_once_per_term(self):
+        # Algorithms failed in 2023-2024 and retaken in 2024-2025
+        Enrollment.objects.create(student=self.student, course=self.algorithms, academic_year='2023-2024', semester=3)
+        Enrollment.objects.create(student=self.student, course=self.algorithms, academic_year='2024-2025', semester=5)
+        Enrollment.objects.create(student=self.student, course=self.database_course, academic_year='2024-2025', semester=5)
+        with self.captureOnCommitCallbacks(execute=True):
+            self._final(self.algorithms, datetime.date(2023, 12, 1), Decimal('4'))
+            self._final(self.algorithms, datetime.date(2024, 12, 1), Decimal('8'))
+            self._final(self.database_course, datetime.date(2024, 12, 5), Decimal('10'))
+
+        first, second = Transcript.objects.filter(student=self.student).order_by('academic_year', 'semester')
+        self.assertEqual((first.academic_year, first.semester), ('2023-2024', 3))
+        self.assertEqual((first.credits, first.sgpa), (3, Decimal('4.00')))
+        self.assertEqual((second.academic_year, second.semester), ('2024-2025', 5))
+        # 3 * 8 + 4 * 10 = 64 over 7 credits
+        self.assertEqual((second.credits, second.sgpa), (7, Decimal('9.14')))
+        # 12 + 64 = 76 over 10 credits
+        self.assertEqual((second.cumulative_credits, second.cgpa), (10, Decimal('7.60')))
+
+    def test_course_with_a_resit_counts_once(self):
+        Enrollment.objects.create(student=self.student, course=self.algorithms, academic_year='2024-2025', semester=5)
+        Enrollment.objects.create(student=self.student, course=self.database_course, academic_year='2024-2025', semester=5)
+        with self.captureOnCommitCallbacks(execute=True):
+            self._final(self.algorithms, datetime.date(2024, 12, 1), Decimal('4'))
+            self._final(self.algorithms, datetime.date(2025, 1, 15), Decimal('7'))
+            self._final(self.database_course, datetime.date(2024, 12, 5), Decimal('10'))
+
+        transcript = Transcript.objects.get(student=self.student)
+        # Only the resit counts: 3 * 7 + 4 * 10 = 61 over 7 credits
+        self.assertEqual((transcript.credits, transcript.credit_points), (7, Decimal('61.00')))
+        self.assertEqual(transcript.sgpa, Decimal('8.71'))
+
+    def test_result_without_enrollment_that_year_is_left_out(self):
+        Enrollment.objects.create(student=self.student, course=self.algorithms, academic_year='2024-2025', semester=5)
+        self._final(self.algorithms, datetime.date(2023, 12, 1), Decimal('4'))
+        refresh_transcripts([self.student.pk])
+        self.assertFalse(Transcript.objects.filter(student=self.student).exists())
+
+    def test_deleting_an_exam_looks_up_its_type_once(self):
+        Enrollment.objects.create(student=self.student, course=self.algorithms, academic_year='2024-2025', semester=5)
+        exam = self._final(self.algorithms, datetime.date(2024, 12, 1), Decimal('8'))
+        for i in range(5):
+            user = User.objects.create(username=f'STU1{i:02d}', role='student')
+            student = Student.objects.create(
+                user=user, student_id=user.username, department=self.student.department, year=2, semester=3
+            )
+            Result.objects.create(student=student, exam=exam, marks_obtained=60, grade_points=Decimal('7'))
+        refresh_transcripts([self.student.pk])
+        self.assertTrue(Transcript.objects.filter(student=self.student).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                exam.delete()
+        exam_lookups = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "exams_exam"' in query['sql']
+        ]
+        self.assertEqual(len(exam_lookups), 1)
+        self.assertFalse(Transcript.objects.filter(student=self.student).exists())
+
+
+class GradeExamTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Computer Science', code='CSE')
+        cls.course = Course.objects.create(code='CS201', title='Algorithms', department=department, credits=3)
+        user = User.objects.create(username='STU001', role='student')
+        cls.student = Student.objects.create(user=user, student_id='STU001', department=department, year=2, semester=3)
+        Enrollment.objects.create(student=cls.student, course=cls.course, academic_year='2024-2025', semester=5)
+        cls.exam = Exam.objects.create(
+            course=cls.course, name='Final', exam_type='final', exam_date=datetime.date(2024, 12, 1), max_marks=100
+        )
+        Result.objects.create(student=cls.student, exam=cls.exam, marks_obtained=75)
+
+    def test_no_applicable_scheme_clears_earlier_grades(self):
+        scheme = GradingScheme.objects.create(name='College', exam_type='final')
+        GradeBoundary.objects.create(scheme=scheme, grade='A', min_value=70, grade_points=Decimal('9'))
+        GradeBoundary.objects.create(scheme=scheme, grade='B', min_value=0, grade_points=Decimal('6'))
+        self.assertEqual(grade_exam(self.exam), 1)
+        result = Result.objects.get(exam=self.exam)
+        self.assertEqual((result.grade, result.grade_points), ('A', Decimal('9')))
+        self.assertEqual(Transcript.objects.get(student=self.student).sgpa, Decimal('9.00'))
+
+        scheme.delete()
+        self.assertEqual(grade_exam(self.exam), 1)
+        result.refresh_from_db()
+        self.assertEqual((result.grade, result.grade_points, result.is_pass), (None, None, True))
+        self.assertFalse(Transcript.objects.filter(student=self.student).exists())
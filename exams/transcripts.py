@@ -0,0 +1,136 @@
+"""
+SGPA / CGPA transcripts.
+
+A term's SGPA is the credit-weighted mean of the grade points a student
+earned in the exams that count towards the GPA (finals), and CGPA is the
+same over every term up to and including it:
+
+    SGPA = sum(credits * grade_points) / sum(credits)
+
+The sums come from one grouped query over Result joined to Course.credits.
+The term is the student's Enrollment in the course for the academic year
+the exam was held in, so a course taken twice (a retake) counts each
+result only in its own term. If a course has more than one graded final
+in a year (a final and a resit), only the latest counts, so its credits
+aren't added twice. Rows arrive ordered by student and term, so
+CGPA is a running total as they stream past; nothing is held per student
+beyond two numbers.
+
+Results only get grade points once they have been graded (exams.grading),
+so ungraded results are left out.
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+
+from courses.models import Enrollment
+from courses.rosters import academic_year_expression
+from .models import Result, Transcript
+
+# Exam types whose grades make up the GPA
+TRANSCRIPT_EXAM_TYPES = ('final',)
+
+TRANSCRIPT_BATCH_SIZE = 1000
+TWO_PLACES = Decimal('0.01')
+
+
+def term_totals(results=None):
+    """
+    Per (student, academic_year, semester): total credits and credit
+    points, ordered by student and term. `results` narrows down the
+    Result rows considered (e.g. to one department).
+    """
+    results = Result.objects.all() if results is None else results
+    # The student's latest graded final in the course that year; earlier
+    # ones (a final before its resit) don't count separately
+    latest_final = (
+        Result.objects
+        .filter(exam__exam_type__in=TRANSCRIPT_EXAM_TYPES, grade_points__isnull=False)
+        .annotate(academic_year=academic_year_expression('exam__exam_date'))
+        .filter(student=OuterRef('student'), exam__course=OuterRef('exam__course'), academic_year=OuterRef('academic_year'))
+        .order_by('-exam__exam_date', '-pk')
+        .values('pk')[:1]
+    )
+    # The student's own enrollment in the course that year gives the
+    # semester; the later one if they took it twice in the same year
+    enrolled_semester = (
+        Enrollment.objects
+        .filter(student=OuterRef('student'), course=OuterRef('exam__course'), academic_year=OuterRef('academic_year'))
+        .order_by('-semester')
+        .values('semester')[:1]
+    )
+    return (
+        results
+        .filter(exam__exam_type__in=TRANSCRIPT_EXAM_TYPES, grade_points__isnull=False)
+        .annotate(academic_year=academic_year_expression('exam__exam_date'))
+        .filter(pk=Subquery(latest_final))
+        .annotate(semester=Subquery(enrolled_semester))
+        .filter(semester__isnull=False)
+        .values('student_id', 'academic_year', 'semester')
+        .annotate(
+            credits=Sum('exam__course__credits'),
+            credit_points=Sum(F('exam__course__credits') * F('grade_points')),
+        )
+        .order_by('student_id', 'academic_year', 'semester')
+    )
+
+
+def _gpa(points, credits):
+    if not credits:
+        return Decimal('0.00')
+    return (Decimal(points) / credits).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+
+def iter_transcripts(results=None):
+    """Yield unsaved Transcript rows in one pass over term_totals()."""
+    student_id = None
+    cumulative_credits, cumulative_points = 0, Decimal(0)
+    for row in term_totals(results).iterator(chunk_size=2000):
+        if row['student_id'] != student_id:
+            student_id = row['student_id']
+            cumulative_credits, cumulative_points = 0, Decimal(0)
+        points = Decimal(row['credit_points'] or 0)
+        cumulative_credits += row['credits']
+        cumulative_points += points
+        yield Transcript(
+            student_id=student_id,
+            academic_year=row['academic_year'],
+            semester=row['semester'],
+            credits=row['credits'],
+            credit_points=points.quantize(TWO_PLACES),
+            sgpa=_gpa(points, row['credits']),
+            cumulative_credits=cumulative_credits,
+            cgpa=_gpa(cumulative_points, cumulative_credits),
+        )
+
+
+def _write(transcripts):
+    batch, written = [], 0
+    for transcript in transcripts:
+        batch.append(transcript)
+        if len(batch) >= TRANSCRIPT_BATCH_SIZE:
+            Transcript.objects.bulk_create(batch)
+            written += len(batch)
+            batch = []
+    Transcript.objects.bulk_create(batch)
+    return written + len(batch)
+
+
+def refresh_transcripts(student_ids):
+    """
+    Recompute every term of the given students (a list or a values()
+    subquery). All terms are redone because a changed grade moves the
+    CGPA of every later term.
+    """
+    with transaction.atomic():
+        Transcript.objects.filter(student_id__in=student_ids).delete()
+        return _write(iter_transcripts(Result.objects.filter(student_id__in=student_ids)))
+
+
+def rebuild_department_transcripts(department):
+    """Regenerate the transcripts of every student in `department` in one streaming pass."""
+    with transaction.atomic():
+        Transcript.objects.filter(student__department=department).delete()
+        return _write(iter_transcripts(Result.objects.filter(student__department=department)))
@@ -16,4 +16,8 @@ urlpatterns = [
 
     # /exams/1/results/
     path('<int:exam_pk>/results/', views.manage_results_view, name='manage_results'),
+
+    # /exams/1/analytics/ (page) and /exams/1/analytics/data/ (JSON)
+    path('<int:pk>/analytics/', views.exam_analytics_view, name='exam_analytics'),
+    path('<int:pk>/analytics/data/', views.exam_analytics_api, name='exam_analytics_api'),
 ]
\ No newline at end of file
@@ -2,11 +2,15 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from .models import Exam, Result
 from .forms import ExamForm, ResultForm
-from students.models import Student
+from .services import save_results
+from .grading import grade_exam
+from .analytics import exam_summary
 from courses.models import Course
+from courses.rosters import course_roster, academic_year_for
 from django.contrib import messages
+from django.http import JsonResponse
 from django.forms import modelformset_factory
-from django.db import transaction
+from django.db import transaction, DatabaseError
 
 @login_required
 def exam_list_view(request):
@@ -99,62 +103,85 @@ def manage_results_view(request, exam_pk):
         
     exam = get_object_or_404(Exam, pk=exam_pk)
     
-    # Get all students in the course's department and year
-    # This is a simplification; a real system might have explicit course enrollment
-    students = Student.objects.filter(
-        department=exam.course.department,
-        status='active'
-        # You might add year/semester filter here
-    ).select_related('user')
-    
+    # Students enrolled in the course for the term the exam is held in
+    students = list(course_roster(exam.course, academic_year_for(exam.exam_date)).select_related('user'))
+
+    rejected = []
+    if request.method == 'POST':
+        # Validate everything first, then write it all in one go
+        try:
+            # Marks and grades together: if grading fails, the new marks
+            # mustn't stay saved next to the old grades
+            with transaction.atomic():
+                report = save_results(exam, students, request.POST)
+                # Grades (and relative curves) depend on the whole exam
+                grade_exam(exam)
+        except DatabaseError as e:
+            messages.error(request, f"An error occurred while saving results: {e}")
+        else:
+            if not report.rejected:
+                messages.success(request, f"Results for {exam.name} saved successfully.")
+                return redirect('exams')
+            rejected = report.rejected
+            messages.warning(
+                request,
+                f"Saved {report.saved} results for {exam.name}. "
+                f"{len(rejected)} rows were rejected; correct them below."
+            )
+
     # Create a list of initial data for the formset
     initial_data = []
     student_result_map = {result.student_id: result for result in exam.results.all()}
+    rejected_map = {row['student_id']: row for row in rejected}
 
     for student in students:
         result = student_result_map.get(student.id)
+        rejected_row = rejected_map.get(student.id)
         initial_data.append({
             'student_id': student.id,
             'student_name': student.user.get_full_name(),
             'student_reg_id': student.student_id,
-            'marks_obtained': result.marks_obtained if result else None,
+            'marks_obtained': rejected_row['value'] if rejected_row else (result.marks_obtained if result else None),
+            'error': rejected_row['error'] if rejected_row else None,
         })
 
-    if request.method == 'POST':
-        # Process the submitted marks
-        try:
-            for student in students:
-                marks_str = request.POST.get(f'marks_{student.id}')
-                
-                if marks_str is not None and marks_str != '':
-                    marks = int(marks_str)
-                    
-                    if marks > exam.max_marks:
-                         messages.warning(request, f"Marks for {student.user.get_full_name()} ({marks}) cannot be greater than max marks ({exam.max_marks}). Skipping.")
-                         continue
-                    
-                    # Update or create the result
-                    Result.objects.update_or_create(
-                        student=student,
-                        exam=exam,
-                        defaults={
-                            'marks_obtained': marks,
-                            # Add grading/pass-fail logic here if needed
-                            'is_pass': marks >= (exam.max_marks / 2) # Simple pass logic
-                        }
-                    )
-                elif marks_str == '':
-                    # If marks are cleared, delete the result
-                    Result.objects.filter(student=student, exam=exam).delete()
-            
-            messages.success(request, f"Results for {exam.name} saved successfully.")
-            return redirect('exams')
-            
-        except Exception as e:
-            messages.error(request, f"An error occurred while saving results: {e}")
-
     context = {
         'exam': exam,
         'student_results': initial_data,
+        'rejected_rows': rejected,
+    }
+    return render(request, 'exams/manage_results_form.html', context)
+
+
+def _get_analytics_exam(request, pk):
+    if request.user.role not in ('admin', 'faculty'):
+        return None
+    return get_object_or_404(Exam.objects.select_related('course'), pk=pk)
+
+
+@login_required
+def exam_analytics_view(request, pk):
+    """
+    Statistics for one exam: averages, spread, pass rate and a marks histogram.
+    """
+    exam = _get_analytics_exam(request, pk)
+    if exam is None:
+        messages.error(request, "You do not have permission to view exam analytics.")
+        return redirect('exams')
+
+    summary = exam_summary(exam)
+    largest_bin = max((row['count'] for row in summary.get('histogram', [])), default=0)
+    context = {
+        'exam': exam,
+        'summary': summary,
+        'largest_bin': largest_bin or 1,
     }
-    return render(request, 'exams/manage_results_form.html', context)
\ No newline at end of file
+    return render(request, 'exams/exam_analytics.html', context)
+
+
+@login_required
+def exam_analytics_api(request, pk):
+    exam = _get_analytics_exam(request, pk)
+    if exam is None:
+        return JsonResponse({'error': 'Permission denied.'}, status=403)
+    return JsonResponse(exam_summary(exam))
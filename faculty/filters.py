@@ -1,7 +1,7 @@
 import django_filters
 from django import forms
 from .models import Faculty, Department
-from django.db.models import Q
+from core.search import search
 
 class FacultyFilter(django_filters.FilterSet):
     search = django_filters.CharFilter(
@@ -30,10 +30,5 @@ class FacultyFilter(django_filters.FilterSet):
         if not value:
             return queryset
         
-        return queryset.filter(
-            Q(user__first_name__icontains=value) |
-            Q(user__last_name__icontains=value) |
-            Q(user__email__icontains=value) |
-            Q(faculty_id__icontains=value) |
-            Q(designation__icontains=value)
-        )
\ No newline at end of file
+        # Name, email, faculty ID and designation via search_text
+        return search(queryset, value, 'faculty')
\ No newline at end of file
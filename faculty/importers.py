@@ -0,0 +1,53 @@
+"""
+CSV import for faculty rosters. The set-based work is done by
+core.importers.RosterImporter; this only describes the faculty columns.
+"""
+
+from core.importers import RosterImporter
+from core.search import build_search_text
+from core.versioning import bump_version
+from .models import Faculty
+
+FACULTY_CSV_COLUMNS = (
+    'faculty_id', 'email', 'first_name', 'last_name',
+    'department_name', 'designation',
+)
+
+
+class FacultyImporter(RosterImporter):
+    role = 'faculty'
+    profile_model = Faculty
+    id_field = 'faculty_id'
+    columns = FACULTY_CSV_COLUMNS
+
+    def run(self, batches):
+        # bulk_create skips post_save, so invalidate the search index here
+        try:
+            return super().run(batches)
+        finally:
+            bump_version('faculty')
+
+    def clean_row(self, line, row, cleaned):
+        cleaned.update({
+            'designation': row['designation'].strip(),
+            'specialization': row.get('specialization', '') or '',
+            'office_location': row.get('office_location', '') or '',
+        })
+        return cleaned
+
+    def build_profile(self, row):
+        return Faculty(
+            user_id=row['user_id'],
+            faculty_id=row['key'],
+            department=row['department'],
+            designation=row['designation'],
+            specialization=row['specialization'],
+            phone=row['phone'],
+            office_location=row['office_location'],
+            status='active',
+            # bulk_create skips save(), so fill the search column here
+            search_text=build_search_text(
+                row['first_name'], row['last_name'], row['email'],
+                row['key'], row['designation'],
+            ),
+        )
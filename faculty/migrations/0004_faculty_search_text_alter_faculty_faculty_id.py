@@ -0,0 +1,60 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:08
+
+from django.db import migrations, models
+
+from core.search import build_search_text
+
+
+def fill_search_text(apps, schema_editor):
+    Faculty = apps.get_model('faculty', 'Faculty')
+    batch = []
+    for obj in Faculty.objects.select_related('user').iterator(chunk_size=2000):
+        obj.search_text = build_search_text(
+            obj.user.first_name, obj.user.last_name, obj.user.email,
+            obj.faculty_id, obj.designation,
+        )
+        batch.append(obj)
+        if len(batch) >= 2000:
+            Faculty.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    Faculty.objects.bulk_update(batch, ['search_text'])
+
+
+def create_trigram_index(apps, schema_editor):
+    # GIN trigram index so word/prefix searches on search_text don't scan
+    # the table. PostgreSQL only; other databases use the Python index.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS faculty_faculty_search_trgm '
+        'ON faculty_faculty USING gin (search_text gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS faculty_faculty_search_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faculty', '0003_alter_faculty_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='faculty',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AlterField(
+            model_name='faculty',
+            name='faculty_id',
+            field=models.CharField(max_length=100, unique=True, verbose_name='Faculty ID'),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
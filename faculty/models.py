@@ -2,6 +2,7 @@ from django.db import models
 from core.models import User
 from students.models import Department
 from django.utils.translation import gettext_lazy as _
+from core.search import build_search_text
 
 class Faculty(models.Model):
     
@@ -29,10 +30,24 @@ class Faculty(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='active', verbose_name=_("Status"))
     date_of_joining = models.DateField(null=True, blank=True, verbose_name=_("Date of Joining"))
 
+    # Lower-cased name, email, ID and designation for the search box.
+    # Kept up to date on save; see core/search.py.
+    search_text = models.TextField(blank=True, default='', editable=False)
+
     class Meta:
         verbose_name = _("Faculty")
         verbose_name_plural = _("Faculty")
         ordering = ['faculty_id']
 
     def __str__(self):
-        return f"{self.user.get_full_name()} ({self.faculty_id})"
\ No newline at end of file
+        return f"{self.user.get_full_name()} ({self.faculty_id})"
+
+    def build_search_text(self):
+        return build_search_text(
+            self.user.first_name, self.user.last_name, self.user.email,
+            self.faculty_id, self.designation,
+        )
+
+    def save(self, *args, **kwargs):
+        self.search_text = self.build_search_text()
+        super().save(*args, **kwargs)
\ No newline at end of file
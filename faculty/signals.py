@@ -0,0 +1,27 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.models import User
+from core.versioning import bump_version
+from .models import Faculty
+
+# User fields that feed Faculty.search_text
+SEARCHABLE_USER_FIELDS = {'first_name', 'last_name', 'email'}
+
+
+@receiver(post_save, sender=Faculty)
+@receiver(post_delete, sender=Faculty)
+def invalidate_search_index(sender, **kwargs):
+    bump_version('faculty')
+
+
+@receiver(post_save, sender=User)
+def refresh_faculty_search_text(sender, instance, update_fields=None, **kwargs):
+    # Renaming a user outside FacultyForm (e.g. in the admin) must still
+    # reach the search column. Logins only save last_login, so skip those.
+    if update_fields and not SEARCHABLE_USER_FIELDS.intersection(update_fields):
+        return
+    for faculty in Faculty.objects.filter(user=instance).only('id', 'faculty_id', 'designation'):
+        faculty.user = instance
+        Faculty.objects.filter(pk=faculty.pk).update(search_text=faculty.build_search_text())
+        bump_version('faculty')
@@ -5,10 +5,7 @@ from students.models import Department
 from .forms import FacultyForm
 from .filters import FacultyFilter
 from django.contrib import messages
-from django.db import IntegrityError, transaction
-from core.models import User
-import csv
-import io
+from core.models import ImportJob
 
 @login_required
 def faculty_view(request):
@@ -94,7 +91,6 @@ def delete_faculty_view(request, pk):
         return redirect('faculty')
 
 @login_required
-@transaction.atomic
 def import_faculty_csv(request):
     if not request.user.role == 'admin':
         messages.error(request, "You do not have permission to import faculty.")
@@ -105,70 +101,11 @@ def import_faculty_csv(request):
         if not csv_file or not csv_file.name.endswith('.csv'):
             messages.error(request, 'Please upload a valid .csv file.')
             return redirect('faculty')
-            
-        try:
-            data_set = csv_file.read().decode('UTF-8')
-            io_string = io.StringIO(data_set)
-            reader = csv.DictReader(io_string)
-            created_count = 0
-            
-            for row in reader:
-                try:
-                    department = Department.objects.get(name__iexact=row['department_name'])
-                except Department.DoesNotExist:
-                    messages.error(request, f"Department '{row['department_name']}' in CSV does not exist. Import departments first. No faculty were imported.")
-                    transaction.set_rollback(True)
-                    return redirect('faculty')
-                except KeyError:
-                    messages.error(request, "CSV is missing the 'department_name' column. No faculty were imported.")
-                    transaction.set_rollback(True)
-                    return redirect('faculty')
-                
-                default_password = row.get('faculty_id', 'password123')
-                
-                user, created_user = User.objects.get_or_create(
-                    username=row['faculty_id'],
-                    defaults={
-                        'email': row['email'],
-                        'first_name': row['first_name'],
-                        'last_name': row['last_name'],
-                        'role': 'faculty',
-                        'is_active': True
-                    }
-                )
-                
-                if created_user:
-                    user.set_password(default_password)
-                    user.save()
-                
-                _, created_faculty = Faculty.objects.get_or_create(
-                    user=user,
-                    faculty_id=row['faculty_id'],
-                    defaults={
-                        'department': department,
-                        'designation': row['designation'],
-                        'specialization': row.get('specialization', ''),
-                        'phone': row.get('phone', ''),
-                        'office_location': row.get('office_location', ''),
-                        'status': 'active'
-                    }
-                )
-                
-                if created_faculty:
-                    created_count += 1
-                    
-            messages.success(request, f'Successfully imported {created_count} new faculty members.')
-            
-        except IntegrityError as e:
-            messages.error(request, f'Database Error: {e}. A faculty member or user might already exist. No faculty were imported.')
-            transaction.set_rollback(True)
-        except (KeyError, TypeError, ValueError) as e:
-            messages.error(request, f'CSV Error: Check your columns. Missing or invalid data for: {e}. No faculty were imported.')
-            transaction.set_rollback(True)
-        except Exception as e:
-            messages.error(request, f'An unexpected error occurred: {e}')
-            transaction.set_rollback(True)
-            
-        return redirect('faculty')
+
+        # The worker (manage.py run_import_jobs) does the import in the
+        # background; the user is sent to the progress page.
+        job = ImportJob.objects.create(kind='faculty', csv_file=csv_file, created_by=request.user)
+        messages.success(request, 'Your file has been queued for import.')
+        return redirect('import_job', pk=job.pk)
     else:
         return redirect('faculty')
\ No newline at end of file
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import FeeStructure, FeePayment
+from .models import FeeStructure, FeePayment, FeeLedgerEntry, StudentFeeBalance
 
 @admin.register(FeeStructure)
 class FeeStructureAdmin(admin.ModelAdmin):
@@ -11,4 +11,33 @@ class FeePaymentAdmin(admin.ModelAdmin):
     list_display = ('student', 'academic_year', 'semester', 'total_amount', 'amount_paid', 'balance_due', 'status')
     list_filter = ('status', 'academic_year', 'semester', 'student__department')
     search_fields = ('student__user__username', 'student__student_id', 'transaction_id')
-    autocomplete_fields = ('student',)
\ No newline at end of file
+    autocomplete_fields = ('student',)
+
+@admin.register(StudentFeeBalance)
+class StudentFeeBalanceAdmin(admin.ModelAdmin):
+    list_display = ('student', 'charged', 'paid', 'waived', 'balance', 'updated_at')
+    list_filter = ('student__department',)
+    search_fields = ('student__user__username', 'student__student_id')
+    ordering = ('-balance',)
+    # Maintained by fees.ledger
+    readonly_fields = ('student', 'charged', 'paid', 'waived', 'balance', 'updated_at')
+
+    def has_add_permission(self, request):
+        return False
+
+@admin.register(FeeLedgerEntry)
+class FeeLedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ('posted_at', 'student', 'entry_type', 'account', 'debit', 'credit', 'description')
+    list_filter = ('entry_type', 'account', 'posted_at')
+    search_fields = ('student__student_id', 'description', 'txn')
+    raw_id_fields = ('student', 'payment')
+
+    # The ledger is append-only; corrections are reversing postings
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
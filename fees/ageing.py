@@ -0,0 +1,118 @@
+"""
+Dues ageing and collection forecast.
+
+ageing_report() buckets every unpaid balance by how long it is past its
+due date (not yet due, 0-30, 31-60, 61-90 and over 90 days) for each
+department, and what falls due in the next 30 days as a collection
+forecast.
+
+It is one grouped aggregate over FeePayment: the balance is computed in
+SQL (total_amount - amount_paid) and each bucket is a filtered SUM, so
+the database returns one small row per department however many fee
+records there are.
+
+The admin dashboard card reads a cached copy keyed by the fee data
+version, which every write to fee records bumps (invalidate_fee_reports).
+"""
+
+import datetime
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from core.versioning import get_version, bump_version
+
+from .ledger import ZERO
+from .models import FeePayment
+from .search import BALANCE_DUE
+
+AGEING_CACHE_TIMEOUT = 60 * 60 * 24
+FORECAST_DAYS = 30
+
+# (key, label, fewest days overdue, most days overdue)
+AGEING_BUCKETS = (
+    ('days_0_30', '0–30 days', 0, 30),
+    ('days_31_60', '31–60 days', 31, 60),
+    ('days_61_90', '61–90 days', 61, 90),
+    ('days_over_90', 'Over 90 days', 91, None),
+)
+
+EXPORT_COLUMNS = (
+    ['department', 'invoices', 'outstanding', 'not_yet_due']
+    + [key for key, label, low, high in AGEING_BUCKETS]
+    + ['no_due_date', 'due_next_30_days']
+)
+
+
+def fee_data_version():
+    return get_version('fees')
+
+
+def invalidate_fee_reports():
+    # After commit, so a report computed meanwhile can't be cached under
+    # the new version with the old data
+    transaction.on_commit(lambda: bump_version('fees'))
+
+
+def _bucket_filter(today, low, high):
+    # Overdue by `low` to `high` days. Something due today isn't overdue
+    # yet, so the first bucket starts the day after the due date.
+    condition = Q(due_date__lte=today - datetime.timedelta(days=max(low, 1)))
+    if high is not None:
+        condition &= Q(due_date__gte=today - datetime.timedelta(days=high))
+    return condition
+
+
+def ageing_report(today=None):
+    """
+    One row per department, plus a total: invoices with a balance, the
+    outstanding balance split by age bucket, and how much of it falls due
+    in the next FORECAST_DAYS.
+    """
+    today = today or timezone.localdate()
+    window = datetime.timedelta(days=FORECAST_DAYS)
+    unpaid = Q(status='pending', amount_paid__lt=F('total_amount'))
+
+    def balance(condition):
+        return Sum(BALANCE_DUE, filter=condition, default=ZERO)
+
+    buckets = {key: balance(_bucket_filter(today, low, high)) for key, label, low, high in AGEING_BUCKETS}
+    rows = (
+        FeePayment.objects
+        .filter(unpaid)
+        .values('student__department__code', 'student__department__name')
+        .annotate(
+            invoices=Count('id'),
+            outstanding=Sum(BALANCE_DUE, default=ZERO),
+            not_yet_due=balance(Q(due_date__gte=today)),
+            no_due_date=balance(Q(due_date__isnull=True)),
+            due_next_30_days=balance(Q(due_date__gte=today, due_date__lt=today + window)),
+            **buckets,
+        )
+        .order_by('student__department__name')
+    )
+
+    departments = []
+    total = {column: ZERO for column in EXPORT_COLUMNS[1:]}
+    total['invoices'] = 0
+    for row in rows:
+        row['department'] = row.pop('student__department__name') or 'No department'
+        row['code'] = row.pop('student__department__code') or ''
+        for column in EXPORT_COLUMNS[1:]:
+            total[column] += row[column]
+        departments.append(row)
+    total['department'] = 'All departments'
+    return {'today': today, 'departments': departments, 'total': total}
+
+
+def cached_ageing_report():
+    """ageing_report() for today, recomputed after any fee record changes."""
+    today = timezone.localdate()
+    key = f'fees:ageing:{fee_data_version()}:{today.isoformat()}'
+    report = cache.get(key)
+    if report is None:
+        report = ageing_report(today)
+        cache.set(key, report, AGEING_CACHE_TIMEOUT)
+    return report
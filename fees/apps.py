@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class FeesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'fees'
+
+    def ready(self):
+        from . import signals
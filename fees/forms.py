@@ -1,5 +1,9 @@
 from django import forms
 from .models import FeeStructure, FeePayment
+from students.models import Department
+from courses.rosters import academic_year_for
+from .invoicing import INVOICE_DUE_DAYS
+from decimal import Decimal
 import datetime
 
 class FeeStructureForm(forms.ModelForm):
@@ -20,10 +24,11 @@ class FeePaymentForm(forms.ModelForm):
         model = FeePayment
         fields = [
             'student', 'academic_year', 'semester', 'total_amount', 
-            'amount_paid', 'status', 'payment_date', 'transaction_id'
+            'amount_paid', 'status', 'payment_date', 'due_date', 'transaction_id'
         ]
         widgets = {
             'payment_date': forms.DateInput(attrs={'type': 'date'}),
+            'due_date': forms.DateInput(attrs={'type': 'date'}),
             'student': forms.HiddenInput(), # Student will be set by the view
         }
 
@@ -42,4 +47,89 @@ class FeePaymentForm(forms.ModelForm):
         
         # Make some fields not required for admins
         self.fields['payment_date'].required = False
-        self.fields['transaction_id'].required = False
\ No newline at end of file
+        self.fields['transaction_id'].required = False
+        self.fields['due_date'].required = False
+
+
+class PaymentSearchForm(forms.Form):
+    STATE_CHOICES = [
+        ('', 'All records'),
+        ('pending', 'Pending (nothing paid)'),
+        ('partial', 'Partially paid'),
+        ('overdue', 'Overdue'),
+        ('paid', 'Paid'),
+        ('waived', 'Waived'),
+    ]
+    SORT_CHOICES = [
+        ('newest', 'Newest records first'),
+        ('recent_payment', 'Most recent payment first'),
+    ]
+
+    q = forms.CharField(label="Student", required=False, widget=forms.TextInput(attrs={'placeholder': 'Name or ID'}))
+    state = forms.ChoiceField(choices=STATE_CHOICES, required=False)
+    academic_year = forms.RegexField(regex=r'^\d{4}-\d{4}$', max_length=9, required=False,
+                                     error_messages={'invalid': "Use the format YYYY-YYYY."})
+    semester = forms.IntegerField(min_value=1, max_value=12, required=False)
+    department = forms.ModelChoiceField(queryset=Department.objects.all(), required=False, empty_label="All departments")
+    sort = forms.ChoiceField(choices=SORT_CHOICES, required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field_name, field in self.fields.items():
+            field.widget.attrs['class'] = 'form-input'
+
+
+class DuesFilterForm(forms.Form):
+    SORT_CHOICES = [
+        ('highest', 'Highest balance first'),
+        ('lowest', 'Lowest balance first'),
+    ]
+
+    department = forms.ModelChoiceField(queryset=Department.objects.all(), required=False, empty_label="All departments")
+    min_balance = forms.DecimalField(label="Minimum balance", min_value=Decimal('0.01'), decimal_places=2, required=False, initial=Decimal('0.01'))
+    sort = forms.ChoiceField(choices=SORT_CHOICES, required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field_name, field in self.fields.items():
+            field.widget.attrs['class'] = 'form-input'
+
+    def clean_min_balance(self):
+        # Only students who owe something
+        return self.cleaned_data['min_balance'] or Decimal('0.01')
+
+
+class InvoiceRunForm(forms.Form):
+    academic_year = forms.RegexField(regex=r'^\d{4}-\d{4}$', max_length=9, help_text="e.g., 2024-2025",
+                                     error_messages={'invalid': "Use the format YYYY-YYYY."})
+    semester = forms.IntegerField(min_value=1, max_value=12)
+    department = forms.ModelChoiceField(queryset=Department.objects.all(), required=False, empty_label="All departments")
+    due_date = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}),
+                               help_text=f"Default: {INVOICE_DUE_DAYS} days from today")
+    dry_run = forms.BooleanField(required=False, label="Dry run (show what would be invoiced)")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['academic_year'].initial = academic_year_for()
+        for field_name, field in self.fields.items():
+            if field_name != 'dry_run':
+                field.widget.attrs['class'] = 'form-input'
+
+
+class ReconciliationForm(forms.Form):
+    statement = forms.FileField(help_text="CSV with transaction_id, student_id, amount and optionally date (YYYY-MM-DD) columns")
+    payment_date = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}),
+                                   help_text="Used for lines without a date; default today")
+    dry_run = forms.BooleanField(required=False, label="Dry run (match without saving)")
+    download_unmatched = forms.BooleanField(required=False, label="Download unmatched lines as CSV")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field_name in ('statement', 'payment_date'):
+            self.fields[field_name].widget.attrs['class'] = 'form-input'
+
+    def clean_statement(self):
+        statement = self.cleaned_data['statement']
+        if not statement.name.lower().endswith('.csv'):
+            raise forms.ValidationError("Please upload a .csv file.")
+        return statement
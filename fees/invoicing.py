@@ -0,0 +1,146 @@
+"""
+Semester fee invoicing.
+
+create_invoices() raises one FeePayment invoice per active student for a
+term from their department and year's FeeStructure: tuition and exam fee
+for everyone, plus the hostel fee for students with a HostelAllocation
+and the transport fee for students with a TransportAllocation.
+
+It is set-based rather than a loop over students: one query for the fee
+structures, one for the students (allocations and existing invoices
+checked with EXISTS subqueries in the same query), then bulk inserts of
+the invoices and their ledger charges a batch at a time.
+
+Students that already have a record for the term are skipped, so running
+it again only invoices students added since. The matching FeeStructure
+rows are locked for the run, so two runs for the same term can't both
+invoice a student.
+"""
+
+import datetime
+import time
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from hostel_transport.models import HostelAllocation, TransportAllocation
+from students.models import Student
+
+from .ageing import invalidate_fee_reports
+from .ledger import post_entries, ZERO
+from .models import FeePayment, FeeStructure
+
+INVOICE_BATCH_SIZE = 2000
+
+# Invoices are due this many days after the run unless a due date is given
+INVOICE_DUE_DAYS = 30
+
+
+class InvoiceReport:
+    """
+    Outcome of an invoicing run: invoices created, students skipped
+    because they were already invoiced, and students with no fee
+    structure for their (department, year), counted per pair.
+    """
+
+    def __init__(self, academic_year, semester):
+        self.academic_year = academic_year
+        self.semester = semester
+        self.created = 0
+        self.already_invoiced = 0
+        self.total_amount = ZERO
+        self.missing_structures = Counter()
+        self.elapsed = 0.0
+
+    @property
+    def without_structure(self):
+        return sum(self.missing_structures.values())
+
+
+def invoice_amount(structure, has_hostel, has_transport):
+    amount = structure.tuition_fee + structure.exam_fee
+    if has_hostel:
+        amount += structure.hostel_fee
+    if has_transport:
+        amount += structure.transport_fee
+    return amount
+
+
+def create_invoices(academic_year, semester, department=None, due_date=None, dry_run=False, batch_size=INVOICE_BATCH_SIZE):
+    """
+    Invoice every active student (optionally of one department) for the
+    term. With dry_run nothing is written but the report is filled in as
+    if it had been. Returns an InvoiceReport.
+    """
+    started = time.perf_counter()
+    report = InvoiceReport(academic_year, semester)
+    due_date = due_date or timezone.localdate() + datetime.timedelta(days=INVOICE_DUE_DAYS)
+
+    with transaction.atomic():
+        structures = FeeStructure.objects.select_for_update()
+        if department is not None:
+            structures = structures.filter(department=department)
+        structures = {(structure.department_id, structure.year): structure for structure in structures}
+
+        students = Student.objects.filter(status='active', department__isnull=False)
+        if department is not None:
+            students = students.filter(department=department)
+        rows = (
+            students
+            .annotate(
+                has_hostel=Exists(HostelAllocation.objects.filter(student=OuterRef('pk'))),
+                has_transport=Exists(TransportAllocation.objects.filter(student=OuterRef('pk'))),
+                invoiced=Exists(FeePayment.objects.filter(
+                    student=OuterRef('pk'), academic_year=academic_year, semester=semester,
+                )),
+            )
+            .order_by('pk')
+            .values_list('pk', 'department_id', 'year', 'has_hostel', 'has_transport', 'invoiced')
+        )
+
+        batch = []
+        # Fetched up front (a few small tuples per student) rather than
+        # streamed, since we insert into FeePayment while going through it
+        for student_id, department_id, year, has_hostel, has_transport, invoiced in list(rows):
+            if invoiced:
+                report.already_invoiced += 1
+                continue
+            structure = structures.get((department_id, year))
+            if structure is None:
+                report.missing_structures[(department_id, year)] += 1
+                continue
+            amount = invoice_amount(structure, has_hostel, has_transport)
+            batch.append(FeePayment(
+                student_id=student_id, academic_year=academic_year, semester=semester,
+                total_amount=amount, amount_paid=ZERO, status='pending', due_date=due_date,
+            ))
+            report.total_amount += amount
+            if len(batch) >= batch_size:
+                _write_batch(batch, dry_run)
+                report.created += len(batch)
+                batch = []
+        if batch:
+            _write_batch(batch, dry_run)
+            report.created += len(batch)
+
+        if dry_run:
+            transaction.set_rollback(True)
+
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def _write_batch(invoices, dry_run):
+    if dry_run:
+        return
+    # bulk_create skips the post_save signal, so the ledger charges are
+    # posted here, in the same transaction.
+    FeePayment.objects.bulk_create(invoices)
+    post_entries([
+        (invoice.student_id, 'charge', invoice.total_amount, invoice.pk,
+         f"{invoice.academic_year} semester {invoice.semester}")
+        for invoice in invoices
+    ])
+    invalidate_fee_reports()
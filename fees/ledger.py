@@ -0,0 +1,229 @@
+"""
+Double-entry fee ledger and the per-student balance table.
+
+FeePayment rows stay the fee records the office edits (amount due,
+amount paid, waived or not). Every change to one is turned into ledger
+postings for the difference from what is already posted for it, so the
+ledger is an append-only history, and each posting moves the student's
+StudentFeeBalance row with an F() update in the same transaction.
+
+The fees dashboards read the balance row (a primary key lookup) and the
+outstanding-dues list sorts on its indexed balance column, where they
+used to add up FeePayment on every request.
+"""
+
+import uuid
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum, Q
+from django.utils import timezone
+
+from .models import FeePayment, FeeLedgerEntry, StudentFeeBalance
+
+ZERO = Decimal('0.00')
+
+# entry type -> (account debited, account credited)
+POSTING_ACCOUNTS = {
+    'charge': ('receivable', 'income'),
+    'payment': ('cash', 'receivable'),
+    'waiver': ('waivers', 'receivable'),
+}
+
+# entry type -> StudentFeeBalance column it adds to
+BALANCE_FIELDS = {
+    'charge': 'charged',
+    'payment': 'paid',
+    'waiver': 'waived',
+}
+
+LEDGER_BATCH_SIZE = 1000
+
+
+def _pair(student_id, entry_type, amount, payment_id, description, now):
+    """
+    The two entries for one posting. A negative amount reverses an
+    earlier posting, so the sides swap.
+    """
+    debit_account, credit_account = POSTING_ACCOUNTS[entry_type]
+    if amount < 0:
+        debit_account, credit_account = credit_account, debit_account
+        amount = -amount
+    txn = uuid.uuid4()
+    common = {
+        'txn': txn, 'student_id': student_id, 'payment_id': payment_id,
+        'entry_type': entry_type, 'description': description, 'posted_at': now,
+    }
+    return [
+        FeeLedgerEntry(account=debit_account, debit=amount, **common),
+        FeeLedgerEntry(account=credit_account, credit=amount, **common),
+    ]
+
+
+def _move_balances(deltas):
+    """
+    Apply {student_id: {'charged': x, 'paid': y, 'waived': z}} to the
+    balance rows. F() keeps concurrent postings for the same student from
+    overwriting each other. Students moved by the same amounts (a whole
+    class invoiced the same fee) share one UPDATE.
+    """
+    StudentFeeBalance.objects.bulk_create(
+        [StudentFeeBalance(student_id=student_id) for student_id in deltas],
+        ignore_conflicts=True,
+        batch_size=LEDGER_BATCH_SIZE,
+    )
+    by_delta = defaultdict(list)
+    for student_id, delta in deltas.items():
+        by_delta[(delta['charged'], delta['paid'], delta['waived'])].append(student_id)
+
+    for (charged, paid, waived), student_ids in by_delta.items():
+        for start in range(0, len(student_ids), LEDGER_BATCH_SIZE):
+            StudentFeeBalance.objects.filter(pk__in=student_ids[start:start + LEDGER_BATCH_SIZE]).update(
+                charged=F('charged') + charged,
+                paid=F('paid') + paid,
+                waived=F('waived') + waived,
+                balance=F('balance') + (charged - paid - waived),
+            )
+
+
+def post_entries(postings):
+    """
+    Post (student_id, entry_type, amount, payment_id, description) tuples
+    and update the students' balances, all in one transaction. Zero
+    amounts are skipped. Returns the number of postings made.
+    """
+    now = timezone.now()
+    entries = []
+    deltas = defaultdict(lambda: {'charged': ZERO, 'paid': ZERO, 'waived': ZERO})
+    for student_id, entry_type, amount, payment_id, description in postings:
+        if not amount:
+            continue
+        entries += _pair(student_id, entry_type, amount, payment_id, description, now)
+        deltas[student_id][BALANCE_FIELDS[entry_type]] += amount
+
+    if not entries:
+        return 0
+    with transaction.atomic():
+        FeeLedgerEntry.objects.bulk_create(entries, batch_size=LEDGER_BATCH_SIZE)
+        _move_balances(deltas)
+    return len(entries) // 2
+
+
+def payment_amounts(payment):
+    """What a fee record should have posted: charged, paid and waived."""
+    charged = payment.total_amount or ZERO
+    paid = payment.amount_paid or ZERO
+    waived = max(charged - paid, ZERO) if payment.status == 'waived' else ZERO
+    return {'charge': charged, 'payment': paid, 'waiver': waived}
+
+
+def posted_amounts(payment_ids):
+    """
+    {payment_id: {entry_type: amount}} already posted for the fee records,
+    read off the receivable side of their entries.
+    """
+    rows = (
+        FeeLedgerEntry.objects.filter(payment_id__in=payment_ids, account='receivable')
+        .values('payment_id', 'entry_type')
+        .annotate(debits=Sum('debit'), credits=Sum('credit'))
+        .order_by()
+    )
+    posted = defaultdict(lambda: {'charge': ZERO, 'payment': ZERO, 'waiver': ZERO})
+    for row in rows:
+        amount = (row['debits'] or ZERO) - (row['credits'] or ZERO)
+        # Payments and waivers credit the receivable
+        posted[row['payment_id']][row['entry_type']] = amount if row['entry_type'] == 'charge' else -amount
+    return posted
+
+
+def _lock_payments(payment_ids):
+    """
+    Lock the fee records, in primary key order so two syncs cannot
+    deadlock, and return them as they are now. Whoever syncs a record
+    second waits here and then sees the first sync's postings, rather
+    than posting the same difference again.
+    """
+    locked = []
+    for start in range(0, len(payment_ids), LEDGER_BATCH_SIZE):
+        locked.extend(
+            FeePayment.objects.select_for_update()
+            .filter(pk__in=payment_ids[start:start + LEDGER_BATCH_SIZE])
+            .order_by('pk')
+        )
+    return locked
+
+
+def sync_payments(payments):
+    """
+    Post whatever the fee records have changed by since they were last
+    posted. Safe to run any number of times, and from concurrent requests.
+    Returns postings made.
+    """
+    payment_ids = sorted({payment.pk for payment in payments})
+    with transaction.atomic():
+        # Post from the locked rows, not the instances passed in, which
+        # may be older than what another request has since saved
+        payments = _lock_payments(payment_ids)
+        posted = posted_amounts(payment_ids)
+        postings = []
+        for payment in payments:
+            already = posted[payment.pk]
+            for entry_type, amount in payment_amounts(payment).items():
+                postings.append((
+                    payment.student_id, entry_type, amount - already[entry_type], payment.pk,
+                    f"{payment.academic_year} semester {payment.semester}",
+                ))
+        return post_entries(postings)
+
+
+def reverse_payment(payment):
+    """Reverse everything posted for a fee record that is being deleted."""
+    with transaction.atomic():
+        _lock_payments([payment.pk])
+        already = posted_amounts([payment.pk])[payment.pk]
+        return post_entries([
+            (payment.student_id, entry_type, -amount, None, f"Deleted fee record #{payment.pk}")
+            for entry_type, amount in already.items()
+        ])
+
+
+def rebuild_balances():
+    """
+    Recompute every StudentFeeBalance from the ledger with one grouped
+    query. Returns the number of students with a balance row.
+    """
+    rows = (
+        FeeLedgerEntry.objects.filter(account='receivable')
+        .values('student_id')
+        .annotate(
+            charged=Sum(F('debit') - F('credit'), filter=Q(entry_type='charge'), default=ZERO),
+            paid=Sum(F('credit') - F('debit'), filter=Q(entry_type='payment'), default=ZERO),
+            waived=Sum(F('credit') - F('debit'), filter=Q(entry_type='waiver'), default=ZERO),
+        )
+        .order_by()
+    )
+    balances = []
+    for row in rows:
+        balances.append(StudentFeeBalance(
+            student_id=row['student_id'], charged=row['charged'], paid=row['paid'], waived=row['waived'],
+            balance=row['charged'] - row['paid'] - row['waived'],
+        ))
+    with transaction.atomic():
+        StudentFeeBalance.objects.all().delete()
+        StudentFeeBalance.objects.bulk_create(balances, batch_size=LEDGER_BATCH_SIZE)
+    return len(balances)
+
+
+def sync_all_payments(batch_size=LEDGER_BATCH_SIZE):
+    """Post every fee record's outstanding changes, a batch at a time."""
+    total = 0
+    batch = []
+    for payment in FeePayment.objects.order_by('pk').iterator(chunk_size=batch_size):
+        batch.append(payment)
+        if len(batch) >= batch_size:
+            total += sync_payments(batch)
+            batch = []
+    if batch:
+        total += sync_payments(batch)
+    return total
@@ -0,0 +1,69 @@
+import datetime
+import random
+import statistics
+from decimal import Decimal
+
+from django.db import connection
+from django.utils import timezone
+
+from core.benchmarks import BenchmarkCommand, seed_students, timings_ms
+from fees.ageing import ageing_report
+from fees.models import FeePayment
+
+TARGET_MS = 200
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Benchmarks the dues ageing report on synthetic fee records (default 500,000 across '
+        '10,000 students). All data is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--payments', type=int, default=500000)
+        parser.add_argument('--students', type=int, default=10000)
+        parser.add_argument('--departments', type=int, default=10)
+        parser.add_argument('--runs', type=int, default=5)
+
+    def seed(self, options):
+        num_payments, num_students = options['payments'], options['students']
+        self.stdout.write(f'Creating {num_payments} synthetic fee records...')
+        rng = random.Random(42)
+        today = timezone.localdate()
+
+        _, students = seed_students(num_students, options['departments'], rng)
+        batch = []
+        for i in range(num_payments):
+            total = Decimal(rng.choice((45000, 60000, 75000, 90000)))
+            roll = rng.random()
+            if roll < 0.6:
+                status, paid = 'paid', total
+            elif roll < 0.65:
+                status, paid = 'waived', Decimal('0')
+            else:
+                status, paid = 'pending', total * rng.choice((0, 0, Decimal('0.5')))
+            batch.append(FeePayment(
+                student=students[i % num_students], academic_year=f'{2000 + i // num_students}-{2001 + i // num_students}',
+                semester=1 + i % 2, total_amount=total, amount_paid=paid, status=status,
+                due_date=today + datetime.timedelta(days=rng.randint(-400, 60)),
+            ))
+            if len(batch) >= 5000:
+                FeePayment.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            FeePayment.objects.bulk_create(batch)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE fees_feepayment')
+
+    def run(self, options):
+        report = ageing_report()
+        timings = timings_ms(ageing_report, options['runs'])
+        median = statistics.median(timings)
+        style = self.style.SUCCESS if median < TARGET_MS else self.style.WARNING
+        self.stdout.write(style(
+            f'{connection.vendor}: ageing report over {FeePayment.objects.count()} fee records, '
+            f'{len(report["departments"])} departments: median {median:.0f} ms, best {timings[0]:.0f} ms '
+            f'(target {TARGET_MS} ms)'
+        ))
+        self.stdout.write(f'Outstanding ₹{report["total"]["outstanding"]} on {report["total"]["invoices"]} invoices.')
@@ -0,0 +1,47 @@
+import random
+from decimal import Decimal
+
+from django.db import connection
+
+from core.benchmarks import BenchmarkCommand, seed_students
+from fees.invoicing import create_invoices
+from fees.models import FeeStructure
+from hostel_transport.models import HostelAllocation, TransportAllocation
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Benchmarks semester invoicing on synthetic students (default 30,000 across 10 departments), '
+        'then runs it again to check it is idempotent. All data is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=30000)
+        parser.add_argument('--departments', type=int, default=10)
+
+    def seed(self, options):
+        self.stdout.write(f'Creating {options["students"]} synthetic students...')
+        rng = random.Random(42)
+
+        departments, students = seed_students(options['students'], options['departments'], rng)
+        FeeStructure.objects.bulk_create([
+            FeeStructure(department=department, year=year, tuition_fee=Decimal('50000'), hostel_fee=Decimal('30000'),
+                         transport_fee=Decimal('8000'), exam_fee=Decimal('2000'))
+            for department in departments for year in range(1, 5)
+        ])
+        HostelAllocation.objects.bulk_create(
+            [HostelAllocation(student=student) for student in students if rng.random() < 0.4], batch_size=2000
+        )
+        TransportAllocation.objects.bulk_create(
+            [TransportAllocation(student=student) for student in students if rng.random() < 0.3], batch_size=2000
+        )
+
+    def run(self, options):
+        first = create_invoices('2099-2100', 1)
+        self.stdout.write(
+            f'{connection.vendor}: {first.created} invoices (₹{first.total_amount}) in {first.elapsed:.2f} s'
+        )
+        second = create_invoices('2099-2100', 1)
+        self.stdout.write(
+            f'Re-run: {second.created} created, {second.already_invoiced} already invoiced, in {second.elapsed:.2f} s'
+        )
@@ -0,0 +1,45 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from fees.invoicing import create_invoices, INVOICE_DUE_DAYS
+from students.models import Department
+
+
+class Command(BaseCommand):
+    help = (
+        'Raises semester fee invoices for every active student from the fee structures. '
+        'Students already invoiced for the term are skipped, so it can be re-run safely.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('academic_year', help='e.g. 2025-2026')
+        parser.add_argument('semester', type=int)
+        parser.add_argument('--department', help='Department code; default is every department.')
+        parser.add_argument('--due-date', type=datetime.date.fromisoformat, help=f'YYYY-MM-DD; default is {INVOICE_DUE_DAYS} days from today.')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be invoiced without writing anything.')
+
+    def handle(self, *args, **options):
+        department = None
+        if options['department']:
+            try:
+                department = Department.objects.get(code=options['department'])
+            except Department.DoesNotExist:
+                raise CommandError(f"No department with code '{options['department']}'.")
+
+        report = create_invoices(
+            options['academic_year'], options['semester'], department=department,
+            due_date=options['due_date'], dry_run=options['dry_run'],
+        )
+
+        verb = 'Would create' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {report.created} invoices totalling ₹{report.total_amount} in {report.elapsed:.2f} s; '
+            f'{report.already_invoiced} students already invoiced.'
+        ))
+        if report.missing_structures:
+            names = dict(Department.objects.values_list('pk', 'code'))
+            for (department_id, year), count in sorted(report.missing_structures.items()):
+                self.stdout.write(self.style.WARNING(
+                    f'No fee structure for {names.get(department_id, department_id)} year {year}: {count} students not invoiced.'
+                ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from fees.ledger import sync_all_payments, rebuild_balances
+
+
+class Command(BaseCommand):
+    help = (
+        'Posts any fee record changes missing from the fee ledger (e.g. bulk updates that '
+        'bypassed save()) and recomputes every student balance from the ledger.'
+    )
+
+    def handle(self, *args, **options):
+        posted = sync_all_payments()
+        students = rebuild_balances()
+        self.stdout.write(self.style.SUCCESS(f'Made {posted} catch-up postings; rebuilt balances for {students} students.'))
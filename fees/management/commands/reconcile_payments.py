@@ -0,0 +1,49 @@
+import csv
+import datetime
+import time
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from core.csv_stream import iter_csv_batches, CSVFormatError
+from fees.reconciliation import reconcile_statement, STATEMENT_COLUMNS
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconciles a bank or payment gateway statement CSV against the fee records: '
+        'invoices it pays in full are marked paid, everything else is reported as unmatched.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('statement', help='Path to the statement CSV.')
+        parser.add_argument('--date', type=datetime.date.fromisoformat, help='Payment date (YYYY-MM-DD) for lines without one; default today.')
+        parser.add_argument('--unmatched', help='Write the unmatched lines to this CSV file.')
+        parser.add_argument('--dry-run', action='store_true', help='Match without saving anything.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with open(options['statement'], 'rb') as statement:
+                report = reconcile_statement(
+                    iter_csv_batches(File(statement), STATEMENT_COLUMNS),
+                    payment_date=options['date'], dry_run=options['dry_run'],
+                )
+        except OSError as e:
+            raise CommandError(e)
+        except CSVFormatError as e:
+            raise CommandError(f'CSV Error: {e}')
+
+        verb = 'Would mark' if options['dry_run'] else 'Marked'
+        self.stdout.write(self.style.SUCCESS(
+            f'{report.processed} lines in {time.perf_counter() - started:.2f} s. '
+            f'{verb} {report.matched} invoices paid (₹{report.amount_applied}); '
+            f'{report.already_recorded} already recorded; {len(report.unmatched)} unmatched.'
+        ))
+
+        if options['unmatched'] and report.unmatched:
+            with open(options['unmatched'], 'w', newline='') as out:
+                writer = csv.DictWriter(out, fieldnames=['line', 'transaction_id', 'student_id', 'amount', 'reason'])
+                writer.writeheader()
+                writer.writerows(report.unmatched)
+            self.stdout.write(f"Unmatched lines written to {options['unmatched']}.")
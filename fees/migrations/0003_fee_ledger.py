@@ -0,0 +1,105 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:30
+
+import uuid
+from collections import defaultdict
+from decimal import Decimal
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def post_existing_records(apps, schema_editor):
+    # Opening entries for the fee records that predate the ledger; same
+    # postings as fees.ledger.sync_payments, on the historical models.
+    FeePayment = apps.get_model('fees', 'FeePayment')
+    FeeLedgerEntry = apps.get_model('fees', 'FeeLedgerEntry')
+    StudentFeeBalance = apps.get_model('fees', 'StudentFeeBalance')
+    accounts = {'charge': ('receivable', 'income'), 'payment': ('cash', 'receivable'), 'waiver': ('waivers', 'receivable')}
+    zero = Decimal('0.00')
+    now = django.utils.timezone.now()
+
+    totals = defaultdict(lambda: {'charge': zero, 'payment': zero, 'waiver': zero})
+    entries = []
+    for payment in FeePayment.objects.iterator(chunk_size=1000):
+        charged = payment.total_amount or zero
+        paid = payment.amount_paid or zero
+        amounts = {
+            'charge': charged,
+            'payment': paid,
+            'waiver': max(charged - paid, zero) if payment.status == 'waived' else zero,
+        }
+        for entry_type, amount in amounts.items():
+            if not amount:
+                continue
+            debit_account, credit_account = accounts[entry_type]
+            if amount < 0:
+                debit_account, credit_account, amount = credit_account, debit_account, -amount
+                totals[payment.student_id][entry_type] -= amount
+            else:
+                totals[payment.student_id][entry_type] += amount
+            common = {
+                'txn': uuid.uuid4(), 'student_id': payment.student_id, 'payment_id': payment.pk,
+                'entry_type': entry_type, 'description': f"{payment.academic_year} semester {payment.semester}",
+                'posted_at': now,
+            }
+            entries.append(FeeLedgerEntry(account=debit_account, debit=amount, **common))
+            entries.append(FeeLedgerEntry(account=credit_account, credit=amount, **common))
+    FeeLedgerEntry.objects.bulk_create(entries, batch_size=1000)
+    StudentFeeBalance.objects.bulk_create([
+        StudentFeeBalance(
+            student_id=student_id, charged=t['charge'], paid=t['payment'], waived=t['waiver'],
+            balance=t['charge'] - t['payment'] - t['waiver'],
+        )
+        for student_id, t in totals.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fees', '0002_alter_feepayment_options_alter_feestructure_options_and_more'),
+        ('students', '0004_student_search_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentFeeBalance',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fee_balance', serialize=False, to='students.student')),
+                ('charged', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Total Charged')),
+                ('paid', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Total Paid')),
+                ('waived', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Total Waived')),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Outstanding Balance')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Student Fee Balance',
+                'verbose_name_plural': 'Student Fee Balances',
+                'ordering': ['-balance'],
+                'indexes': [models.Index(fields=['balance', 'student'], name='fees_studen_balance_d76c4f_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='FeeLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('txn', models.UUIDField(db_index=True, verbose_name='Transaction')),
+                ('entry_type', models.CharField(choices=[('charge', 'Charge'), ('payment', 'Payment'), ('waiver', 'Waiver')], max_length=10, verbose_name='Entry Type')),
+                ('account', models.CharField(choices=[('receivable', 'Student Receivable'), ('income', 'Fee Income'), ('cash', 'Cash / Bank'), ('waivers', 'Fee Waivers')], max_length=12, verbose_name='Account')),
+                ('debit', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Debit')),
+                ('credit', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Credit')),
+                ('description', models.CharField(blank=True, max_length=255, verbose_name='Description')),
+                ('posted_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Posted At')),
+                ('payment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='fees.feepayment')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_ledger', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Fee Ledger Entry',
+                'verbose_name_plural': 'Fee Ledger Entries',
+                'ordering': ['-posted_at', '-id'],
+                'indexes': [models.Index(fields=['student', 'account'], name='fees_feeled_student_04fe60_idx'), models.Index(fields=['payment', 'account'], name='fees_feeled_payment_6bc4a3_idx')],
+            },
+        ),
+        migrations.RunPython(post_existing_records, migrations.RunPython.noop),
+    ]
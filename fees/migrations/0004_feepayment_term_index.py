@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fees', '0003_fee_ledger'),
+        ('students', '0004_student_search_text'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feepayment',
+            index=models.Index(fields=['academic_year', 'semester', 'student'], name='fees_feepay_academi_4c6f4d_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fees', '0004_feepayment_term_index'),
+        ('students', '0004_student_search_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feepayment',
+            name='due_date',
+            field=models.DateField(blank=True, null=True, verbose_name='Due Date'),
+        ),
+        migrations.AddIndex(
+            model_name='feepayment',
+            index=models.Index(fields=['status', 'academic_year', 'semester'], name='fees_feepay_status_9d5071_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feepayment',
+            index=models.Index(fields=['payment_date'], name='fees_feepay_payment_71212d_idx'),
+        ),
+    ]
@@ -41,6 +41,7 @@ class FeePayment(models.Model):
     
     status = models.CharField(max_length=10, choices=PAYMENT_STATUS_CHOICES, default='pending')
     payment_date = models.DateField(null=True, blank=True, verbose_name=_("Date of Payment"))
+    due_date = models.DateField(null=True, blank=True, verbose_name=_("Due Date"))
     
     transaction_id = models.CharField(max_length=100, blank=True, null=True, verbose_name=_("Transaction ID"))
     
@@ -48,10 +49,104 @@ class FeePayment(models.Model):
         verbose_name = _("Fee Payment")
         verbose_name_plural = _("Fee Payments")
         ordering = ['-payment_date']
+        indexes = [
+            # Invoicing checks which students already have a record for the term
+            models.Index(fields=['academic_year', 'semester', 'student']),
+            # Fee search filters (fees.search)
+            models.Index(fields=['status', 'academic_year', 'semester']),
+            models.Index(fields=['payment_date']),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.academic_year} - Sem {self.semester}"
 
     @property
     def balance_due(self):
-        return self.total_amount - self.amount_paid
\ No newline at end of file
+        return self.total_amount - self.amount_paid
+
+    @property
+    def is_overdue(self):
+        return (
+            self.status == 'pending' and self.due_date is not None
+            and self.due_date < timezone.localdate() and self.balance_due > 0
+        )
+
+
+class FeeLedgerEntry(models.Model):
+    """
+    One side of a double-entry posting. Every charge, payment or waiver is
+    posted as two entries with the same txn id, a debit on one account and
+    an equal credit on the other:
+
+        charge:  Dr receivable  /  Cr fee income
+        payment: Dr cash        /  Cr receivable
+        waiver:  Dr waivers     /  Cr receivable
+
+    A student's balance is receivable debits minus credits. Corrections
+    are posted as reversing entries; rows are never edited. Written by
+    fees.ledger only.
+    """
+    ACCOUNT_CHOICES = [
+        ('receivable', 'Student Receivable'),
+        ('income', 'Fee Income'),
+        ('cash', 'Cash / Bank'),
+        ('waivers', 'Fee Waivers'),
+    ]
+    ENTRY_TYPE_CHOICES = [
+        ('charge', 'Charge'),
+        ('payment', 'Payment'),
+        ('waiver', 'Waiver'),
+    ]
+
+    txn = models.UUIDField(db_index=True, verbose_name=_("Transaction"))
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='fee_ledger')
+    # The fee record this posting came from, if any
+    payment = models.ForeignKey(FeePayment, on_delete=models.SET_NULL, null=True, blank=True, related_name='ledger_entries')
+
+    entry_type = models.CharField(max_length=10, choices=ENTRY_TYPE_CHOICES, verbose_name=_("Entry Type"))
+    account = models.CharField(max_length=12, choices=ACCOUNT_CHOICES, verbose_name=_("Account"))
+    debit = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name=_("Debit"))
+    credit = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name=_("Credit"))
+
+    description = models.CharField(max_length=255, blank=True, verbose_name=_("Description"))
+    posted_at = models.DateTimeField(default=timezone.now, verbose_name=_("Posted At"))
+
+    class Meta:
+        verbose_name = _("Fee Ledger Entry")
+        verbose_name_plural = _("Fee Ledger Entries")
+        ordering = ['-posted_at', '-id']
+        indexes = [
+            models.Index(fields=['student', 'account']),
+            models.Index(fields=['payment', 'account']),
+        ]
+
+    def __str__(self):
+        amount = self.debit or -self.credit
+        return f"{self.get_entry_type_display()} {self.account} {amount} ({self.student})"
+
+
+class StudentFeeBalance(models.Model):
+    """
+    Running totals of a student's receivable account, updated in the same
+    transaction as every ledger posting, so dashboards read one row
+    instead of adding up the ledger. `manage.py rebuild_fee_balances`
+    recomputes them from the ledger.
+    """
+    student = models.OneToOneField(Student, on_delete=models.CASCADE, primary_key=True, related_name='fee_balance')
+
+    charged = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name=_("Total Charged"))
+    paid = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name=_("Total Paid"))
+    waived = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name=_("Total Waived"))
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name=_("Outstanding Balance"))
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Student Fee Balance")
+        verbose_name_plural = _("Student Fee Balances")
+        ordering = ['-balance']
+        # Sorting and paging the outstanding-dues list
+        indexes = [models.Index(fields=['balance', 'student'])]
+
+    def __str__(self):
+        return f"{self.student}: {self.balance}"
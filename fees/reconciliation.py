@@ -0,0 +1,234 @@
+"""
+Bank / payment gateway statement reconciliation.
+
+reconcile_statement() takes a statement export (transaction_id,
+student_id, amount and optionally date columns), streamed in batches by
+core.csv_stream, and matches every line to a FeePayment:
+
+1. A line whose transaction ID is already on a fee record matches that
+   record. If it is paid, the payment has been entered by hand and is
+   counted as already recorded. If it is still pending (the invoice was
+   tagged with the gateway's transaction ID when the payment started),
+   the line pays it when the amount is the invoice's balance; any other
+   amount goes to the unmatched report for the office to settle.
+2. Otherwise the line pays an open (pending) invoice of that student
+   whose balance is exactly the amount, oldest term first. Partial
+   payments aren't guessed at; they end up in the unmatched report for
+   the office to enter by hand.
+
+The lookups are dictionaries built from one query over the open and
+already-paid records before the file is read, so each line costs a
+couple of hash lookups however long the statement is. Matched invoices
+are marked paid with one bulk_update at the end, together with their
+ledger postings, in one transaction. Rows are locked and re-checked
+first, so an invoice edited while the file was being read is reported
+instead of overwritten.
+"""
+
+import datetime
+from collections import defaultdict, deque
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .ageing import invalidate_fee_reports
+from .ledger import post_entries, ZERO
+from .models import FeePayment
+
+STATEMENT_COLUMNS = ('transaction_id', 'student_id', 'amount')
+
+# Rows locked / written per query when applying matches
+RECONCILE_BATCH_SIZE = 1000
+
+CENT = Decimal('0.01')
+
+
+class ReconciliationReport:
+    """
+    Outcome of a reconciliation: statement lines processed, invoices
+    matched and paid, lines already recorded by hand, and every line that
+    couldn't be matched with the reason.
+    """
+
+    def __init__(self):
+        self.processed = 0
+        self.matched = 0
+        self.already_recorded = 0
+        self.amount_applied = ZERO
+        self.unmatched = []
+
+    def reject(self, line, row, reason):
+        self.unmatched.append({
+            'line': line,
+            'transaction_id': row.get('transaction_id', ''),
+            'student_id': row.get('student_id', ''),
+            'amount': row.get('amount', ''),
+            'reason': reason,
+        })
+
+
+class PaymentIndex:
+    """
+    In-memory lookups over the fee records, built with one query:
+    transaction ID -> (pk, status, balance) of the record it is on, and
+    (student_id, open balance) -> queue of untagged pending records,
+    oldest term first.
+    """
+
+    def __init__(self):
+        self.by_transaction = {}
+        self.by_student_amount = defaultdict(deque)
+        # pk -> amount_paid when the index was built, to re-check on apply
+        self.snapshot = {}
+
+        rows = (
+            FeePayment.objects
+            .filter(Q(status='pending') | Q(transaction_id__gt=''))
+            .order_by('academic_year', 'semester', 'pk')
+            .values_list('pk', 'student__student_id', 'transaction_id', 'total_amount', 'amount_paid', 'status')
+        )
+        for pk, student_id, transaction_id, total_amount, amount_paid, status in rows.iterator(chunk_size=5000):
+            balance = total_amount - amount_paid
+            if transaction_id:
+                self.by_transaction[transaction_id.strip()] = (pk, status, balance)
+            if status == 'pending' and balance > 0:
+                if not transaction_id:
+                    self.by_student_amount[(student_id.lower(), balance)].append(pk)
+                self.snapshot[pk] = amount_paid
+
+    def take(self, student_id, amount):
+        """The next open invoice for this student and amount, or None."""
+        queue = self.by_student_amount.get((student_id.lower(), amount))
+        return queue.popleft() if queue else None
+
+
+def _parse_amount(value):
+    try:
+        amount = Decimal((value or '').replace(',', ''))
+    except InvalidOperation:
+        return None
+    if not amount.is_finite() or amount <= 0:
+        return None
+    return amount.quantize(CENT)
+
+
+def _parse_date(value, default):
+    if not value:
+        return default
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def reconcile_statement(batches, payment_date=None, dry_run=False):
+    """
+    Reconcile batches of (line_number, row) pairs from
+    core.csv_stream.iter_csv_batches(file, STATEMENT_COLUMNS).
+    `payment_date` is used for lines without a date column (default
+    today). With dry_run nothing is written. Returns a
+    ReconciliationReport.
+    """
+    payment_date = payment_date or timezone.localdate()
+    report = ReconciliationReport()
+    index = PaymentIndex()
+    seen = set()
+    # pk -> (transaction_id, amount, date)
+    matches = {}
+
+    for batch in batches:
+        for line, row in batch:
+            report.processed += 1
+            transaction_id = row.get('transaction_id') or ''
+            if not transaction_id:
+                report.reject(line, row, "Missing transaction ID.")
+                continue
+            if transaction_id in seen:
+                report.reject(line, row, "Duplicate transaction ID in this file.")
+                continue
+            seen.add(transaction_id)
+
+            recorded = index.by_transaction.get(transaction_id)
+            if recorded is not None and recorded[1] == 'paid':
+                report.already_recorded += 1
+                continue
+            if recorded is not None and recorded[0] not in index.snapshot:
+                report.reject(line, row, "Transaction ID is already on an invoice that is not open.")
+                continue
+
+            amount = _parse_amount(row.get('amount'))
+            if amount is None:
+                report.reject(line, row, "Amount is not a positive number.")
+                continue
+            paid_on = _parse_date(row.get('date'), payment_date)
+            if paid_on is None:
+                report.reject(line, row, "Date must be in YYYY-MM-DD format.")
+                continue
+
+            if recorded is not None:
+                pk, _, balance = recorded
+                if amount != balance:
+                    report.reject(line, row, "Amount does not match the balance of the invoice with this transaction ID.")
+                    continue
+                matches[pk] = (transaction_id, amount, paid_on, line, row)
+                continue
+
+            pk = index.take(row.get('student_id') or '', amount)
+            if pk is None:
+                report.reject(line, row, "No open invoice for this student with this balance.")
+                continue
+            matches[pk] = (transaction_id, amount, paid_on, line, row)
+
+    if dry_run:
+        report.matched = len(matches)
+        report.amount_applied = sum((match[1] for match in matches.values()), ZERO)
+        return report
+
+    _apply_matches(matches, index, report)
+    return report
+
+
+def _apply_matches(matches, index, report):
+    pks = list(matches)
+    with transaction.atomic():
+        payments = []
+        for start in range(0, len(pks), RECONCILE_BATCH_SIZE):
+            chunk = pks[start:start + RECONCILE_BATCH_SIZE]
+            payments.extend(FeePayment.objects.select_for_update().filter(pk__in=chunk).order_by('pk'))
+
+        to_update = []
+        for payment in payments:
+            transaction_id, amount, paid_on, line, row = matches[payment.pk]
+            if (
+                payment.status != 'pending'
+                or (payment.transaction_id or '').strip() not in ('', transaction_id)
+                or payment.amount_paid != index.snapshot[payment.pk]
+            ):
+                report.reject(line, row, "The invoice was changed while the statement was being reconciled.")
+                continue
+            payment.amount_paid += amount
+            payment.status = 'paid'
+            payment.payment_date = paid_on
+            payment.transaction_id = transaction_id
+            to_update.append(payment)
+            report.amount_applied += amount
+        # Invoices deleted since the index was built
+        for pk in set(pks) - {payment.pk for payment in payments}:
+            transaction_id, amount, paid_on, line, row = matches[pk]
+            report.reject(line, row, "The invoice was deleted while the statement was being reconciled.")
+
+        FeePayment.objects.bulk_update(
+            to_update, ['amount_paid', 'status', 'payment_date', 'transaction_id'],
+            batch_size=RECONCILE_BATCH_SIZE,
+        )
+        # bulk_update skips the post_save signal, so post the payments here
+        post_entries([
+            (payment.student_id, 'payment', matches[payment.pk][1], payment.pk, f"Statement {payment.transaction_id}")
+            for payment in to_update
+        ])
+        report.matched = len(to_update)
+        if to_update:
+            invalidate_fee_reports()
+    report.unmatched.sort(key=lambda item: item['line'])
@@ -0,0 +1,83 @@
+"""
+Fee payment search for the admin fees dashboard.
+
+The dashboard used to render every FeePayment ever recorded. It now shows
+one keyset page of a filtered search:
+
+- `state` narrows to pending (nothing paid), partially paid, overdue
+  (past its due date with a balance left), paid or waived records. The
+  pending states all filter on status='pending' first, so together with
+  the term filters they are answered by the (status, academic_year,
+  semester) index.
+- The free-text query goes through core.search against Student.search_text
+  instead of three icontains over a join to core_user.
+- Totals for the whole filtered set (not just the page) come from one
+  aggregate query.
+"""
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+
+from core.search import search, tokenize
+from students.models import Student
+
+from .ledger import ZERO
+
+PAYMENT_PAGE_SIZE = 50
+
+PAYMENT_ORDERINGS = {
+    'newest': ('-id',),
+    # Only records with a payment date; the cursor can't hold a NULL
+    'recent_payment': ('-payment_date', '-id'),
+}
+
+BALANCE_DUE = ExpressionWrapper(F('total_amount') - F('amount_paid'), output_field=DecimalField(max_digits=10, decimal_places=2))
+
+
+def state_filter(state, today=None):
+    """Q for one of the dashboard's payment states."""
+    today = today or timezone.localdate()
+    if state == 'pending':
+        return Q(status='pending', amount_paid__lte=0)
+    if state == 'partial':
+        return Q(status='pending', amount_paid__gt=0, amount_paid__lt=F('total_amount'))
+    if state == 'overdue':
+        return Q(status='pending', due_date__lt=today, amount_paid__lt=F('total_amount'))
+    return Q(status=state)
+
+
+def search_payments(queryset, query='', state='', academic_year='', semester=None, department=None, sort='newest'):
+    """
+    Apply the dashboard filters to a FeePayment queryset. Returns
+    (queryset, ordering) ready for core.pagination.keyset_page().
+    """
+    if state:
+        queryset = queryset.filter(state_filter(state))
+    if academic_year:
+        queryset = queryset.filter(academic_year=academic_year)
+    if semester:
+        queryset = queryset.filter(semester=semester)
+    if department is not None:
+        queryset = queryset.filter(student__department=department)
+    if tokenize(query):
+        students = search(Student.objects.all(), query, 'students')
+        queryset = queryset.filter(student__in=students.values('pk'))
+
+    sort = sort if sort in PAYMENT_ORDERINGS else 'newest'
+    if sort == 'recent_payment':
+        queryset = queryset.filter(payment_date__isnull=False)
+    return queryset, PAYMENT_ORDERINGS[sort]
+
+
+def payment_totals(queryset):
+    """
+    Count, amount due, amount paid and outstanding balance of every
+    record in `queryset`, in one query. Waived records don't count
+    towards the outstanding balance.
+    """
+    return queryset.order_by().aggregate(
+        count=Count('id'),
+        total_due=Sum('total_amount', default=ZERO),
+        total_paid=Sum('amount_paid', default=ZERO),
+        outstanding=Sum(BALANCE_DUE, filter=Q(status='pending'), default=ZERO),
+    )
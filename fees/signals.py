@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import FeePayment
+from .ledger import sync_payments, reverse_payment
+from .ageing import invalidate_fee_reports
+
+
+@receiver(post_save, sender=FeePayment)
+def post_fee_record(sender, instance, raw=False, **kwargs):
+    # Posted straight away rather than on commit: the views save fee
+    # records inside a transaction, so the record, its ledger entries and
+    # the balance change commit or roll back together.
+    if raw:
+        return
+    sync_payments([instance])
+    invalidate_fee_reports()
+
+
+@receiver(pre_delete, sender=FeePayment)
+def reverse_fee_record(sender, instance, **kwargs):
+    # Before the delete, while the entries still point at the record
+    reverse_payment(instance)
+    invalidate_fee_reports()
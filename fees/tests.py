@@ -0,0 +1,56 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from core.models import User
+from students.models import Department, Student
+from fees.models import FeePayment, StudentFeeBalance
+from fees.reconciliation import reconcile_statement
+
+
+class ReconcileTransactionIdTests(TestCase):
+    """Statement lines whose transaction ID is already on a fee record."""
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Computer Science', code='CSE')
+        user = User.objects.create(username='STU001', role='student')
+        cls.student = Student.objects.create(user=user, student_id='STU001', department=department, year=1, semester=1)
+
+    def _invoice(self, semester, paid, transaction_id, status='pending'):
+        return FeePayment.objects.create(
+            student=self.student, academic_year='2025-2026', semester=semester, total_amount=Decimal('1000'),
+            amount_paid=Decimal(paid), transaction_id=transaction_id, status=status,
+        )
+
+    def _reconcile(self, *lines):
+        rows = [
+            (number, {'transaction_id': transaction_id, 'student_id': 'STU001', 'amount': amount})
+            for number, (transaction_id, amount) in enumerate(lines, start=2)
+        ]
+        return reconcile_statement([rows])
+
+    def test_tagged_pending_invoice_is_paid_by_its_transaction(self):
+        invoice = self._invoice(1, '400', 'GW-1')
+        report = self._reconcile(('GW-1', '600'))
+
+        self.assertEqual((report.matched, report.already_recorded, report.unmatched), (1, 0, []))
+        invoice.refresh_from_db()
+        self.assertEqual((invoice.status, invoice.amount_paid, invoice.transaction_id), ('paid', Decimal('1000'), 'GW-1'))
+        self.assertEqual(StudentFeeBalance.objects.get(student=self.student).balance, Decimal('0'))
+
+    def test_amount_other_than_the_tagged_balance_is_reported(self):
+        invoice = self._invoice(1, '400', 'GW-1')
+        # Same student and amount as another open invoice: still not a match
+        self._invoice(2, '0', '')
+        report = self._reconcile(('GW-1', '1000'))
+
+        self.assertEqual(report.matched, 0)
+        self.assertEqual([row['line'] for row in report.unmatched], [2])
+        invoice.refresh_from_db()
+        self.assertEqual((invoice.status, invoice.amount_paid), ('pending', Decimal('400')))
+
+    def test_paid_invoice_counts_as_already_recorded(self):
+        self._invoice(1, '1000', 'GW-1', status='paid')
+        report = self._reconcile(('GW-1', '1000'))
+        self.assertEqual((report.matched, report.already_recorded, report.unmatched), (0, 1, []))
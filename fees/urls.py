@@ -5,6 +5,18 @@ urlpatterns = [
     # /fees/
     path('', views.fees_dashboard_view, name='fees'),
     
+    # /fees/dues/ (students with outstanding balances)
+    path('dues/', views.outstanding_dues_view, name='outstanding_dues'),
+
+    # /fees/payments/reconcile/ (bank statement upload)
+    path('payments/reconcile/', views.reconcile_payments_view, name='reconcile_payments'),
+
+    # /fees/reports/ageing/ (dues by age bucket and department)
+    path('reports/ageing/', views.dues_ageing_view, name='dues_ageing'),
+
+    # /fees/invoices/generate/
+    path('invoices/generate/', views.generate_invoices_view, name='generate_invoices'),
+
     # /fees/structure/
     path('structure/', views.fee_structure_list_view, name='fee_structure_list'),
     
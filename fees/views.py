@@ -1,10 +1,30 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from .models import FeePayment, FeeStructure
-from .forms import FeePaymentForm, FeeStructureForm
+from .models import FeePayment, FeeStructure, StudentFeeBalance
+from .forms import FeePaymentForm, FeeStructureForm, DuesFilterForm, InvoiceRunForm, PaymentSearchForm, ReconciliationForm
+from .invoicing import create_invoices
+from .reconciliation import reconcile_statement, STATEMENT_COLUMNS
+from .ageing import cached_ageing_report, AGEING_BUCKETS, EXPORT_COLUMNS
+from .search import search_payments, payment_totals, PAYMENT_PAGE_SIZE
 from students.models import Student
 from django.contrib import messages
-from django.db.models import Sum
+from django.db import transaction
+from core.pagination import keyset_page
+from core.csv_stream import iter_csv_batches, CSVFormatError
+from django.http import HttpResponse
+import csv
+
+# Unmatched statement lines listed on the page; the CSV download has all of them
+UNMATCHED_SHOWN = 200
+
+# Students with the largest balances shown on the admin dashboard
+DASHBOARD_DUES_SIZE = 10
+DUES_PAGE_SIZE = 50
+
+DUES_ORDERINGS = {
+    'highest': ('-balance', '-student_id'),
+    'lowest': ('balance', 'student_id'),
+}
 
 @login_required
 def fees_dashboard_view(request):
@@ -15,33 +35,49 @@ def fees_dashboard_view(request):
     """
     if request.user.role == 'student':
         payments = FeePayment.objects.filter(student__user=request.user).order_by('-academic_year', '-semester')
-        total_paid = payments.aggregate(Sum('amount_paid'))['amount_paid__sum'] or 0
-        total_due = payments.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-        total_balance = total_due - total_paid
+        # Totals are kept up to date by the fee ledger (fees.ledger)
+        balance = StudentFeeBalance.objects.filter(student__user=request.user).first()
         
         context = {
             'payments': payments,
-            'total_paid': total_paid,
-            'total_due': total_due,
-            'total_balance': total_balance,
+            'total_paid': balance.paid if balance else 0,
+            'total_due': balance.charged if balance else 0,
+            'total_waived': balance.waived if balance else 0,
+            'total_balance': balance.balance if balance else 0,
         }
         return render(request, 'fees/student_fees_view.html', context)
     
     # Admin/Faculty View
-    # Simple search by student ID or name
-    query = request.GET.get('q', '')
-    if query:
-        payments = FeePayment.objects.filter(
-            Q(student__student_id__icontains=query) |
-            Q(student__user__first_name__icontains=query) |
-            Q(student__user__last_name__icontains=query)
-        ).select_related('student__user').order_by('-payment_date')
+    # Filtered search, one keyset page at a time (see fees/search.py)
+    form = PaymentSearchForm(request.GET)
+    payments = FeePayment.objects.select_related('student__user')
+    if form.is_valid():
+        data = form.cleaned_data
+        payments, ordering = search_payments(
+            payments, query=data['q'], state=data['state'], academic_year=data['academic_year'],
+            semester=data['semester'], department=data['department'], sort=data['sort'],
+        )
     else:
-        payments = FeePayment.objects.all().select_related('student__user').order_by('-payment_date')
+        payments, ordering = search_payments(payments)
+    page, next_cursor = keyset_page(payments, ordering, request.GET.get('after'), PAYMENT_PAGE_SIZE)
+
+    # Query string for the "next page" link, minus the old cursor
+    params = request.GET.copy()
+    params.pop('after', None)
+
+    top_dues = (
+        StudentFeeBalance.objects.filter(balance__gt=0)
+        .select_related('student__user', 'student__department')
+        .order_by(*DUES_ORDERINGS['highest'])[:DASHBOARD_DUES_SIZE]
+    )
     
     context = {
-        'payments': payments,
-        'search_query': query,
+        'form': form,
+        'payments': page,
+        'next_cursor': next_cursor,
+        'filter_params': params.urlencode(),
+        'totals': payment_totals(payments),
+        'top_dues': top_dues,
     }
     return render(request, 'fees/admin_fees_dashboard.html', context)
 
@@ -100,6 +136,7 @@ def edit_fee_structure_view(request, pk):
     return render(request, 'fees/fee_structure_form.html', context)
 
 @login_required
+@transaction.atomic
 def add_payment_view(request, student_pk):
     if not (request.user.role == 'admin' or request.user.role == 'faculty'):
         return redirect('fees')
@@ -125,6 +162,7 @@ def add_payment_view(request, student_pk):
     return render(request, 'fees/fee_payment_form.html', context)
 
 @login_required
+@transaction.atomic
 def edit_payment_view(request, pk):
     if not (request.user.role == 'admin' or request.user.role == 'faculty'):
         return redirect('fees')
@@ -146,4 +184,155 @@ def edit_payment_view(request, pk):
         'student': student,
         'form_title': f'Edit Payment for {student.user.get_full_name()}'
     }
-    return render(request, 'fees/fee_payment_form.html', context)
\ No newline at end of file
+    return render(request, 'fees/fee_payment_form.html', context)
+
+
+@login_required
+def outstanding_dues_view(request):
+    """
+    Students who owe fees, largest balance first (or smallest), filtered
+    by department and minimum balance. Reads the StudentFeeBalance table
+    one keyset page at a time.
+    """
+    if not (request.user.role == 'admin' or request.user.role == 'faculty'):
+        return redirect('fees')
+
+    form = DuesFilterForm(request.GET)
+    balances = StudentFeeBalance.objects.select_related('student__user', 'student__department')
+    ordering = DUES_ORDERINGS['highest']
+    if form.is_valid():
+        data = form.cleaned_data
+        balances = balances.filter(balance__gte=data['min_balance'])
+        if data['department']:
+            balances = balances.filter(student__department=data['department'])
+        ordering = DUES_ORDERINGS[data['sort'] or 'highest']
+    else:
+        balances = balances.filter(balance__gt=0)
+
+    dues, next_cursor = keyset_page(balances, ordering, request.GET.get('after'), DUES_PAGE_SIZE)
+
+    # Query string for the "next page" link, minus the old cursor
+    params = request.GET.copy()
+    params.pop('after', None)
+
+    context = {
+        'form': form,
+        'dues': dues,
+        'next_cursor': next_cursor,
+        'filter_params': params.urlencode(),
+    }
+    return render(request, 'fees/outstanding_dues.html', context)
+
+
+@login_required
+def generate_invoices_view(request):
+    """
+    Raise the term's fee invoices for every active student from the fee
+    structures. Students who already have a record for the term are left
+    alone, so it is safe to run again after admitting more students.
+    """
+    if not request.user.role == 'admin':
+        messages.error(request, "You do not have permission to generate invoices.")
+        return redirect('fees')
+
+    report = None
+    if request.method == 'POST':
+        form = InvoiceRunForm(request.POST)
+        if form.is_valid():
+            data = form.cleaned_data
+            report = create_invoices(
+                data['academic_year'], data['semester'], department=data['department'],
+                due_date=data['due_date'], dry_run=data['dry_run'],
+            )
+            if data['dry_run']:
+                messages.info(request, f"Dry run: {report.created} invoices totalling ₹{report.total_amount} would be created.")
+            else:
+                messages.success(request, f"Created {report.created} invoices totalling ₹{report.total_amount}.")
+            if report.without_structure:
+                messages.warning(request, f"{report.without_structure} students have no fee structure for their department and year.")
+    else:
+        form = InvoiceRunForm()
+
+    context = {
+        'form': form,
+        'report': report,
+    }
+    return render(request, 'fees/generate_invoices.html', context)
+
+
+@login_required
+def reconcile_payments_view(request):
+    """
+    Upload a bank or gateway statement and mark the invoices it pays as
+    paid (see fees/reconciliation.py). Lines that can't be matched are
+    listed, or downloaded as a CSV to work through by hand.
+    """
+    if not request.user.role == 'admin':
+        messages.error(request, "You do not have permission to reconcile payments.")
+        return redirect('fees')
+
+    report = None
+    if request.method == 'POST':
+        form = ReconciliationForm(request.POST, request.FILES)
+        if form.is_valid():
+            data = form.cleaned_data
+            try:
+                report = reconcile_statement(
+                    iter_csv_batches(data['statement'], STATEMENT_COLUMNS),
+                    payment_date=data['payment_date'], dry_run=data['dry_run'],
+                )
+            except CSVFormatError as e:
+                messages.error(request, f"CSV Error: {e} No payments were applied.")
+            else:
+                if data['download_unmatched']:
+                    response = HttpResponse(content_type='text/csv')
+                    response['Content-Disposition'] = 'attachment; filename="unmatched_statement_lines.csv"'
+                    writer = csv.DictWriter(response, fieldnames=['line', 'transaction_id', 'student_id', 'amount', 'reason'])
+                    writer.writeheader()
+                    writer.writerows(report.unmatched)
+                    return response
+                verb = "would be marked" if data['dry_run'] else "marked"
+                messages.success(request, f"{report.matched} invoices {verb} paid (₹{report.amount_applied}).")
+                if report.unmatched:
+                    messages.warning(request, f"{len(report.unmatched)} statement lines could not be matched.")
+    else:
+        form = ReconciliationForm()
+
+    context = {
+        'form': form,
+        'report': report,
+        'unmatched': report.unmatched[:UNMATCHED_SHOWN] if report else [],
+    }
+    return render(request, 'fees/reconcile_payments.html', context)
+
+
+@login_required
+def dues_ageing_view(request):
+    """
+    Outstanding fees by department and by how long they are overdue,
+    with what falls due next month. ?download returns it as CSV.
+    """
+    if not request.user.role == 'admin':
+        messages.error(request, "You do not have permission to view fee reports.")
+        return redirect('fees')
+
+    report = cached_ageing_report()
+    rows = report['departments'] + [report['total']]
+
+    if 'download' in request.GET:
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="fee_dues_ageing_{report["today"]}.csv"'
+        writer = csv.writer(response)
+        writer.writerow(EXPORT_COLUMNS)
+        for row in rows:
+            writer.writerow([row[column] for column in EXPORT_COLUMNS])
+        return response
+
+    # Templates can't index a dict by a variable, so spell out the bucket cells
+    context = {
+        'report': report,
+        'bucket_labels': [label for key, label, low, high in AGEING_BUCKETS],
+        'rows': [(row, [row[key] for key, label, low, high in AGEING_BUCKETS]) for row in report['departments']],
+        'total_buckets': [report['total'][key] for key, label, low, high in AGEING_BUCKETS],
+    }
+    return render(request, 'fees/dues_ageing.html', context)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Book, BookIssue
+from .models import Book, BookIssue, FinePolicy, FineReminder, Reservation, CirculationDaily
 
 @admin.register(Book)
 class BookAdmin(admin.ModelAdmin):
@@ -11,4 +11,30 @@ class BookIssueAdmin(admin.ModelAdmin):
     list_display = ('book', 'student', 'issue_date', 'due_date', 'return_date', 'fine_amount')
     list_filter = ('issue_date', 'due_date', 'return_date', 'student__department')
     search_fields = ('book__title', 'student__user__username', 'student__student_id')
-    autocomplete_fields = ('book', 'student')
\ No newline at end of file
+    autocomplete_fields = ('book', 'student')
+
+@admin.register(Reservation)
+class ReservationAdmin(admin.ModelAdmin):
+    list_display = ('book', 'student', 'status', 'created_at', 'hold_until')
+    list_filter = ('status', 'created_at')
+    search_fields = ('book__title', 'student__student_id', 'student__user__username')
+    autocomplete_fields = ('book', 'student')
+
+@admin.register(FinePolicy)
+class FinePolicyAdmin(admin.ModelAdmin):
+    list_display = ('name', 'daily_rate', 'grace_days', 'max_fine', 'reminder_interval_days', 'is_active', 'updated_at')
+    list_filter = ('is_active',)
+
+@admin.register(FineReminder)
+class FineReminderAdmin(admin.ModelAdmin):
+    list_display = ('issue', 'recipient', 'fine_amount', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('recipient', 'issue__book__title', 'issue__student__student_id')
+    raw_id_fields = ('issue',)
+
+@admin.register(CirculationDaily)
+class CirculationDailyAdmin(admin.ModelAdmin):
+    list_display = ('day', 'book', 'department', 'issues', 'returns', 'overdue_returns', 'fines')
+    list_filter = ('day', 'department')
+    search_fields = ('book__title', 'book__isbn')
+    raw_id_fields = ('book',)
@@ -0,0 +1,158 @@
+"""
+Nightly overdue fines and reminder emails (`manage.py accrue_library_fines`).
+
+Fines used to be worked out only when a book came back, so nobody could
+see what was owed on books still out. accrue_fines() now writes the fine
+accrued so far into BookIssue.fine_amount for every open overdue issue.
+The fine only depends on the due date, so it is one UPDATE with a CASE
+over the distinct due dates rather than a query per issue; return_books()
+replaces it with the final figure when the book is handed back.
+
+Reminder emails go through a queue (FineReminder) and are sent in batches
+over one backend connection, with a pause between batches to stay under
+the mail server's rate limit. Whatever EMAIL_BACKEND is configured is
+used, so the console and locmem backends work for trying it out.
+"""
+
+import datetime
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Case, When, Value, DecimalField, Sum, Count
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import BookIssue, FinePolicy, FineReminder
+
+# Messages handed to the backend per connection.send_messages() call
+REMINDER_BATCH_SIZE = 50
+
+# Upper bound on reminder emails sent per minute
+REMINDERS_PER_MINUTE = 120
+
+# A reminder is given up on after this many failed sends
+MAX_SEND_ATTEMPTS = 3
+
+
+def overdue_issues(today=None):
+    today = today or timezone.now().date()
+    return BookIssue.objects.filter(return_date__isnull=True, due_date__lt=today)
+
+
+def accrue_fines(today=None, policy=None):
+    """
+    Set fine_amount on every open overdue issue to the fine accrued up to
+    `today`. Returns the number of issues updated.
+    """
+    today = today or timezone.now().date()
+    policy = policy or FinePolicy.current()
+    issues = overdue_issues(today)
+
+    due_dates = issues.order_by().values_list('due_date', flat=True).distinct()
+    fines = [
+        When(due_date=due_date, then=Value(policy.fine_for((today - due_date).days)))
+        for due_date in due_dates
+    ]
+    if not fines:
+        return 0
+    return issues.update(
+        fine_amount=Case(*fines, default=Value(0), output_field=DecimalField(max_digits=8, decimal_places=2))
+    )
+
+
+def outstanding_fines(today=None):
+    """Count and total accrued fine of the open overdue issues."""
+    return overdue_issues(today).aggregate(count=Count('id'), total=Sum('fine_amount'))
+
+
+def queue_reminders(today=None, policy=None):
+    """
+    Queue a reminder for every open overdue issue that has a fine, whose
+    borrower has an email address and hasn't opted out, and that hasn't
+    had a reminder in the last policy.reminder_interval_days days.
+    Returns the number queued.
+    """
+    policy = policy or FinePolicy.current()
+    since = timezone.now() - datetime.timedelta(days=max(policy.reminder_interval_days, 1))
+
+    rows = (
+        overdue_issues(today)
+        .filter(fine_amount__gt=0, student__user__email_notifications=True)
+        .exclude(student__user__email='')
+        .exclude(reminders__created_at__gte=since)
+        .order_by('pk')
+        .values_list('pk', 'student__user__email', 'fine_amount')
+    )
+    reminders = FineReminder.objects.bulk_create(
+        [FineReminder(issue_id=pk, recipient=email, fine_amount=fine) for pk, email, fine in rows],
+        batch_size=REMINDER_BATCH_SIZE * 10,
+    )
+    return len(reminders)
+
+
+def _build_message(reminder, connection):
+    issue = reminder.issue
+    context = {'issue': issue, 'student': issue.student, 'book': issue.book, 'fine_amount': reminder.fine_amount}
+    return EmailMessage(
+        subject=f"Overdue library book: {issue.book.title}",
+        body=render_to_string('library/email/fine_reminder.txt', context),
+        from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', None),
+        to=[reminder.recipient],
+        connection=connection,
+    )
+
+
+def send_reminders(batch_size=REMINDER_BATCH_SIZE, per_minute=REMINDERS_PER_MINUTE, limit=None, sleep=time.sleep):
+    """
+    Send queued reminders, oldest first, batch_size at a time over one
+    backend connection, pausing between batches so no more than
+    `per_minute` go out per minute. A batch the backend rejects is
+    retried on the next run, up to MAX_SEND_ATTEMPTS times.
+    Returns (sent, failed).
+    """
+    sent = failed = 0
+    interval = 60.0 * batch_size / per_minute if per_minute else 0
+    last_id = 0
+    next_batch_at = 0
+    connection = get_connection()
+
+    try:
+        while limit is None or sent + failed < limit:
+            size = batch_size if limit is None else min(batch_size, limit - sent - failed)
+            batch = list(
+                FineReminder.objects.filter(status='queued', pk__gt=last_id)
+                .select_related('issue__book', 'issue__student__user')
+                .order_by('pk')[:size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].pk
+
+            wait = next_batch_at - time.monotonic()
+            if wait > 0:
+                sleep(wait)
+            next_batch_at = time.monotonic() + interval
+
+            ids = [reminder.pk for reminder in batch]
+            try:
+                # No-op once open; opening inside the try means an
+                # unreachable server counts as a failed batch.
+                connection.open()
+                connection.send_messages([_build_message(reminder, connection) for reminder in batch])
+            except Exception as e:
+                # Same treatment for every message in the batch: we can't
+                # tell which ones the server accepted.
+                for reminder in batch:
+                    reminder.attempts += 1
+                    reminder.error = str(e)
+                    if reminder.attempts >= MAX_SEND_ATTEMPTS:
+                        reminder.status = 'failed'
+                FineReminder.objects.bulk_update(batch, ['attempts', 'error', 'status'])
+                failed += len(batch)
+            else:
+                FineReminder.objects.filter(pk__in=ids).update(status='sent', sent_at=timezone.now(), error='')
+                sent += len(batch)
+    finally:
+        connection.close()
+    return sent, failed
@@ -1,6 +1,6 @@
 from django import forms
-from .models import Book, BookIssue
-from students.models import Student
+from .models import Book
+from students.models import Student, Department
 import datetime
 
 class BookForm(forms.ModelForm):
@@ -13,7 +13,7 @@ class BookForm(forms.ModelForm):
         for field_name, field in self.fields.items():
             field.widget.attrs['class'] = 'form-input'
 
-class BookIssueForm(forms.ModelForm):
+class BookIssueForm(forms.Form):
     # We use a custom field to find the student by their ID
     student_id = forms.CharField(
         label="Student ID", 
@@ -21,20 +21,24 @@ class BookIssueForm(forms.ModelForm):
         widget=forms.TextInput(attrs={'class': 'form-input', 'placeholder': 'Enter Student ID'})
     )
     
-    # This field will be hidden, we'll populate it from the student_id
-    student = forms.ModelChoiceField(queryset=Student.objects.all(), widget=forms.HiddenInput(), required=False)
+    # Several books can go out to the same student in one go
+    books = forms.ModelMultipleChoiceField(
+        label="Books",
+        queryset=Book.objects.all(),
+        widget=forms.SelectMultiple(attrs={'class': 'form-input', 'size': 6}),
+    )
+    reserve_unavailable = forms.BooleanField(
+        label="Reserve books that are out",
+        required=False,
+        initial=True,
+        help_text="The student joins the queue and gets the next returned copy.",
+    )
+
+    issue_date = forms.DateField(label="Issue Date", widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-input'}))
+    due_date = forms.DateField(label="Due Date", widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-input'}))
 
-    class Meta:
-        model = BookIssue
-        fields = ['book', 'student_id', 'student', 'issue_date', 'due_date']
-        widgets = {
-            'issue_date': forms.DateInput(attrs={'type': 'date', 'class': 'form-input'}),
-            'due_date': forms.DateInput(attrs={'type': 'date', 'class': 'form-input'}),
-        }
-    
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields['book'].widget.attrs.update({'class': 'form-input'})
         self.fields['issue_date'].initial = datetime.date.today()
         self.fields['due_date'].initial = datetime.date.today() + datetime.timedelta(days=14)
 
@@ -49,4 +53,30 @@ class BookIssueForm(forms.ModelForm):
             except Student.DoesNotExist:
                 self.add_error('student_id', "No student found with this ID.")
         
-        return cleaned_data
\ No newline at end of file
+        return cleaned_data
+
+
+class CirculationReportForm(forms.Form):
+    """
+    Period and scope for the circulation report; defaults to the last 30 days.
+    """
+    REPORT_DAYS = 30
+
+    date_from = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    date_to = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    department = forms.ModelChoiceField(queryset=Department.objects.all(), required=False, empty_label="Entire college")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field_name, field in self.fields.items():
+            field.widget.attrs['class'] = 'form-input'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_to = cleaned_data.get('date_to') or datetime.date.today()
+        date_from = cleaned_data.get('date_from') or date_to - datetime.timedelta(days=self.REPORT_DAYS - 1)
+        if date_from > date_to:
+            self.add_error('date_from', "The start date must be before the end date.")
+        cleaned_data['date_from'] = date_from
+        cleaned_data['date_to'] = date_to
+        return cleaned_data
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from library.fines import (
+    accrue_fines, queue_reminders, send_reminders, outstanding_fines,
+    REMINDER_BATCH_SIZE, REMINDERS_PER_MINUTE,
+)
+from library.models import FinePolicy
+
+
+class Command(BaseCommand):
+    help = (
+        'Nightly job: updates accrued fines on overdue library books, queues reminder '
+        'emails and sends the queue in rate-limited batches. Run it from cron once a day.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-send', action='store_true', help='Accrue fines and queue reminders but do not send them.')
+        parser.add_argument('--batch-size', type=int, default=REMINDER_BATCH_SIZE)
+        parser.add_argument('--per-minute', type=int, default=REMINDERS_PER_MINUTE, help='0 means no rate limit.')
+
+    def handle(self, *args, **options):
+        policy = FinePolicy.current()
+        updated = accrue_fines(policy=policy)
+        summary = outstanding_fines()
+        self.stdout.write(
+            f"Updated fines on {updated} overdue issues; outstanding: {summary['count']} issues, "
+            f"₹{summary['total'] or 0} ({policy})."
+        )
+
+        queued = queue_reminders(policy=policy)
+        self.stdout.write(f'Queued {queued} reminder emails.')
+
+        if options['no_send']:
+            return
+        sent, failed = send_reminders(batch_size=options['batch_size'], per_minute=options['per_minute'])
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} reminders, {failed} failed.'))
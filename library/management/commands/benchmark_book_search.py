@@ -0,0 +1,62 @@
+import random
+import time
+
+from django.db import connection
+from django.db.models import Q
+
+from core.benchmarks import BenchmarkCommand, median_and_p95, timings_ms
+from library.models import Book
+from library.search import rebuild_index, search_books
+
+WORDS = [
+    'introduction', 'advanced', 'principles', 'data', 'structures', 'algorithms', 'modern', 'physics',
+    'organic', 'chemistry', 'linear', 'algebra', 'discrete', 'mathematics', 'operating', 'systems',
+    'computer', 'networks', 'digital', 'electronics', 'thermodynamics', 'fluid', 'mechanics', 'economics',
+    'history', 'india', 'management', 'marketing', 'machine', 'learning', 'database', 'design',
+]
+SURNAMES = ['Sharma', 'Knuth', 'Cormen', 'Tanenbaum', 'Feynman', 'Strang', 'Rao', 'Iyer', 'Kumar', 'Silberschatz']
+QUERIES = ['data', 'algo', 'computer networks', 'tanen', 'linear alg', 'feynman physics', 'zzz']
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Benchmarks book search latency: the old icontains OR-chain against the inverted index, '
+        'on synthetic books (default 100,000). All data is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per query (default: 20).')
+
+    def seed(self, options):
+        self.stdout.write(f'Creating and indexing {options["books"]} synthetic books...')
+        rng = random.Random(42)
+        Book.objects.bulk_create([
+            Book(
+                title=' '.join(rng.sample(WORDS, rng.randint(2, 5))).title(),
+                author=f'{rng.choice("ABCDEFGHJKLMNPRS")}. {rng.choice(SURNAMES)}',
+                isbn=f'{9790000000000 + i}',
+                publisher='Benchmark Press',
+            )
+            for i in range(options['books'])
+        ], batch_size=2000)
+        start = time.perf_counter()
+        rebuild_index()
+        self.stdout.write(f'Index rebuilt in {time.perf_counter() - start:.1f} s.')
+
+    def run(self, options):
+        repeat = options['repeat']
+        self.stdout.write(f'Backend: {connection.vendor}; first page of 20 results, times in ms')
+        self.stdout.write(f"{'query':<18}{'icontains p50':>15}{'p95':>8}{'index p50':>12}{'p95':>8}")
+        for query in QUERIES:
+            def old():
+                return list(Book.objects.filter(
+                    Q(title__icontains=query) | Q(author__icontains=query) | Q(isbn__icontains=query)
+                ).order_by('title')[:20])
+
+            def new():
+                return search_books(query)
+
+            old_p50, old_p95 = median_and_p95(timings_ms(old, repeat))
+            new_p50, new_p95 = median_and_p95(timings_ms(new, repeat))
+            self.stdout.write(f'{query:<18}{old_p50:>15.1f}{old_p95:>8.1f}{new_p50:>12.1f}{new_p95:>8.1f}')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from library.services import expire_holds
+
+
+class Command(BaseCommand):
+    help = (
+        'Expires hold-shelf reservations that were not picked up in time and passes the '
+        'copies to the next student in the queue. Run it from cron once a day.'
+    )
+
+    def handle(self, *args, **options):
+        expired, held = expire_holds()
+        self.stdout.write(self.style.SUCCESS(f'Expired {expired} holds; {held} copies put on hold for the next in line.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from library.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the book search index (BookSearchToken) from the Book table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Token rows per INSERT (default: 2000).')
+
+    def handle(self, *args, **options):
+        count = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} books."))
@@ -0,0 +1,40 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from library.analytics import refresh_circulation, rollup_circulation
+from library.models import BookIssue
+
+
+class Command(BaseCommand):
+    help = (
+        'Updates the daily circulation rollup behind the library circulation report. '
+        'By default only days since the last rollup are redone; run it nightly.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Re-roll every day from this date (YYYY-MM-DD), e.g. after corrections.')
+        parser.add_argument('--rebuild', action='store_true', help='Re-roll the whole issue history.')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        today = datetime.date.today()
+
+        if options['rebuild'] or options['since']:
+            if options['rebuild']:
+                since = BookIssue.objects.order_by('issue_date').values_list('issue_date', flat=True).first() or today
+            else:
+                try:
+                    since = datetime.date.fromisoformat(options['since'])
+                except ValueError:
+                    raise CommandError('--since must be a date in YYYY-MM-DD format.')
+            written = rollup_circulation(since, today)
+        else:
+            since, written = refresh_circulation(today)
+            if since is None:
+                self.stdout.write('No issues on record yet.')
+                return
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {since} to {today}: {written} rows in {elapsed:.1f} s.'))
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_index(apps, schema_editor):
+    from library.search import FIELD_WEIGHTS, clean_isbn, normalise
+
+    Book = apps.get_model('library', 'Book')
+    BookSearchToken = apps.get_model('library', 'BookSearchToken')
+    batch = []
+    for book in Book.objects.iterator(chunk_size=2000):
+        for field in ('title', 'author', 'publisher'):
+            for token in set(normalise(getattr(book, field))):
+                batch.append(BookSearchToken(book_id=book.pk, token=token, field=field, weight=FIELD_WEIGHTS[field]))
+        isbns = clean_isbn(book.isbn)
+        isbns = {isbn.lower() for isbn in isbns if isbn} if isbns else set(normalise(book.isbn))
+        for isbn in isbns:
+            batch.append(BookSearchToken(book_id=book.pk, token=isbn, field='isbn', weight=FIELD_WEIGHTS['isbn']))
+        if len(batch) >= 2000:
+            BookSearchToken.objects.bulk_create(batch)
+            batch = []
+    BookSearchToken.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0002_alter_book_options_alter_bookissue_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(db_index=True, max_length=64)),
+                ('field', models.CharField(choices=[('title', 'Title'), ('author', 'Author'), ('publisher', 'Publisher'), ('isbn', 'ISBN')], max_length=10)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='library.book')),
+            ],
+            options={
+                'verbose_name': 'Book Search Token',
+                'verbose_name_plural': 'Book Search Tokens',
+                'unique_together': {('book', 'field', 'token')},
+            },
+        ),
+        migrations.RunPython(build_index, migrations.RunPython.noop),
+    ]
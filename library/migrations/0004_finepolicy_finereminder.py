@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:24
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0003_booksearchtoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FinePolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Policy Name')),
+                ('daily_rate', models.DecimalField(decimal_places=2, default=Decimal('1.00'), max_digits=6, verbose_name='Fine per Day')),
+                ('grace_days', models.PositiveIntegerField(default=0, help_text='Days after the due date before fines start', verbose_name='Grace Days')),
+                ('max_fine', models.DecimalField(blank=True, decimal_places=2, help_text='Cap per issue; leave empty for no cap', max_digits=8, null=True, verbose_name='Maximum Fine')),
+                ('reminder_interval_days', models.PositiveIntegerField(default=3, help_text='How often overdue borrowers are emailed', verbose_name='Reminder Interval (days)')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Active')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Fine Policy',
+                'verbose_name_plural': 'Fine Policies',
+                'ordering': ['-is_active', '-updated_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FineReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipient', models.EmailField(max_length=254, verbose_name='Recipient')),
+                ('fine_amount', models.DecimalField(decimal_places=2, max_digits=8, verbose_name='Fine Amount')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('sent', 'Sent'), ('failed', 'Failed')], default='queued', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('issue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='library.bookissue')),
+            ],
+            options={
+                'verbose_name': 'Fine Reminder',
+                'verbose_name_plural': 'Fine Reminders',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'id'], name='library_fin_status_731ed2_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0005_reservation'),
+        ('students', '0004_student_search_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CirculationDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('issues', models.PositiveIntegerField(default=0, verbose_name='Issues')),
+                ('returns', models.PositiveIntegerField(default=0, verbose_name='Returns')),
+                ('overdue_returns', models.PositiveIntegerField(default=0, verbose_name='Overdue Returns')),
+                ('loan_days', models.PositiveIntegerField(default=0, help_text='Days on loan of the copies returned that day', verbose_name='Loan Days')),
+                ('fines', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Fines')),
+            ],
+            options={
+                'verbose_name': 'Daily Circulation',
+                'verbose_name_plural': 'Daily Circulation',
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='bookissue',
+            index=models.Index(fields=['issue_date'], name='library_boo_issue_d_164f76_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookissue',
+            index=models.Index(fields=['return_date'], name='library_boo_return__d46abd_idx'),
+        ),
+        migrations.AddField(
+            model_name='circulationdaily',
+            name='book',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_circulation', to='library.book'),
+        ),
+        migrations.AddField(
+            model_name='circulationdaily',
+            name='department',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='library_circulation', to='students.department'),
+        ),
+        migrations.AddIndex(
+            model_name='circulationdaily',
+            index=models.Index(fields=['day'], name='library_cir_day_b3b25a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='circulationdaily',
+            index=models.Index(fields=['department', 'day'], name='library_cir_departm_02f5af_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='circulationdaily',
+            index=models.Index(fields=['book', 'day'], name='library_cir_book_id_0a8dc7_idx'),
+        ),
+    ]
@@ -1,5 +1,7 @@
+from decimal import Decimal
+
 from django.db import models
-from students.models import Student
+from students.models import Student, Department
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 import datetime
@@ -21,6 +23,71 @@ class Book(models.Model):
     def __str__(self):
         return f"{self.title} by {self.author}"
 
+class BookSearchToken(models.Model):
+    """
+    Inverted index for the book search: one row per normalised word of a
+    book's title, author or publisher, plus its ISBN in 10- and 13-digit
+    form. Maintained by library.search; don't edit by hand.
+    """
+    FIELD_CHOICES = [
+        ('title', 'Title'),
+        ('author', 'Author'),
+        ('publisher', 'Publisher'),
+        ('isbn', 'ISBN'),
+    ]
+
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='search_tokens')
+    # db_index gives prefix (LIKE 'abc%') lookups an index on PostgreSQL too
+    token = models.CharField(max_length=64, db_index=True)
+    field = models.CharField(max_length=10, choices=FIELD_CHOICES)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        verbose_name = _("Book Search Token")
+        verbose_name_plural = _("Book Search Tokens")
+        unique_together = ('book', 'field', 'token')
+
+    def __str__(self):
+        return f"{self.token} ({self.field}) -> {self.book_id}"
+
+class FinePolicy(models.Model):
+    """
+    How overdue fines are charged. The most recently updated active policy
+    is used; with none set up, DEFAULT_DAILY_RATE per day with no grace
+    period and no cap.
+    """
+    DEFAULT_DAILY_RATE = Decimal('1.00')
+
+    name = models.CharField(max_length=100, verbose_name=_("Policy Name"))
+    daily_rate = models.DecimalField(max_digits=6, decimal_places=2, default=DEFAULT_DAILY_RATE, verbose_name=_("Fine per Day"))
+    grace_days = models.PositiveIntegerField(default=0, verbose_name=_("Grace Days"), help_text="Days after the due date before fines start")
+    max_fine = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, verbose_name=_("Maximum Fine"), help_text="Cap per issue; leave empty for no cap")
+    reminder_interval_days = models.PositiveIntegerField(default=3, verbose_name=_("Reminder Interval (days)"), help_text="How often overdue borrowers are emailed")
+    is_active = models.BooleanField(default=True, verbose_name=_("Active"))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Fine Policy")
+        verbose_name_plural = _("Fine Policies")
+        ordering = ['-is_active', '-updated_at']
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def current(cls):
+        policy = cls.objects.filter(is_active=True).order_by('-updated_at').first()
+        return policy or cls(name='Default', daily_rate=cls.DEFAULT_DAILY_RATE)
+
+    def fine_for(self, days_late):
+        days = days_late - self.grace_days
+        if days <= 0:
+            return Decimal('0.00')
+        fine = days * self.daily_rate
+        if self.max_fine is not None:
+            fine = min(fine, self.max_fine)
+        return fine
+
 class BookIssue(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='book_issues')
     book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='issues')
@@ -36,6 +103,11 @@ class BookIssue(models.Model):
         verbose_name = _("Book Issue Record")
         verbose_name_plural = _("Book Issue Records")
         ordering = ['-issue_date']
+        # The circulation rollup reads one day of issues and of returns at a time
+        indexes = [
+            models.Index(fields=['issue_date']),
+            models.Index(fields=['return_date']),
+        ]
 
     def __str__(self):
         return f"{self.book.title} issued to {self.student}"
@@ -43,4 +115,108 @@ class BookIssue(models.Model):
     def save(self, *args, **kwargs):
         if not self.due_date:
             self.due_date = self.issue_date + datetime.timedelta(days=14) # Default 14 day issue
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class Reservation(models.Model):
+    """
+    A student's place in the queue for a book. The queue is first come,
+    first served by id: when a copy comes back it goes to the lowest-id
+    waiting reservation, which moves to 'ready' and keeps the copy on the
+    hold shelf until hold_until. See library.services.
+    """
+    STATUS_CHOICES = [
+        ('waiting', 'Waiting'),
+        ('ready', 'Ready for Pickup'),
+        ('fulfilled', 'Fulfilled'),
+        ('cancelled', 'Cancelled'),
+        ('expired', 'Expired'),
+    ]
+    ACTIVE_STATUSES = ('waiting', 'ready')
+
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='reservations')
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='reservations')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='waiting', verbose_name=_("Status"))
+
+    created_at = models.DateTimeField(default=timezone.now, verbose_name=_("Reserved At"))
+    ready_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Ready At"))
+    hold_until = models.DateField(null=True, blank=True, verbose_name=_("Hold Until"))
+    closed_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Closed At"))
+
+    class Meta:
+        verbose_name = _("Reservation")
+        verbose_name_plural = _("Reservations")
+        ordering = ['book', 'id']
+        # The allocator's "next waiting reservation for this book" is a
+        # seek on this index, however long the queue is.
+        indexes = [models.Index(fields=['book', 'status', 'id'])]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'book'],
+                condition=models.Q(status__in=['waiting', 'ready']),
+                name='library_one_active_reservation',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.book.title} reserved by {self.student} ({self.get_status_display()})"
+
+class FineReminder(models.Model):
+    """
+    Queued overdue-fine reminder email. Rows are added by the nightly fine
+    job and sent in rate-limited batches by library.fines.send_reminders.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    issue = models.ForeignKey(BookIssue, on_delete=models.CASCADE, related_name='reminders')
+    recipient = models.EmailField(verbose_name=_("Recipient"))
+    fine_amount = models.DecimalField(max_digits=8, decimal_places=2, verbose_name=_("Fine Amount"))
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued', verbose_name=_("Status"))
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Fine Reminder")
+        verbose_name_plural = _("Fine Reminders")
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['status', 'id'])]
+
+    def __str__(self):
+        return f"Reminder to {self.recipient} ({self.get_status_display()})"
+
+
+class CirculationDaily(models.Model):
+    """
+    Daily circulation rollup: one row per day, book and borrower department
+    with that day's issues and returns. Built from BookIssue by
+    library.analytics and read by the circulation report, so the report
+    never scans the issue history. Don't edit by hand.
+    """
+    day = models.DateField(verbose_name=_("Day"))
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='daily_circulation')
+    # NULL for students without a department
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, null=True, blank=True, related_name='library_circulation')
+
+    issues = models.PositiveIntegerField(default=0, verbose_name=_("Issues"))
+    returns = models.PositiveIntegerField(default=0, verbose_name=_("Returns"))
+    overdue_returns = models.PositiveIntegerField(default=0, verbose_name=_("Overdue Returns"))
+    loan_days = models.PositiveIntegerField(default=0, verbose_name=_("Loan Days"), help_text="Days on loan of the copies returned that day")
+    fines = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name=_("Fines"))
+
+    class Meta:
+        verbose_name = _("Daily Circulation")
+        verbose_name_plural = _("Daily Circulation")
+        ordering = ['-day']
+        indexes = [
+            models.Index(fields=['day']),
+            models.Index(fields=['department', 'day']),
+            models.Index(fields=['book', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.book_id}/{self.department_id}: {self.issues} out, {self.returns} in"
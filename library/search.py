@@ -0,0 +1,168 @@
+"""
+Book search backed by an inverted index (BookSearchToken).
+
+Every book is broken into normalised tokens: lower-cased, accents folded,
+split on anything that isn't a letter or digit. Each token row carries the
+field it came from and that field's weight. A query then becomes indexed
+prefix lookups on the token column instead of an icontains scan of every
+title, author and ISBN:
+
+- each query word must prefix-match some token of the book;
+- a book scores, per query word, the weight of its best matching field,
+  doubled when the token matches exactly; results are sorted by score;
+- a query that is a valid ISBN-10 or ISBN-13 (hyphens and spaces allowed)
+  is looked up exactly, in either form.
+"""
+
+import unicodedata
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, When, Value, F, Max, Q, IntegerField
+
+from core.search import tokenize
+from .models import Book, BookSearchToken
+
+FIELD_WEIGHTS = {'title': 3, 'author': 2, 'publisher': 1, 'isbn': 3}
+MAX_TOKEN_LENGTH = 64
+MAX_QUERY_TERMS = 6
+SEARCH_PAGE_SIZE = 20
+
+
+# -----------------------------------------------------------------------------
+# NORMALISATION
+# -----------------------------------------------------------------------------
+
+def normalise(text):
+    # Fold accents so 'Gabriel García Márquez' matches 'garcia marquez'
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    folded = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return [token[:MAX_TOKEN_LENGTH] for token in tokenize(folded)]
+
+
+def _isbn10_check_digit(digits):
+    total = sum((10 - i) * int(d) for i, d in enumerate(digits[:9]))
+    check = (11 - total % 11) % 11
+    return 'X' if check == 10 else str(check)
+
+
+def _isbn13_check_digit(digits):
+    total = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(digits[:12]))
+    return str((10 - total % 10) % 10)
+
+
+def clean_isbn(value):
+    """
+    Return (isbn10, isbn13) for a valid ISBN in either form, with the
+    missing form filled in where one exists (only 978- ISBN-13s have an
+    ISBN-10). Returns None if `value` isn't a valid ISBN.
+    """
+    value = ''.join(c for c in (value or '').upper() if c.isalnum())
+    if len(value) == 10 and value[:9].isdigit() and (value[9].isdigit() or value[9] == 'X'):
+        if _isbn10_check_digit(value) != value[9]:
+            return None
+        isbn13 = '978' + value[:9]
+        return value, isbn13 + _isbn13_check_digit(isbn13)
+    if len(value) == 13 and value.isdigit():
+        if _isbn13_check_digit(value) != value[12]:
+            return None
+        if value.startswith('978'):
+            return value[3:12] + _isbn10_check_digit(value[3:12]), value
+        return None, value
+    return None
+
+
+# -----------------------------------------------------------------------------
+# INDEXING
+# -----------------------------------------------------------------------------
+
+def book_tokens(book):
+    tokens = []
+    for field in ('title', 'author', 'publisher'):
+        for token in set(normalise(getattr(book, field))):
+            tokens.append(BookSearchToken(book=book, token=token, field=field, weight=FIELD_WEIGHTS[field]))
+
+    isbns = clean_isbn(book.isbn)
+    # Keep books with a malformed ISBN findable by what was typed in
+    isbns = {isbn.lower() for isbn in isbns if isbn} if isbns else set(normalise(book.isbn))
+    for isbn in isbns:
+        tokens.append(BookSearchToken(book=book, token=isbn, field='isbn', weight=FIELD_WEIGHTS['isbn']))
+    return tokens
+
+
+def index_book(book):
+    with transaction.atomic():
+        BookSearchToken.objects.filter(book=book).delete()
+        BookSearchToken.objects.bulk_create(book_tokens(book))
+
+
+def rebuild_index(batch_size=2000):
+    """Drop and rebuild the whole index. Returns the number of books indexed."""
+    count = 0
+    with transaction.atomic():
+        BookSearchToken.objects.all().delete()
+        batch = []
+        for book in Book.objects.only('id', 'title', 'author', 'publisher', 'isbn').iterator(chunk_size=batch_size):
+            batch.extend(book_tokens(book))
+            count += 1
+            if len(batch) >= batch_size:
+                BookSearchToken.objects.bulk_create(batch)
+                batch = []
+        BookSearchToken.objects.bulk_create(batch)
+    return count
+
+
+# -----------------------------------------------------------------------------
+# SEARCHING
+# -----------------------------------------------------------------------------
+
+def _ranked_book_ids(terms, offset, limit):
+    tokens = BookSearchToken.objects.filter(reduce(or_, [Q(token__startswith=term) for term in terms]))
+    # Per term: the best weight among the book's tokens it matches,
+    # doubled for an exact match, 0 if it matches none
+    per_term = {
+        f'term_{i}': Max(Case(
+            When(token=term, then=F('weight') * 2),
+            When(token__startswith=term, then=F('weight')),
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+        for i, term in enumerate(terms)
+    }
+    ranked = (
+        tokens.values('book_id')
+        .annotate(**per_term)
+        .filter(**{f'{name}__gt': 0 for name in per_term})
+        .annotate(score=reduce(lambda a, b: a + b, [F(name) for name in per_term]))
+        .order_by('-score', 'book_id')
+    )
+    return [row['book_id'] for row in ranked[offset:offset + limit]]
+
+
+def search_books(query, page=1, page_size=SEARCH_PAGE_SIZE):
+    """
+    Return (books, has_next) for one page of results, best match first.
+    An empty query returns no results.
+    """
+    offset = (max(page, 1) - 1) * page_size
+
+    isbns = clean_isbn(query)
+    if isbns:
+        books = list(Book.objects.filter(
+            search_tokens__field='isbn',
+            search_tokens__token__in=[isbn.lower() for isbn in isbns if isbn],
+        ).distinct())
+        if books:
+            return (books if page == 1 else []), False
+
+    terms = normalise(query)[:MAX_QUERY_TERMS]
+    if not terms:
+        return [], False
+
+    # One extra row tells us whether there is another page
+    book_ids = _ranked_book_ids(terms, offset, page_size + 1)
+    has_next = len(book_ids) > page_size
+    book_ids = book_ids[:page_size]
+    books = Book.objects.in_bulk(book_ids)
+    return [books[pk] for pk in book_ids if pk in books], has_next
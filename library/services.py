@@ -0,0 +1,268 @@
+"""
+Issuing and returning books.
+
+The views used to read book.available_copies, change it in Python and
+save() the whole Book row, so two issue desks working at once could both
+see the last copy and both issue it (or lose each other's returns).
+
+Every copy count change here is a single conditional UPDATE with an F()
+expression instead:
+
+    UPDATE book SET available_copies = available_copies - 1
+    WHERE id = ... AND available_copies > 0
+
+The database applies it atomically to the row, so a copy can only be
+handed out once and no update is lost, without select_for_update or any
+other locking on our side. An issue record is only written when its
+UPDATE actually changed a row.
+
+When every copy is out, students queue with a Reservation. A returned
+copy goes to the head of that book's queue (the lowest waiting id, one
+index seek) in the same transaction as the return, and waits on the hold
+shelf for them instead of going back into available_copies. So at all
+times: available_copies + open issues + ready holds == total_copies.
+"""
+
+import datetime
+from decimal import Decimal
+
+from django.db import transaction, IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Book, BookIssue, FinePolicy, Reservation
+
+# Standard loan period when the desk doesn't pick a due date
+LOAN_PERIOD_DAYS = 14
+
+# How long a returned copy stays on the hold shelf for the next in line
+HOLD_SHELF_DAYS = 3
+
+
+class CirculationReport:
+    """
+    Outcome of an issue or return call: the records that went through and
+    a (book, reason) pair for every book that didn't.
+    """
+
+    def __init__(self):
+        self.issues = []
+        self.failed = []
+        self.holds = []  # Reservations that became ready for pickup
+
+    def fail(self, book, message):
+        self.failed.append((book, message))
+
+    @property
+    def fine_total(self):
+        return sum((issue.fine_amount for issue in self.issues), Decimal('0.00'))
+
+
+def _take_copy(book_id):
+    # 1 if a copy was free and is now ours, 0 if there was none left
+    return Book.objects.filter(pk=book_id, available_copies__gt=0).update(
+        available_copies=F('available_copies') - 1
+    )
+
+
+def _collect_hold(student, book_id, now):
+    # 1 if the student had a copy waiting on the hold shelf
+    return Reservation.objects.filter(student=student, book_id=book_id, status='ready').update(
+        status='fulfilled', closed_at=now
+    )
+
+
+def issue_books(student, books, issue_date=None, due_date=None):
+    """
+    Issue each of `books` to `student`. A copy held for the student is
+    used first, otherwise a free copy from the shelf. A book with neither
+    is reported in report.failed, the rest are still issued. Asking for
+    the same book twice issues it once.
+    """
+    issue_date = issue_date or timezone.now().date()
+    due_date = due_date or issue_date + datetime.timedelta(days=LOAN_PERIOD_DAYS)
+    report = CirculationReport()
+
+    unique_books = list({book.pk: book for book in books}.values())
+    with transaction.atomic():
+        now = timezone.now()
+        for book in unique_books:
+            if _collect_hold(student, book.pk, now) or _take_copy(book.pk):
+                report.issues.append(
+                    BookIssue(student=student, book=book, issue_date=issue_date, due_date=due_date)
+                )
+            else:
+                report.fail(book, f"'{book.title}' is not available (0 copies).")
+        BookIssue.objects.bulk_create(report.issues)
+        if report.issues:
+            # They have the book now, so they no longer need a place in its queue
+            Reservation.objects.filter(
+                student=student, book_id__in=[issue.book_id for issue in report.issues], status='waiting'
+            ).update(status='fulfilled', closed_at=now)
+    return report
+
+
+def return_books(issues, return_date=None, policy=None):
+    """
+    Close each of `issues` (open BookIssue records, e.g. everything one
+    student hands back at the desk). Each copy goes to the next
+    reservation for its book, or back on the shelf if nobody is waiting.
+
+    An issue is closed with a conditional UPDATE on return_date IS NULL,
+    so if two people return the same record at once only one of them puts
+    a copy back; the other gets it in report.failed. Fines follow the
+    current FinePolicy unless one is passed in.
+    """
+    return_date = return_date or timezone.now().date()
+    policy = policy or FinePolicy.current()
+    report = CirculationReport()
+
+    with transaction.atomic():
+        returned_per_book = {}
+        for issue in {issue.pk: issue for issue in issues}.values():
+            fine = policy.fine_for((return_date - issue.due_date).days)
+            closed = BookIssue.objects.filter(pk=issue.pk, return_date__isnull=True).update(
+                return_date=return_date, fine_amount=fine
+            )
+            if not closed:
+                report.fail(issue.book, f"'{issue.book.title}' has already been returned.")
+                continue
+            issue.return_date = return_date
+            issue.fine_amount = fine
+            report.issues.append(issue)
+            returned_per_book[issue.book_id] = returned_per_book.get(issue.book_id, 0) + 1
+
+        hold_ids = []
+        for book_id, count in returned_per_book.items():
+            hold_ids += release_copies(book_id, count, return_date)
+    if hold_ids:
+        report.holds = list(Reservation.objects.filter(pk__in=hold_ids).select_related('book', 'student__user'))
+    return report
+
+
+# -----------------------------------------------------------------------------
+# RESERVATIONS
+# -----------------------------------------------------------------------------
+
+def _hold_for_next(book_id, today):
+    """
+    Move the first waiting reservation for the book to the hold shelf and
+    return its id, or None if nobody is waiting. The UPDATE is conditional
+    on the row still waiting, so if a cancellation or another return gets
+    there first we just move on to the next in line.
+    """
+    while True:
+        pk = (
+            Reservation.objects.filter(book_id=book_id, status='waiting')
+            .order_by('id').values_list('pk', flat=True).first()
+        )
+        if pk is None:
+            return None
+        readied = Reservation.objects.filter(pk=pk, status='waiting').update(
+            status='ready',
+            ready_at=timezone.now(),
+            hold_until=today + datetime.timedelta(days=HOLD_SHELF_DAYS),
+        )
+        if readied:
+            return pk
+
+
+def release_copies(book_id, count=1, today=None):
+    """
+    Hand `count` freed copies of a book to its reservation queue; whatever
+    nobody is waiting for goes back on the shelf. Call inside the
+    transaction that freed the copies. Returns the ids of the reservations
+    now ready for pickup.
+    """
+    today = today or timezone.now().date()
+    held = []
+    while len(held) < count:
+        pk = _hold_for_next(book_id, today)
+        if pk is None:
+            break
+        held.append(pk)
+    if count > len(held):
+        Book.objects.filter(pk=book_id).update(available_copies=F('available_copies') + (count - len(held)))
+    return held
+
+
+def queue_position(reservation):
+    """1 for the head of the queue; None once it has left the queue."""
+    if reservation.status != 'waiting':
+        return None
+    return Reservation.objects.filter(book_id=reservation.book_id, status='waiting', id__lte=reservation.pk).count()
+
+
+def reserve_book(student, book):
+    """
+    Put the student in the queue for a book. Returns (reservation,
+    created); an active reservation the student already has is returned
+    as is. If a copy happens to be on the shelf it goes straight onto the
+    hold shelf for them.
+    """
+    active = Reservation.objects.filter(student=student, book=book, status__in=Reservation.ACTIVE_STATUSES)
+    existing = active.first()
+    if existing:
+        return existing, False
+
+    with transaction.atomic():
+        try:
+            # Savepoint, so a duplicate from a double-clicked form doesn't
+            # break the caller's transaction.
+            with transaction.atomic():
+                reservation = Reservation.objects.create(student=student, book=book)
+        except IntegrityError:
+            return active.get(), False
+
+        if _take_copy(book.pk):
+            # Nobody is waiting while copies are on the shelf, so this
+            # copy is ours and the queue order is kept.
+            release_copies(book.pk, 1)
+            reservation.refresh_from_db()
+    return reservation, True
+
+
+def cancel_reservation(reservation):
+    """
+    Cancel an active reservation. A copy it was holding goes to the next
+    in line. Returns False if it was no longer active.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        if Reservation.objects.filter(pk=reservation.pk, status='ready').update(status='cancelled', closed_at=now):
+            release_copies(reservation.book_id, 1)
+        elif not Reservation.objects.filter(pk=reservation.pk, status='waiting').update(status='cancelled', closed_at=now):
+            return False
+    reservation.status = 'cancelled'
+    reservation.closed_at = now
+    return True
+
+
+def expire_holds(today=None):
+    """
+    Expire holds not picked up by their hold_until date and pass the
+    copies on. Also hands any copies sitting on the shelf to waiting
+    reservations, in case a reservation and a return crossed. Returns
+    (expired, newly held).
+    """
+    today = today or timezone.now().date()
+    expired = held = 0
+    stale = Reservation.objects.filter(status='ready', hold_until__lt=today).values_list('pk', 'book_id')
+    for pk, book_id in list(stale):
+        with transaction.atomic():
+            if Reservation.objects.filter(pk=pk, status='ready').update(status='expired', closed_at=timezone.now()):
+                expired += 1
+                held += len(release_copies(book_id, 1, today))
+
+    waiting_books = (
+        Book.objects.filter(available_copies__gt=0, reservations__status='waiting')
+        .values_list('pk', flat=True).distinct()
+    )
+    for book_id in list(waiting_books):
+        with transaction.atomic():
+            while _take_copy(book_id):
+                readied = release_copies(book_id, 1, today)
+                if not readied:
+                    break
+                held += len(readied)
+    return expired, held
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Book
+from .search import index_book
+
+# Book fields that feed the search index
+INDEXED_FIELDS = {'title', 'author', 'publisher', 'isbn'}
+
+
+@receiver(post_save, sender=Book)
+def reindex_book(sender, instance, update_fields=None, **kwargs):
+    # Issues and returns only touch the copy counts; skip those.
+    # Deleting a book removes its tokens through the foreign key.
+    if update_fields and not INDEXED_FIELDS.intersection(update_fields):
+        return
+    index_book(instance)
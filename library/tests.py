@@ -0,0 +1,143 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections, OperationalError
+from django.test import TransactionTestCase
+
+from core.models import User
+from students.models import Department, Student
+from library.models import Book, BookIssue, Reservation
+from library.services import issue_books, return_books, reserve_book
+
+THREADS = 8
+
+# SQLite refuses a second writer instead of waiting for the first. Every
+# service call is one transaction, so a refused call is simply retried.
+LOCKED_RETRIES = 200
+
+
+def retry_locked(func, *args):
+    for attempt in range(LOCKED_RETRIES):
+        try:
+            return func(*args)
+        except OperationalError:
+            if attempt == LOCKED_RETRIES - 1:
+                raise
+            time.sleep(0.005)
+
+
+def run_concurrently(func, args_list, workers=THREADS):
+    """
+    Call func(*args) for every tuple in `args_list` from a pool of threads,
+    each with its own database connection, and return the results in order.
+    """
+    def call(args):
+        try:
+            return func(*args)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(call, args_list))
+
+
+class LibraryConcurrencyTestCase(TransactionTestCase):
+    """
+    Threads only see committed data, so these tests commit for real and
+    TransactionTestCase empties the tables afterwards. SQLite runs one
+    writer at a time, so the races these tests look for only really
+    happen on PostgreSQL.
+    """
+
+    def create_students(self, count):
+        department = Department.objects.create(name='Computer Science', code='CSE')
+        users = User.objects.bulk_create(
+            [User(username=f'STU{i:04d}', password='!', role='student') for i in range(count)]
+        )
+        return Student.objects.bulk_create([
+            Student(user=user, student_id=user.username, department=department, year=1, semester=1)
+            for user in users
+        ])
+
+    def create_book(self, number, copies):
+        return Book.objects.create(
+            title=f'Book {number}', author='Author', isbn=f'97800000{number:05d}',
+            total_copies=copies, available_copies=copies,
+        )
+
+    def assertCopiesAccountedFor(self, book):
+        book.refresh_from_db()
+        out = BookIssue.objects.filter(book=book, return_date__isnull=True).count()
+        held = Reservation.objects.filter(book=book, status='ready').count()
+        self.assertGreaterEqual(book.available_copies, 0)
+        self.assertEqual(
+            book.available_copies + out + held, book.total_copies,
+            f"{book.available_copies} on shelf + {out} out + {held} held != {book.total_copies} copies",
+        )
+
+
+class CirculationConcurrencyTests(LibraryConcurrencyTestCase):
+
+    def test_copies_are_never_over_issued_or_lost(self):
+        students = self.create_students(THREADS)
+        books = [self.create_book(i, copies=2) for i in range(3)]
+        start = threading.Barrier(THREADS)
+
+        def borrower(student, seed):
+            # Every thread grabs and hands back the same few books at random
+            rng = random.Random(seed)
+            held, issued = [], 0
+            start.wait()
+            for _ in range(50):
+                if held and rng.random() < 0.5:
+                    retry_locked(return_books, [held.pop(rng.randrange(len(held)))])
+                else:
+                    picked = rng.sample(books, rng.randint(1, len(books)))
+                    report = retry_locked(issue_books, student, picked)
+                    held.extend(report.issues)
+                    issued += len(report.issues)
+            return issued
+
+        issued = run_concurrently(borrower, [(student, i) for i, student in enumerate(students)])
+
+        self.assertGreater(sum(issued), 0)
+        for book in books:
+            self.assertCopiesAccountedFor(book)
+
+
+class ReservationQueueConcurrencyTests(LibraryConcurrencyTestCase):
+
+    def test_copies_go_to_the_head_of_the_queue(self):
+        copies = 3
+        people = self.create_students(60 + copies)
+        book = self.create_book(1, copies=copies)
+        # Every copy starts out on loan, so everyone else has to queue
+        borrowers, students = people[:copies], people[copies:]
+        for borrower in borrowers:
+            issue_books(borrower, [book])
+
+        run_concurrently(retry_locked, [(reserve_book, student, book) for student in students])
+        self.assertEqual(Reservation.objects.filter(book=book, status='waiting').count(), len(students))
+
+        # Each round every borrower returns their copy at the same time; the
+        # copies must go to the lowest waiting ids, who then collect them.
+        while borrowers:
+            expected = set(
+                Reservation.objects.filter(book=book, status='waiting')
+                .order_by('id').values_list('pk', flat=True)[:len(borrowers)]
+            )
+            issues = list(BookIssue.objects.filter(book=book, return_date__isnull=True).select_related('book'))
+            run_concurrently(retry_locked, [(return_books, [issue]) for issue in issues])
+
+            ready = list(Reservation.objects.filter(book=book, status='ready').select_related('student'))
+            self.assertEqual({hold.pk for hold in ready}, expected)
+            self.assertCopiesAccountedFor(book)
+
+            run_concurrently(retry_locked, [(issue_books, hold.student, [book]) for hold in ready])
+            borrowers = [hold.student for hold in ready]
+
+        self.assertEqual(Reservation.objects.filter(book=book, status='fulfilled').count(), len(students))
+        book.refresh_from_db()
+        self.assertEqual(book.available_copies, book.total_copies)
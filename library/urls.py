@@ -7,6 +7,9 @@ urlpatterns = [
     
     # /library/books/
     path('books/', views.book_list_view, name='book_list'),
+
+    # /library/books/search/?q=... (JSON)
+    path('books/search/', views.book_search_api, name='book_search_api'),
     
     # /library/books/add/
     path('books/add/', views.add_book_view, name='add_book'),
@@ -16,6 +19,12 @@ urlpatterns = [
     
     # /library/return/1/
     path('return/<int:pk>/', views.return_book_view, name='return_book'),
+
+    # /library/reports/circulation/ (?download=1 for CSV)
+    path('reports/circulation/', views.circulation_report_view, name='circulation_report'),
+
+    # /library/reservations/1/cancel/
+    path('reservations/<int:pk>/cancel/', views.cancel_reservation_view, name='cancel_reservation'),
     
     # The 'issue_book' path has been removed, as that logic
     # is now handled by the dashboard view.
@@ -1,11 +1,14 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from .models import Book, BookIssue
-from .forms import BookForm, BookIssueForm
+from .models import Book, BookIssue, Reservation
+from .forms import BookForm, BookIssueForm, CirculationReportForm
+from .search import search_books, SEARCH_PAGE_SIZE
+from .services import issue_books, return_books, reserve_book, cancel_reservation, queue_position
+from .fines import outstanding_fines
+from .analytics import top_titles, department_rates, daily_totals, iter_export_lines
 from students.models import Student
 from django.contrib import messages
-from django.db.models import Q
-from django.utils import timezone
+from django.http import JsonResponse, StreamingHttpResponse
 import datetime
 
 @login_required
@@ -17,8 +20,15 @@ def library_dashboard_view(request):
     """
     if request.user.role == 'student':
         issued_books = BookIssue.objects.filter(student__user=request.user, return_date__isnull=True).select_related('book', 'student')
+        reservations = list(
+            Reservation.objects.filter(student__user=request.user, status__in=Reservation.ACTIVE_STATUSES).select_related('book')
+        )
+        for reservation in reservations:
+            reservation.position = queue_position(reservation)
         context = {
             'issued_books': issued_books,
+            'reservations': reservations,
+            'today': datetime.date.today(),
         }
         return render(request, 'library/student_library_view.html', context)
     
@@ -30,28 +40,58 @@ def library_dashboard_view(request):
         form = BookIssueForm(request.POST)
         if form.is_valid():
             student = form.cleaned_data['student']
-            book = form.cleaned_data['book']
-            
-            # Berserk check: Is the book available?
-            if book.available_copies <= 0:
-                messages.error(request, f"'{book.title}' is not available (0 copies).")
-            else:
-                issue = form.save()
-                # Decrement available copies
-                book.available_copies -= 1
-                book.save()
-                messages.success(request, f"'{book.title}' issued to {student.user.get_full_name()} successfully.")
+            # Copies are taken with a conditional UPDATE, so the last copy
+            # can't go to two desks at once.
+            report = issue_books(
+                student,
+                form.cleaned_data['books'],
+                issue_date=form.cleaned_data['issue_date'],
+                due_date=form.cleaned_data['due_date'],
+            )
+            for book, message in report.failed:
+                if form.cleaned_data['reserve_unavailable']:
+                    reservation, created = reserve_book(student, book)
+                    if reservation.status == 'ready':
+                        messages.info(request, f"A copy of '{book.title}' is on the hold shelf for {student.user.get_full_name()}.")
+                    else:
+                        position = queue_position(reservation)
+                        verb = "reserved" if created else "already reserved"
+                        messages.info(request, f"'{book.title}' is out; {student.user.get_full_name()} has {verb} it (position {position} in the queue).")
+                else:
+                    messages.error(request, message)
+            if report.issues:
+                titles = ', '.join(f"'{issue.book.title}'" for issue in report.issues)
+                messages.success(request, f"{titles} issued to {student.user.get_full_name()} successfully.")
                 return redirect('library')
     else:
         form = BookIssueForm()
         
+    hold_shelf = (
+        Reservation.objects.filter(status='ready')
+        .select_related('book', 'student__user').order_by('hold_until', 'id')
+    )
+
+    # Accrued by the nightly accrue_library_fines job
+    outstanding = outstanding_fines()
+
     context = {
         'form': form,
         'issued_books': issued_books,
+        'hold_shelf': hold_shelf,
+        'today': datetime.date.today(),
+        'overdue_count': outstanding['count'],
+        'overdue_fines': outstanding['total'] or 0,
     }
     return render(request, 'library/library_dashboard.html', context)
 
 
+def _page_number(request):
+    try:
+        return max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        return 1
+
+
 @login_required
 def book_list_view(request):
     """
@@ -60,22 +100,55 @@ def book_list_view(request):
     if not (request.user.role == 'admin' or request.user.role == 'faculty'):
         return redirect('library')
 
-    query = request.GET.get('q', '')
+    query = request.GET.get('q', '').strip()
+    page = _page_number(request)
     if query:
-        books = Book.objects.filter(
-            Q(title__icontains=query) | 
-            Q(author__icontains=query) | 
-            Q(isbn__icontains=query)
-        ).order_by('title')
+        books, has_next = search_books(query, page)
     else:
-        books = Book.objects.all().order_by('title')
+        # One extra row tells us whether there is another page
+        offset = (page - 1) * SEARCH_PAGE_SIZE
+        books = list(Book.objects.order_by('title', 'id')[offset:offset + SEARCH_PAGE_SIZE + 1])
+        has_next = len(books) > SEARCH_PAGE_SIZE
+        books = books[:SEARCH_PAGE_SIZE]
         
     context = {
         'books': books,
         'search_query': query,
+        'page': page,
+        'has_next': has_next,
     }
     return render(request, 'library/book_list.html', context)
 
+@login_required
+def book_search_api(request):
+    """
+    JSON search over the book index, used for the search box autocomplete.
+    ?q=<text or ISBN>&page=<n>&page_size=<n, max 50>
+    """
+    query = request.GET.get('q', '').strip()
+    page = _page_number(request)
+    try:
+        page_size = min(max(int(request.GET.get('page_size', SEARCH_PAGE_SIZE)), 1), 50)
+    except ValueError:
+        page_size = SEARCH_PAGE_SIZE
+
+    books, has_next = search_books(query, page, page_size)
+    return JsonResponse({
+        'query': query,
+        'page': page,
+        'has_next': has_next,
+        'results': [
+            {
+                'id': book.id,
+                'title': book.title,
+                'author': book.author,
+                'isbn': book.isbn,
+                'available_copies': book.available_copies,
+            }
+            for book in books
+        ],
+    })
+
 @login_required
 def add_book_view(request):
     if not request.user.role == 'admin':
@@ -129,23 +202,82 @@ def return_book_view(request, pk):
     issue = get_object_or_404(BookIssue, pk=pk, return_date__isnull=True)
     
     if request.method == 'POST':
-        issue.return_date = timezone.now().date()
-        
-        # Calculate fine (e.g., ₹1 per day late)
-        if issue.return_date > issue.due_date:
-            days_late = (issue.return_date - issue.due_date).days
-            issue.fine_amount = days_late * 1.00 # 1 Rupee per day
-            messages.warning(request, f"Book returned {days_late} days late. Fine of ₹{issue.fine_amount} applied.")
-        
-        issue.book.available_copies += 1
-        issue.book.save()
-        issue.save()
-        
-        messages.success(request, f"'{issue.book.title}' marked as returned.")
+        report = return_books([issue])
+        for book, message in report.failed:
+            messages.error(request, message)
+        for returned in report.issues:
+            if returned.fine_amount:
+                days_late = (returned.return_date - returned.due_date).days
+                messages.warning(request, f"Book returned {days_late} days late. Fine of ₹{returned.fine_amount} applied.")
+            messages.success(request, f"'{returned.book.title}' marked as returned.")
+        for hold in report.holds:
+            messages.info(request, f"Put '{hold.book.title}' on the hold shelf for {hold.student.user.get_full_name()} ({hold.student.student_id}).")
         return redirect('library')
     
     # If GET request, just show the confirmation
     context = {
         'issue': issue
     }
-    return render(request, 'library/return_book_confirm.html', context)
\ No newline at end of file
+    return render(request, 'library/return_book_confirm.html', context)
+
+
+@login_required
+def cancel_reservation_view(request, pk):
+    """
+    Students can cancel their own reservations; admins and faculty can
+    cancel anyone's (e.g. clearing the hold shelf).
+    """
+    reservation = get_object_or_404(Reservation.objects.select_related('book', 'student'), pk=pk)
+    is_staff = request.user.role == 'admin' or request.user.role == 'faculty'
+    if not (is_staff or reservation.student.user_id == request.user.id):
+        messages.error(request, "You do not have permission to cancel this reservation.")
+        return redirect('library')
+
+    if request.method == 'POST':
+        if cancel_reservation(reservation):
+            messages.success(request, f"Reservation for '{reservation.book.title}' cancelled.")
+        else:
+            messages.error(request, "This reservation is no longer active.")
+    return redirect('library')
+
+
+@login_required
+def circulation_report_view(request):
+    """
+    Circulation report: most-issued titles, copy utilisation and overdue
+    rates by department, with a CSV export. Reads only the daily rollup
+    (see library.analytics), which `rollup_circulation` keeps current.
+    """
+    if not (request.user.role == 'admin' or request.user.role == 'faculty'):
+        messages.error(request, "You do not have permission to view library reports.")
+        return redirect('library')
+
+    # Every field is optional, so an empty query string is the default period
+    form = CirculationReportForm(request.GET)
+    if not form.is_valid():
+        return render(request, 'library/circulation_report.html', {'form': form})
+
+    date_from = form.cleaned_data['date_from']
+    date_to = form.cleaned_data['date_to']
+    department = form.cleaned_data['department']
+
+    if 'download' in request.GET:
+        scope = department.code if department else 'all'
+        response = StreamingHttpResponse(iter_export_lines(date_from, date_to, department), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="library_circulation_{scope}_{date_from}_{date_to}.csv"'
+        return response
+
+    daily = daily_totals(date_from, date_to, department)
+    context = {
+        'form': form,
+        'date_from': date_from,
+        'date_to': date_to,
+        'department': department,
+        'top_titles': top_titles(date_from, date_to, department),
+        'department_rates': department_rates(date_from, date_to),
+        'daily': daily,
+        'total_issues': sum(row['issues'] for row in daily),
+        'total_returns': sum(row['returns'] for row in daily),
+        'total_fines': sum(row['fines'] for row in daily),
+    }
+    return render(request, 'library/circulation_report.html', context)
\ No newline at end of file
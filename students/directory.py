@@ -0,0 +1,55 @@
+"""
+Helpers for the paginated student directory (students_view).
+
+The total count for a filter combination is cached so paging through the
+list doesn't re-run COUNT(*) every time. Cache keys include a directory
+version that is bumped whenever a student is added, changed or removed,
+so counts never go stale after an edit.
+"""
+
+import hashlib
+
+from django.core.cache import cache
+
+from core.search import RANKED_ORDERING, is_ranked
+from core.versioning import get_version, bump_version
+
+DIRECTORY_PAGE_SIZE = 50
+
+# Keyset order for the directory; student_id is unique but 'id' keeps the
+# order total even if that ever changes.
+DIRECTORY_ORDERING = ('student_id', 'id')
+
+COUNT_CACHE_TIMEOUT = 60 * 10
+
+
+def directory_ordering(queryset):
+    # A search ranks its matches; page through them best match first
+    # rather than re-sorting by student ID.
+    if is_ranked(queryset):
+        return RANKED_ORDERING
+    return DIRECTORY_ORDERING
+
+
+def directory_version():
+    return get_version('students')
+
+
+def bump_directory_version():
+    bump_version('students')
+
+
+def cached_count(queryset, params):
+    """
+    COUNT(*) for a filtered queryset, cached per filter combination.
+    `params` is the request's GET data; the cursor is left out of the key
+    because every page of the same filter has the same total.
+    """
+    filters = sorted((key, value) for key, value in params.items() if key != 'after' and value)
+    digest = hashlib.md5(repr(filters).encode()).hexdigest()
+    key = f'students:directory:count:{directory_version()}:{digest}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count
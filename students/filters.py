@@ -1,7 +1,7 @@
 import django_filters
 from django import forms
 from .models import Student, Department
-from django.db.models import Q
+from core.search import search
 
 class StudentFilter(django_filters.FilterSet):
     # This 'search' field is not tied to a model field, so we define it manually
@@ -35,13 +35,9 @@ class StudentFilter(django_filters.FilterSet):
 
     def filter_search(self, queryset, name, value):
         # This method is called when the 'search' field is used
-        # It searches across multiple fields on the related User model and the Student model
+        # It matches name, email and student ID through the indexed
+        # search_text column (see core/search.py)
         if not value:
             return queryset
         
-        return queryset.filter(
-            Q(user__first_name__icontains=value) |
-            Q(user__last_name__icontains=value) |
-            Q(user__email__icontains=value) |
-            Q(student_id__icontains=value)
-        )
\ No newline at end of file
+        return search(queryset, value, 'students')
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+CSV import for student rosters. The set-based work is done by
+core.importers.RosterImporter; this only describes the student columns.
+"""
+
+from core.importers import RosterImporter
+from core.search import build_search_text
+from .directory import bump_directory_version
+from .models import Student
+
+STUDENT_CSV_COLUMNS = (
+    'student_id', 'email', 'first_name', 'last_name',
+    'department_name', 'year', 'semester',
+)
+
+VALID_YEARS = {value for value, _ in Student.YEAR_CHOICES}
+
+
+class StudentImporter(RosterImporter):
+    role = 'student'
+    profile_model = Student
+    id_field = 'student_id'
+    columns = STUDENT_CSV_COLUMNS
+
+    def run(self, batches):
+        # bulk_create skips post_save, so invalidate directory counts here
+        try:
+            return super().run(batches)
+        finally:
+            bump_directory_version()
+
+    def clean_row(self, line, row, cleaned):
+        try:
+            year = int(row['year'])
+            semester = int(row['semester'])
+        except ValueError:
+            self.report.reject(line, cleaned['key'], "Year and semester must be whole numbers.")
+            return None
+        if year not in VALID_YEARS:
+            self.report.reject(line, cleaned['key'], f"Year must be one of {sorted(VALID_YEARS)}.")
+            return None
+
+        cleaned.update({
+            'year': year,
+            'semester': semester,
+            'address': row.get('address', '') or '',
+            'guardian_name': row.get('guardian_name', '') or '',
+        })
+        return cleaned
+
+    def build_profile(self, row):
+        return Student(
+            user_id=row['user_id'],
+            student_id=row['key'],
+            department=row['department'],
+            year=row['year'],
+            semester=row['semester'],
+            phone=row['phone'],
+            address=row['address'],
+            guardian_name=row['guardian_name'],
+            status='active',
+            # bulk_create skips save(), so fill the search column here
+            search_text=build_search_text(row['first_name'], row['last_name'], row['email'], row['key']),
+        )
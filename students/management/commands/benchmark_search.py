@@ -0,0 +1,75 @@
+import random
+import time
+
+from django.db import connection
+from django.db.models import Q
+
+from core.benchmarks import BenchmarkCommand, timings_ms
+from core.models import User
+from core.search import build_search_text, search
+from core.versioning import bump_version
+from students.models import Department, Student
+
+FIRST_NAMES = ['Aarav', 'Priya', 'Rahul', 'Ananya', 'Vikram', 'Sneha', 'Arjun', 'Kavya', 'Rohan', 'Isha', 'Karan', 'Meera']
+LAST_NAMES = ['Sharma', 'Kumar', 'Patel', 'Reddy', 'Iyer', 'Singh', 'Gupta', 'Nair', 'Das', 'Joshi', 'Mehta', 'Rao']
+DOMAINS = ['gmail.com', 'yahoo.co.in', 'campusconnect.dev', 'outlook.com']
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Benchmarks the student search box: the old icontains Q-chain against core.search '
+        'on a synthetic roster (default 50,000 students). All data is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000, help='Number of synthetic students (default: 50000).')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query; the best time is reported (default: 5).')
+
+    def seed(self, options):
+        rows = options['rows']
+        self.stdout.write(f'Creating {rows} synthetic students...')
+        rng = random.Random(42)
+        # Named students rather than core.benchmarks.seed_students, so
+        # there is something to search for
+        department = Department.objects.create(name='Benchmark Department', code='BENCH')
+        users, students = [], []
+        for i in range(rows):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            student_id = f'BENCH{i:07d}'
+            email = f'{first}.{last}{i}@{rng.choice(DOMAINS)}'.lower()
+            users.append(User(username=student_id, password='!', first_name=first, last_name=last, email=email))
+            students.append((student_id, build_search_text(first, last, email, student_id)))
+        User.objects.bulk_create(users, batch_size=2000)
+        Student.objects.bulk_create([
+            Student(user=user, student_id=student_id, department=department, year=1, semester=1, search_text=text)
+            for user, (student_id, text) in zip(users, students)
+        ], batch_size=2000)
+        bump_version('students')
+
+    def run(self, options):
+        repeat = options['repeat']
+        base = Student.objects.filter(status='active')
+        queries = ['priya', 'kum', 'BENCH0012345', 'rahul sharma', 'campusconnect']
+
+        # The Python backend builds its index on first use; time that once.
+        start = time.perf_counter()
+        list(search(base, 'warmup', 'students')[:1])
+        self.stdout.write(f'Backend: {connection.vendor}; first search (incl. index build): {(time.perf_counter() - start) * 1000:.1f} ms')
+
+        self.stdout.write(f"{'query':<18}{'Q-chain ms':>12}{'search ms':>12}{'matches':>10}")
+        for query in queries:
+            def q_chain():
+                return list(base.filter(
+                    Q(user__first_name__icontains=query) |
+                    Q(user__last_name__icontains=query) |
+                    Q(user__email__icontains=query) |
+                    Q(student_id__icontains=query)
+                ).values_list('pk', flat=True)[:50])
+
+            def indexed():
+                return list(search(base, query, 'students').values_list('pk', flat=True)[:50])
+
+            old_time = timings_ms(q_chain, repeat)[0]
+            new_time = timings_ms(indexed, repeat)[0]
+            matches = search(base, query, 'students').count()
+            self.stdout.write(f'{query:<18}{old_time:>12.1f}{new_time:>12.1f}{matches:>10}')
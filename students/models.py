@@ -2,6 +2,7 @@ from django.db import models
 from core.models import User
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
+from core.search import build_search_text
 
 class Department(models.Model):
     name = models.CharField(max_length=100, unique=True, verbose_name=_("Department Name"))
@@ -51,6 +52,10 @@ class Student(models.Model):
     # --- END FIX ---
     
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='active', verbose_name=_("Status"))
+
+    # Lower-cased name, email and ID for the directory search box.
+    # Kept up to date on save; see core/search.py.
+    search_text = models.TextField(blank=True, default='', editable=False)
     
     class Meta:
         verbose_name = _("Student")
@@ -58,4 +63,11 @@ class Student(models.Model):
         ordering = ['student_id']
 
     def __str__(self):
-        return f"{self.user.get_full_name()} ({self.student_id})"
\ No newline at end of file
+        return f"{self.user.get_full_name()} ({self.student_id})"
+
+    def build_search_text(self):
+        return build_search_text(self.user.first_name, self.user.last_name, self.user.email, self.student_id)
+
+    def save(self, *args, **kwargs):
+        self.search_text = self.build_search_text()
+        super().save(*args, **kwargs)
\ No newline at end of file
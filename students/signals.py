@@ -0,0 +1,27 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.models import User
+from .directory import bump_directory_version
+from .models import Student
+
+# User fields that feed Student.search_text
+SEARCHABLE_USER_FIELDS = {'first_name', 'last_name', 'email'}
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_directory_counts(sender, **kwargs):
+    bump_directory_version()
+
+
+@receiver(post_save, sender=User)
+def refresh_student_search_text(sender, instance, update_fields=None, **kwargs):
+    # Renaming a user outside StudentForm (e.g. in the admin) must still
+    # reach the search column. Logins only save last_login, so skip those.
+    if update_fields and not SEARCHABLE_USER_FIELDS.intersection(update_fields):
+        return
+    for student in Student.objects.filter(user=instance).only('id', 'student_id'):
+        student.user = instance
+        Student.objects.filter(pk=student.pk).update(search_text=student.build_search_text())
+        bump_directory_version()
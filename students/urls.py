@@ -4,6 +4,9 @@ from . import views
 urlpatterns = [
     # /students/
     path('', views.students_view, name='students'),
+
+    # /students/more/?after=<cursor> (next page as JSON, for "Load more")
+    path('more/', views.students_more_view, name='students_more'),
     
     # /students/add/
     path('add/', views.add_student_view, name='add_student'),
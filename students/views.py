@@ -2,40 +2,76 @@
 # This is the full and correct file (with filter context FIX)
 
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import JsonResponse
+from django.template.loader import render_to_string
 from django.contrib.auth.decorators import login_required
 from .models import Student, Department
-from core.models import User # Import the User model
+from core.models import ImportJob
 from .forms import StudentForm, DepartmentForm
 from .filters import StudentFilter # <-- IMPORT OUR NEW FILTER
 from django.contrib import messages
 from django.db.models import Q
 from django.db import IntegrityError, transaction # For handling database errors
-import csv # For reading CSV files
-import io # For decoding the uploaded file
+from core.csv_stream import iter_csv_batches, CSVFormatError
+from core.pagination import keyset_page
+from .directory import DIRECTORY_PAGE_SIZE, cached_count, directory_ordering
+
+DEPARTMENT_CSV_COLUMNS = ('code', 'name')
+
+def _student_directory(request):
+    """
+    Filtered student queryset for the directory and the "load more" endpoint.
+    """
+    students_query = Student.objects.select_related('user', 'department').filter(status='active')
+    return StudentFilter(request.GET, queryset=students_query)
 
 @login_required
 def students_view(request):
     """
     List, filter, and search students.
+    Students are shown one keyset page at a time; "Load more" fetches the
+    next page from students_more_view.
     """
     if not (request.user.role == 'admin' or request.user.role == 'faculty'):
         return redirect('dashboard') 
         
-    students_query = Student.objects.select_related('user', 'department').filter(status='active')
-    
     # --- NEW: Use django-filter ---
-    student_filter = StudentFilter(request.GET, queryset=students_query)
+    student_filter = _student_directory(request)
     filtered_students = student_filter.qs
     # --- END: Use django-filter ---
 
+    students, next_cursor = keyset_page(
+        filtered_students, directory_ordering(filtered_students), request.GET.get('after'), DIRECTORY_PAGE_SIZE
+    )
+
     context = {
-        'students': filtered_students,
+        'students': students,
         # === FIXED: Pass the entire filter INSTANCE, not just the .form ===
         'filter_form': student_filter, 
-        'departments': Department.objects.all(),
+        'total_count': cached_count(filtered_students, request.GET),
+        'next_cursor': next_cursor,
     }
     return render(request, 'students/students.html', context)
 
+@login_required
+def students_more_view(request):
+    """
+    JSON fragment with the next page of the directory for "Load more".
+    """
+    if not (request.user.role == 'admin' or request.user.role == 'faculty'):
+        return JsonResponse({'error': 'Permission denied.'}, status=403)
+
+    student_filter = _student_directory(request)
+    students, next_cursor = keyset_page(
+        student_filter.qs, directory_ordering(student_filter.qs), request.GET.get('after'), DIRECTORY_PAGE_SIZE
+    )
+    html = render_to_string('students/_student_rows.html', {'students': students}, request=request)
+    return JsonResponse({
+        'html': html,
+        'count': len(students),
+        'next_cursor': next_cursor,
+    })
+
 #
 # ... all other views (add_student, edit_student, etc.) remain unchanged ...
 #
@@ -106,27 +142,25 @@ def import_departments_csv(request):
             messages.error(request, 'Please upload a valid .csv file.')
             return redirect('students')
         try:
-            data_set = csv_file.read().decode('UTF-8')
-            io_string = io.StringIO(data_set)
-            reader = csv.DictReader(io_string)
             created_count = 0
-            for row in reader:
-                _, created = Department.objects.get_or_create(
-                    code=row['code'],
-                    defaults={
-                        'name': row['name'],
-                        'head_of_department': row.get('head_of_department', ''),
-                        'description': row.get('description', ''),
-                    }
-                )
-                if created:
-                    created_count += 1
+            for batch in iter_csv_batches(csv_file, DEPARTMENT_CSV_COLUMNS):
+                for line, row in batch:
+                    _, created = Department.objects.get_or_create(
+                        code=row['code'],
+                        defaults={
+                            'name': row['name'],
+                            'head_of_department': row.get('head_of_department', ''),
+                            'description': row.get('description', ''),
+                        }
+                    )
+                    if created:
+                        created_count += 1
             messages.success(request, f'Successfully imported {created_count} new departments.')
         except IntegrityError as e:
             messages.error(request, f'Database Error: {e}. A department with that code might already exist. No departments were imported.')
             transaction.set_rollback(True)
-        except KeyError as e:
-            messages.error(request, f'CSV Error: Missing required column: {e}. No departments were imported.')
+        except CSVFormatError as e:
+            messages.error(request, f'CSV Error: {e} No departments were imported.')
             transaction.set_rollback(True)
         except Exception as e:
             messages.error(request, f'An unexpected error occurred: {e}')
@@ -135,7 +169,6 @@ def import_departments_csv(request):
     return redirect('students')
 
 @login_required
-@transaction.atomic
 def import_students_csv(request):
     if not (request.user.role == 'admin' or request.user.role == 'faculty'):
         messages.error(request, "You do not have permission to import students.")
@@ -145,62 +178,11 @@ def import_students_csv(request):
         if not csv_file or not csv_file.name.endswith('.csv'):
             messages.error(request, 'Please upload a valid .csv file.')
             return redirect('students')
-        try:
-            data_set = csv_file.read().decode('UTF-8')
-            io_string = io.StringIO(data_set)
-            reader = csv.DictReader(io_string)
-            created_count = 0
-            for row in reader:
-                try:
-                    department = Department.objects.get(name__iexact=row['department_name'])
-                except Department.DoesNotExist:
-                    messages.error(request, f"Department '{row['department_name']}' in CSV does not exist. Import departments first. No students were imported.")
-                    transaction.set_rollback(True)
-                    return redirect('students')
-                except KeyError:
-                    messages.error(request, "CSV is missing the 'department_name' column. No students were imported.")
-                    transaction.set_rollback(True)
-                    return redirect('students')
-                default_password = row.get('student_id', 'password123')
-                user, created_user = User.objects.get_or_create(
-                    username=row['student_id'],
-                    defaults={
-                        'email': row['email'],
-                        'first_name': row['first_name'],
-                        'last_name': row['last_name'],
-                        'role': 'student',
-                        'is_active': True
-                    }
-                )
-                if created_user:
-                    user.set_password(default_password)
-                    user.save()
-                _, created_student = Student.objects.get_or_create(
-                    user=user,
-                    student_id=row['student_id'],
-                    defaults={
-                        'department': department,
-                        'year': int(row['year']),
-                        'semester': int(row['semester']),
-                        'phone': row.get('phone', ''),
-                        'address': row.get('address', ''),
-                        'guardian_name': row.get('guardian_name', ''),
-                        'status': 'active'
-                    }
-                )
-                if created_student:
-                    created_count += 1
-            messages.success(request, f'Successfully imported {created_count} new students.')
-        except IntegrityError as e:
-            messages.error(request, f'Database Error: {e}. A student or user might already exist. No students were imported.')
-            transaction.set_rollback(True)
-        except (KeyError, TypeError, ValueError) as e:
-            messages.error(request, f'CSV Error: Check your columns. Missing or invalid data for: {e}. No students were imported.')
-            transaction.set_rollback(True)
-        except Exception as e:
-            messages.error(request, f'An unexpected error occurred: {e}')
-            transaction.set_rollback(True)
-        return redirect('students')
+        # Large rosters take a while, so the worker (manage.py run_import_jobs)
+        # does the import and the user watches its progress.
+        job = ImportJob.objects.create(kind='students', csv_file=csv_file, created_by=request.user)
+        messages.success(request, 'Your file has been queued for import.')
+        return redirect('import_job', pk=job.pk)
     else:
         return redirect('students')
 
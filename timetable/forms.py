@@ -1,6 +1,7 @@
 from django import forms
 from .models import TimetableSlot
 from students.models import Department
+from courses.models import Course
 
 class TimetableSlotForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,107 @@
+"""
+Timetable grid building and caching.
+
+A timetable changes a few times a term but is read thousands of times a
+day, so the rendered timetable (filter form and grid) is cached per
+(department, year, semester), and per student for a student's own
+enrolled-courses timetable. Students and faculty get the page body from
+one cache entry; admins always get a fresh render with the edit and
+delete controls.
+
+Cache keys include a data version per (department, year, semester),
+bumped when one of its slots (or the course of one) changes, so editing
+one department's timetable leaves every other department's cached. A
+student's timetable is keyed on the versions of the departments its slots
+come from plus the student's own version, bumped when their enrollments
+change. Every key also has the 'departments' version (the filter form
+lists them) and the 'faculty' version, which changes when a teacher is
+renamed. See timetable.signals.
+"""
+
+import datetime
+import threading
+
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from core.versioning import get_version, bump_versions
+
+from .models import TimetableSlot
+
+TIMETABLE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Rows always shown, so a sparse timetable still reads as a full day.
+# Slots at other times get rows of their own.
+DEFAULT_PERIODS = [
+    (datetime.time(hour), datetime.time(hour + 1)) for hour in range(9, 16)
+]
+
+
+def department_version_name(department_id, year, semester):
+    return f'timetable:{department_id}:{year}:{semester}'
+
+
+def student_version_name(student_id):
+    return f'timetable:student:{student_id}'
+
+
+# Versions to bump when the transaction commits, collected so a cascade
+# (deleting a department deletes all its slots) bumps each one once
+_pending = threading.local()
+
+
+def _bump_pending_versions():
+    names = getattr(_pending, 'names', set())
+    _pending.names = set()
+    if names:
+        bump_versions(names)
+
+
+def invalidate_timetables(version_names):
+    # After commit, so a timetable rendered meanwhile can't be cached
+    # under the new version with the old data
+    if not hasattr(_pending, 'names'):
+        _pending.names = set()
+    _pending.names.update(version_names)
+    transaction.on_commit(_bump_pending_versions)
+
+
+def period_label(start, end):
+    return f"{start.strftime('%H:%M')} - {end.strftime('%H:%M')}"
+
+
+def build_grid(slots):
+    """
+    Rows of (period label, [slots on each day]) in DAY_CHOICES order,
+    sorted by start time. A cell holds a list, so clashing slots are all
+    shown rather than one hiding the other.
+    """
+    days = [code for code, name in TimetableSlot.DAY_CHOICES]
+    cells = {period: {day: [] for day in days} for period in DEFAULT_PERIODS}
+    for slot in slots:
+        period = (slot.start_time, slot.end_time)
+        if period not in cells:
+            cells[period] = {day: [] for day in days}
+        if slot.day_of_week in cells[period]:
+            cells[period][slot.day_of_week].append(slot)
+    return [
+        (period_label(*period), [cells[period][day] for day in days])
+        for period in sorted(cells)
+    ]
+
+
+def cached_body(key_parts, version_names, build_context):
+    """
+    The rendered timetable body for `key_parts`, from the cache if it's
+    there and none of `version_names` has been bumped since.
+    `build_context` is only called on a miss.
+    """
+    versions = ':'.join(str(get_version(name)) for name in ('departments', 'faculty', *version_names))
+    key = 'timetable:body:' + versions + ':' + ':'.join(str(part) for part in key_parts)
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string('timetable/_timetable_body.html', build_context())
+        cache.set(key, html, TIMETABLE_CACHE_TIMEOUT)
+    return mark_safe(html)
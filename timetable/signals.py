@@ -0,0 +1,48 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from courses.models import Course, Enrollment
+from students.models import Department
+from .grid import invalidate_timetables, department_version_name, student_version_name
+from .models import TimetableSlot
+
+
+def _slot_version_names(slots):
+    return {
+        department_version_name(department_id, year, semester)
+        for department_id, year, semester in slots.values_list('department_id', 'year', 'semester').distinct()
+    }
+
+
+@receiver(pre_save, sender=TimetableSlot)
+def invalidate_moved_slot_timetable(sender, instance, raw=False, **kwargs):
+    # An edit can move a slot to another department, year or semester; the
+    # timetable it is leaving changes too
+    if instance.pk and not raw:
+        invalidate_timetables(_slot_version_names(TimetableSlot.objects.filter(pk=instance.pk).order_by()))
+
+
+@receiver(post_save, sender=TimetableSlot)
+@receiver(post_delete, sender=TimetableSlot)
+def invalidate_slot_timetable(sender, instance, **kwargs):
+    invalidate_timetables([department_version_name(instance.department_id, instance.year, instance.semester)])
+
+
+@receiver(post_save, sender=Course)
+def invalidate_course_timetables(sender, instance, created, raw=False, **kwargs):
+    # The course code and title are shown in its slots. (Deleting a course
+    # deletes its slots, which invalidate their own timetables.)
+    if not created and not raw:
+        invalidate_timetables(_slot_version_names(instance.timetable_slots.order_by()))
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def invalidate_student_timetable(sender, instance, **kwargs):
+    invalidate_timetables([student_version_name(instance.student_id)])
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def invalidate_department_list(sender, **kwargs):
+    invalidate_timetables(['departments'])
@@ -1,3 +1,84 @@
+import datetime
+
 from django.test import TestCase
 
-# Create your tests here.
+from core.models import User
+from core.versioning import get_version
+from courses.models import Course, Enrollment
+from students.models import Department, Student
+from timetable.grid import department_version_name, student_version_name
+from timetable.models import TimetableSlot
+
+
+class TimetableInvalidationTests(TestCase):
+    """
+    A change bumps only the cached timetables it shows up in, and only
+    once the transaction commits.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cse = Department.objects.create(name='Computer Science', code='CSE')
+        cls.ece = Department.objects.create(name='Electronics', code='ECE')
+        cls.course = Course.objects.create(code='CS101', title='Programming', department=cls.cse, credits=3)
+        user = User.objects.create(username='STU001', role='student')
+        cls.student = Student.objects.create(user=user, student_id='STU001', department=cls.cse, year=1, semester=1)
+
+    def _versions(self):
+        names = [
+            department_version_name(self.cse.pk, 1, 1),
+            department_version_name(self.cse.pk, 2, 1),
+            department_version_name(self.ece.pk, 1, 1),
+            student_version_name(self.student.pk),
+        ]
+        return {name: get_version(name) for name in names}
+
+    def _changed(self, before):
+        after = self._versions()
+        return {name for name in before if after[name] != before[name]}
+
+    def _new_slot(self, department):
+        return TimetableSlot.objects.create(
+            department=department, course=self.course, year=1, semester=1, day_of_week='monday',
+            start_time=datetime.time(9), end_time=datetime.time(10),
+        )
+
+    def _add_slot(self, department):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self._new_slot(department)
+
+    def test_slot_change_bumps_only_its_department_after_commit(self):
+        before = self._versions()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self._new_slot(self.cse)
+        self.assertEqual(self._changed(before), set())
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self._changed(before), {department_version_name(self.cse.pk, 1, 1)})
+
+    def test_moving_a_slot_bumps_both_timetables(self):
+        slot = self._add_slot(self.cse)
+        before = self._versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            slot.year = 2
+            slot.save()
+        self.assertEqual(
+            self._changed(before),
+            {department_version_name(self.cse.pk, 1, 1), department_version_name(self.cse.pk, 2, 1)},
+        )
+
+    def test_course_edit_bumps_the_timetables_it_is_on(self):
+        self._add_slot(self.ece)
+        before = self._versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.title = 'Programming in C'
+            self.course.save()
+        self.assertEqual(self._changed(before), {department_version_name(self.ece.pk, 1, 1)})
+
+    def test_enrollment_bumps_only_the_student(self):
+        self._add_slot(self.cse)
+        before = self._versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(student=self.student, course=self.course, academic_year='2025-2026', semester=1)
+        self.assertEqual(self._changed(before), {student_version_name(self.student.pk)})
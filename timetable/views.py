@@ -1,70 +1,87 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from .models import TimetableSlot
-from students.models import Department
+from students.models import Department, Student
+from courses.rosters import academic_year_for
 from .forms import TimetableSlotForm
+from .grid import build_grid, cached_body, department_version_name, student_version_name
 from django.contrib import messages
-from collections import defaultdict
 
 @login_required
 def timetable_view(request):
     """
     Display the main timetable, filterable by department, year, and semester.
+    Students with no filter picked see their own enrolled courses' slots.
+    Everyone but admins gets the rendered timetable from the cache (see
+    timetable/grid.py); admins get a fresh one with edit controls.
     """
-    departments = Department.objects.all()
-    
     # Get filter parameters
-    selected_dept_id = request.GET.get('department')
+    selected_dept_id = request.GET.get('department', '')
     selected_year = request.GET.get('year', '1') # Default to 1st year
     selected_semester = request.GET.get('semester', '1') # Default to 1st semester
 
-    timetable_slots = TimetableSlot.objects.none()
-    timetable_grid = defaultdict(lambda: defaultdict(str))
-    
-    if selected_dept_id:
+    if selected_dept_id and not all(value.isdigit() for value in (selected_dept_id, selected_year, selected_semester)):
+        messages.error(request, "Invalid filter options selected.")
+        selected_dept_id = ''
+
+    # With no filter picked, students get their own timetable: the slots of
+    # the courses they are enrolled in this academic year.
+    student = None
+    if not selected_dept_id and request.user.role == 'student':
         try:
-            # Fetch slots for the selected filter
-            timetable_slots = TimetableSlot.objects.filter(
-                department_id=selected_dept_id,
-                year=selected_year,
-                semester=selected_semester
-            ).select_related('course', 'faculty__user')
+            student = request.user.student_profile
+        except Student.DoesNotExist:
+            pass
+
+    if student:
+        academic_year = academic_year_for()
+        key_parts = ('student', student.pk, student.year, student.semester, academic_year)
+        timetable_slots = TimetableSlot.objects.filter(
+            course__enrollments__student=student,
+            course__enrollments__academic_year=academic_year,
+            year=student.year,
+            semester=student.semester,
+        ).distinct()
+        # Read fresh each time, so a slot added in another department
+        # changes the key as well
+        slot_departments = sorted(
+            timetable_slots.order_by().values_list('department_id', flat=True).distinct()
+        )
+        version_names = [student_version_name(student.pk)] + [
+            department_version_name(department_id, student.year, student.semester)
+            for department_id in slot_departments
+        ]
+    elif selected_dept_id:
+        key_parts = ('department', int(selected_dept_id), int(selected_year), int(selected_semester))
+        version_names = [department_version_name(*key_parts[1:])]
+        timetable_slots = TimetableSlot.objects.filter(
+            department_id=selected_dept_id,
+            year=selected_year,
+            semester=selected_semester
+        )
+    else:
+        key_parts = ('none',)
+        version_names = []
+        timetable_slots = TimetableSlot.objects.none()
 
-            # --- This is the BERSERK part ---
-            # We process the data into a grid structure for the template
-            # This makes the template logic *incredibly* simple.
-            
-            # Define time slots (you can customize these)
-            times = [
-                "09:00 - 10:00", "10:00 - 11:00", "11:00 - 12:00", 
-                "12:00 - 13:00", "13:00 - 14:00", "14:00 - 15:00", "15:00 - 16:00"
-            ]
-            days = TimetableSlot.DAY_CHOICES
-            
-            # Initialize grid
-            grid = {time: {day[0]: None for day in days} for time in times}
-            
-            # Populate grid
-            for slot in timetable_slots:
-                time_key = f"{slot.start_time.strftime('%H:%M')} - {slot.end_time.strftime('%H:%M')}"
-                if time_key in grid and slot.day_of_week in grid[time_key]:
-                    grid[time_key][slot.day_of_week] = slot
-            
-            timetable_grid = grid
+    def build_context():
+        slots = list(timetable_slots.select_related('course', 'faculty__user'))
+        return {
+            'departments': Department.objects.all(),
+            'timetable_rows': build_grid(slots),
+            'has_slots': bool(slots),
+            'has_selection': bool(selected_dept_id or student),
+            'days': TimetableSlot.DAY_CHOICES,
+            'selected_dept_id': selected_dept_id,
+            'selected_year': selected_year,
+            'selected_semester': selected_semester,
+        }
 
-        except ValueError:
-            messages.error(request, "Invalid filter options selected.")
-            
-    context = {
-        'departments': departments,
-        'timetable_grid': timetable_grid,
-        'days': TimetableSlot.DAY_CHOICES,
-        'times': timetable_grid.keys(),
-        'selected_dept_id': selected_dept_id,
-        'selected_year': selected_year,
-        'selected_semester': selected_semester,
-        'all_slots_list': timetable_slots # For an alternate "list" view
-    }
+    if request.user.role == 'admin':
+        context = build_context()
+        context['show_admin_controls'] = True
+    else:
+        context = {'timetable_body': cached_body(key_parts, version_names, build_context)}
     return render(request, 'timetable/timetable.html', context)
 
 @login_required